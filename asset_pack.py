@@ -0,0 +1,141 @@
+import os
+import sys
+import json
+import mmap
+import struct
+import pygame
+from settings import ASSETS_DIR, SPRITES_DIR, SOUNDS_DIR, SOUND_VOLUMES, ASSET_PACK_FILE
+
+# Формат файла: сигнатура, версия и длина JSON-индекса, сам индекс, затем выровненные данные –
+# готовые RGBA-кадры уже нужного размера и сырой PCM звуков в формате микшера
+MAGIC = b"PAPK"
+VERSION = 1
+HEADER = struct.Struct("<4sII")
+ALIGNMENT = 16
+
+
+def source_files():
+    # Исходные файлы пака; их размер и время изменения определяют, устарел ли пак
+    from resources import SPRITE_MANIFEST, SHEET_MANIFEST
+    files = [os.path.join(SPRITES_DIR, entry[1]) for entry in SPRITE_MANIFEST + SHEET_MANIFEST]
+    files += [os.path.join(SOUNDS_DIR, f"{name}.wav") for name in SOUND_VOLUMES]
+    return files
+
+
+def fingerprint():
+    # Отпечаток всего, из чего собирается пак: состав манифеста, исходные файлы и формат микшера
+    from resources import SPRITE_MANIFEST, SHEET_MANIFEST
+    sources = {}
+    for path in source_files():
+        stat = os.stat(path)
+        sources[os.path.relpath(path, ASSETS_DIR)] = [stat.st_size, stat.st_mtime_ns]
+    return {
+        "sprites": [list(entry[:2]) + [entry[2]] for entry in SPRITE_MANIFEST],
+        "sheets": [list(entry[:4]) + [list(entry[4]) if entry[4] else None] for entry in SHEET_MANIFEST],
+        "sounds": sorted(SOUND_VOLUMES),
+        "sources": sources,
+        "mixer": list(pygame.mixer.get_init() or ())
+    }
+
+
+def build_pack(path=ASSET_PACK_FILE):
+    # Шаг сборки: декодируем и масштабируем все кадры один раз и складываем байты в один файл
+    from resources import SPRITE_MANIFEST, SHEET_MANIFEST
+    chunks = []
+    offset = 0
+
+    def add(data):
+        nonlocal offset
+        start = offset
+        chunks.append(data)
+        offset += len(data)
+        padding = -offset % ALIGNMENT
+        chunks.append(b"\0" * padding)
+        offset += padding
+        return start
+
+    def add_image(surface):
+        return {"offset": add(pygame.image.tobytes(surface, "RGBA")), "size": list(surface.get_size())}
+
+    index = {"fingerprint": fingerprint(), "sprites": {}, "sheets": {}, "sounds": {}}
+    for name, filename, options in SPRITE_MANIFEST:
+        image = pygame.image.load(os.path.join(SPRITES_DIR, filename))
+        index["sprites"][name] = dict(add_image(image), options=options)
+
+    for name, filename, rows, cols, scale in SHEET_MANIFEST:
+        # Та же нарезка, что в finish_sprite_sheet; масштабирование ближайшим соседом не зависит от формата пикселей
+        sheet = pygame.image.load(os.path.join(SPRITES_DIR, filename))
+        frame_width, frame_height = sheet.get_width() // cols, sheet.get_height() // rows
+        frames = []
+        for row in range(rows):
+            for col in range(cols):
+                frame = sheet.subsurface((col * frame_width, row * frame_height, frame_width, frame_height))
+                frames.append(add_image(pygame.transform.scale(frame, scale) if scale else frame))
+        index["sheets"][name] = {"rows": rows, "cols": cols, "frames": frames}
+
+    for name in SOUND_VOLUMES:
+        raw = pygame.mixer.Sound(os.path.join(SOUNDS_DIR, f"{name}.wav")).get_raw()
+        index["sounds"][name] = {"offset": add(raw), "length": len(raw)}
+
+    index_bytes = json.dumps(index).encode("utf-8")
+    index_bytes += b" " * (-(HEADER.size + len(index_bytes)) % ALIGNMENT)
+    temp_path = path + ".tmp"
+    with open(temp_path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, len(index_bytes)))
+        f.write(index_bytes)
+        for chunk in chunks:
+            f.write(chunk)
+    os.replace(temp_path, path)
+    return HEADER.size + len(index_bytes) + offset
+
+
+# Открытый пак ресурсов: файл отображен в память, кадры и звуки создаются прямо из отображения
+class AssetPack:
+    def __init__(self, path, mapping, index, data_start):
+        self.path = path
+        self.mapping = mapping
+        self.view = memoryview(mapping)
+        self.index = index
+        self.data_start = data_start
+
+    def image(self, entry):
+        # frombuffer не копирует пиксели: поверхность ссылается на отображенную память до convert
+        width, height = entry["size"]
+        start = self.data_start + entry["offset"]
+        return pygame.image.frombuffer(self.view[start:start + width * height * 4], (width, height), "RGBA")
+
+    def sound(self, name, volume):
+        entry = self.index["sounds"][name]
+        start = self.data_start + entry["offset"]
+        sound = pygame.mixer.Sound(buffer=self.view[start:start + entry["length"]])
+        sound.set_volume(volume)
+        return sound
+
+
+def open_pack(path=ASSET_PACK_FILE):
+    # Возвращает AssetPack или None, если пака нет, он поврежден или устарел относительно исходников
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, "rb") as f:
+            mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, index_length = HEADER.unpack_from(mapping, 0)
+        if magic != MAGIC or version != VERSION:
+            print(f"Asset pack {path} has an unknown format, using loose files")
+            return None
+        index = json.loads(bytes(mapping[HEADER.size:HEADER.size + index_length]))
+        if index["fingerprint"] != fingerprint():
+            print(f"Asset pack {path} is stale, using loose files")
+            return None
+    except (OSError, ValueError, KeyError, struct.error) as e:
+        print(f"Error opening asset pack {path}: {e}")
+        return None
+    return AssetPack(path, mapping, index, HEADER.size + index_length)
+
+
+if __name__ == "__main__":
+    from headless import init_headless
+    init_headless()
+    pygame.mixer.init()
+    size = build_pack(sys.argv[1] if len(sys.argv) > 1 else ASSET_PACK_FILE)
+    print(f"Asset pack written: {size} bytes")
@@ -0,0 +1,59 @@
+import pygame
+from settings import ATLAS_PAGE_SIZE, ATLAS_PADDING
+
+
+# Атлас текстур: кадры спрайт-листов и их варианты укладываются на несколько больших страниц
+# Каждый кадр заменяется подповерхностью страницы – это и есть пара (страница, прямоугольник):
+# blit подповерхности копирует нужную область страницы, а остальной код работает с ней как с обычным кадром
+class TextureAtlas:
+    def __init__(self, page_size=ATLAS_PAGE_SIZE, padding=ATLAS_PADDING):
+        self.page_size = page_size
+        self.padding = padding
+        self.pages = []
+        self.used_area = 0
+
+    def pack(self, surfaces):
+        # Полочная упаковка: кадры по убыванию высоты заполняют полки слева направо,
+        # новая полка начинается под самой высокой в текущей, новая страница – когда полка не помещается.
+        # Возвращает словарь id(исходной поверхности) -> подповерхность атласа
+        unique = list({id(surface): surface for surface in surfaces}.values())
+        fitting = [surface for surface in unique
+                   if surface.get_width() <= self.page_size and surface.get_height() <= self.page_size]
+        fitting.sort(key=lambda surface: (surface.get_height(), surface.get_width()), reverse=True)
+
+        placements = []
+        page = x = y = shelf_height = 0
+        for surface in fitting:
+            width, height = surface.get_size()
+            if x + width > self.page_size:
+                x, y = 0, y + shelf_height + self.padding
+                shelf_height = 0
+            if y + height > self.page_size:
+                page += 1
+                x = y = shelf_height = 0
+            placements.append((surface, page, x, y))
+            x += width + self.padding
+            shelf_height = max(shelf_height, height)
+
+        if not placements:
+            return {}
+        first_page = len(self.pages)
+        for _ in range(page + 1):
+            atlas_page = pygame.Surface((self.page_size, self.page_size), pygame.SRCALPHA)
+            self.pages.append(atlas_page.convert_alpha() if pygame.display.get_surface() else atlas_page)
+
+        packed = {}
+        for surface, page, x, y in placements:
+            atlas_page = self.pages[first_page + page]
+            # Страница прозрачна, поэтому BLEND_RGBA_MAX копирует пиксели кадра вместе с альфой без смешивания
+            atlas_page.blit(surface, (x, y), special_flags=pygame.BLEND_RGBA_MAX)
+            packed[id(surface)] = atlas_page.subsurface((x, y) + surface.get_size())
+            self.used_area += surface.get_width() * surface.get_height()
+        return packed
+
+    def stats(self):
+        capacity = len(self.pages) * self.page_size * self.page_size
+        return {
+            "pages": len(self.pages),
+            "fill": self.used_area / capacity if capacity else 0.0
+        }
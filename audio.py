@@ -0,0 +1,101 @@
+import math
+import pygame
+from resources import get_sound
+from settings import (
+    AUDIO_CHANNELS, AUDIO_FULL_DISTANCE, AUDIO_MAX_DISTANCE, AUDIO_PAN_DISTANCE, SOUND_VOICES
+)
+
+# Приоритет и предел экземпляров для звуков, не описанных в SOUND_VOICES
+DEFAULT_VOICE = (0, 2)
+
+
+# Менеджер голосов – звуковой сервис игры: вместо прямого Sound.play() звуки проходят через бюджет каналов.
+# Запросы за кадр копятся и запускаются одним flush(): одинаковые звуки кадра схлопываются в один,
+# звуки вне слышимости от центра камеры отбрасываются, остальные получают громкость и панораму по расстоянию.
+# Каналов фиксированное число; при нехватке вытесняется самый старый голос с меньшим или равным приоритетом
+class VoiceManager:
+    def __init__(self, channels=AUDIO_CHANNELS):
+        # Без инициализированного микшера (нет аудиоустройства) звуки просто не воспроизводятся
+        if pygame.mixer.get_init():
+            pygame.mixer.set_num_channels(channels)
+            self.channels = [pygame.mixer.Channel(i) for i in range(channels)]
+        else:
+            self.channels = []
+        self.voices = {}  # номер канала -> (имя звука, приоритет, порядковый номер запуска)
+        self.started = 0
+        self.requests = {}  # имя звука -> (громкость, панорама) самого громкого запроса кадра
+        # Точка слушателя в мировых координатах – центр камеры; None – звуки без ослабления (меню)
+        self.listener = None
+        self.stats = {"requested": 0, "coalesced": 0, "culled": 0, "dropped": 0, "stolen": 0, "played": 0}
+
+    def play(self, sound_name, pos=None):
+        self.stats["requested"] += 1
+        gain, pan = self.spatialize(pos)
+        if gain <= 0:
+            self.stats["culled"] += 1
+            return
+        pending = self.requests.get(sound_name)
+        if pending is not None:
+            self.stats["coalesced"] += 1
+            if pending[0] >= gain:
+                return
+        self.requests[sound_name] = (gain, pan)
+
+    def spatialize(self, pos):
+        # Полная громкость в пределах AUDIO_FULL_DISTANCE, линейный спад до нуля к AUDIO_MAX_DISTANCE;
+        # панорама – по горизонтальному смещению от слушателя
+        if pos is None or self.listener is None:
+            return 1.0, 0.0
+        dx = pos[0] - self.listener[0]
+        distance = math.hypot(dx, pos[1] - self.listener[1])
+        if distance >= AUDIO_MAX_DISTANCE:
+            return 0.0, 0.0
+        gain = 1.0 - max(0.0, distance - AUDIO_FULL_DISTANCE) / (AUDIO_MAX_DISTANCE - AUDIO_FULL_DISTANCE)
+        pan = max(-1.0, min(1.0, dx / AUDIO_PAN_DISTANCE))
+        return gain, pan
+
+    def flush(self):
+        # Раз в кадр: запускаем накопленные звуки, начиная с самых важных
+        requests = sorted(self.requests.items(), key=lambda item: -SOUND_VOICES.get(item[0], DEFAULT_VOICE)[0])
+        self.requests = {}
+        for sound_name, (gain, pan) in requests:
+            sound = get_sound(sound_name)
+            if sound is None:
+                continue
+            priority, max_instances = SOUND_VOICES.get(sound_name, DEFAULT_VOICE)
+            index = self.find_channel(sound_name, priority, max_instances)
+            if index is None:
+                self.stats["dropped"] += 1
+                continue
+            channel = self.channels[index]
+            channel.play(sound)
+            # Баланс без потери громкости в центре: к краю приглушается только дальний канал
+            channel.set_volume(gain * min(1.0, 1.0 - pan), gain * min(1.0, 1.0 + pan))
+            self.voices[index] = (sound_name, priority, self.started)
+            self.started += 1
+            self.stats["played"] += 1
+
+    def find_channel(self, sound_name, priority, max_instances):
+        # Освободившиеся каналы забываем, чтобы учитывать только звучащие голоса
+        for index in [index for index in self.voices if not self.channels[index].get_busy()]:
+            del self.voices[index]
+        # Предел экземпляров: новый запуск заменяет самый старый голос того же звука
+        instances = [index for index, voice in self.voices.items() if voice[0] == sound_name]
+        if len(instances) >= max_instances:
+            self.stats["stolen"] += 1
+            return min(instances, key=lambda index: self.voices[index][2])
+        for index in range(len(self.channels)):
+            if index not in self.voices:
+                return index
+        # Все каналы заняты – вытесняем самый старый из наименее важных, если он не важнее нового
+        victim = min(self.voices, key=lambda index: (self.voices[index][1], self.voices[index][2]), default=None)
+        if victim is None or self.voices[victim][1] > priority:
+            return None
+        self.stats["stolen"] += 1
+        return victim
+
+    def report(self):
+        stats = self.stats
+        return (f"voices {len(self.voices)}/{len(self.channels)}, requested {stats['requested']}, "
+                f"played {stats['played']}, coalesced {stats['coalesced']}, culled {stats['culled']}, "
+                f"stolen {stats['stolen']}, dropped {stats['dropped']}")
@@ -0,0 +1,486 @@
+import gc
+import os
+import sys
+import json
+import math
+import random
+import time
+import platform
+import argparse
+import statistics
+import pygame
+from settings import WORLD_WIDTH, WORLD_HEIGHT, SPRITES_DIR, BASE_DIR
+from entities import resolve_collisions, Enemy
+from spatial import SpatialHash
+from steering import BatchSteering
+from sim_clock import SimulationClock
+from scheduler import Scheduler
+from event_bus import EventBus
+from headless import init_headless, NullSoundService, create_world
+from draw_order import DepthOrder
+from ui import TiledBackground
+from resources import load_sprite, preload_resources, clear_caches
+from camera import Camera
+from levels import generate_wave, poisson_disk_points, wave_size, WaveDirector
+from widgets import HudReadout
+
+
+# Облегченный враг для замеров: разрешению столкновений нужны только прямоугольник и состояние
+class BenchEnemy:
+    def __init__(self, x, y, state="walking"):
+        self.rect = pygame.Rect(0, 0, 50, 70)
+        self.rect.center = (x, y)
+        self.state = state
+
+
+def make_crowd(count, seed=0, area_per_enemy=4900):
+    # Толпа врагов вокруг игрока с постоянной плотностью, чтобы замер отражал масштабирование,
+    # а не рост числа реальных пересечений
+    rng = random.Random(seed)
+    spread = math.sqrt(count * area_per_enemy / math.pi)
+    cx, cy = WORLD_WIDTH // 2, WORLD_HEIGHT // 2
+    crowd = []
+    for _ in range(count):
+        angle = rng.uniform(0, 2 * math.pi)
+        radius = spread * math.sqrt(rng.random())
+        state = "dying" if rng.random() < 0.1 else "walking"
+        crowd.append(BenchEnemy(int(cx + radius * math.cos(angle)), int(cy + radius * math.sin(angle)), state))
+    return crowd
+
+
+def resolve_collisions_bruteforce(enemies):
+    # Эталонный полный перебор пар для проверки совпадения результата широкой фазы
+    from entities import separate_enemies
+    enemy_list = list(enemies)
+    for i in range(len(enemy_list)):
+        for j in range(i + 1, len(enemy_list)):
+            e1, e2 = enemy_list[i], enemy_list[j]
+            if e1.state == "dying" or e2.state == "dying":
+                continue
+            separate_enemies(e1, e2)
+
+
+def bench_collisions(counts=(50, 100, 200, 400, 800), ticks=20):
+    # Сравниваем с эталоном и замеряем стоимость одного тика разрешения столкновений
+    grid = SpatialHash()
+    print(f"{'enemies':>8} {'ms/tick':>10} {'us/enemy':>10} {'matches':>8}")
+    for count in counts:
+        crowd = make_crowd(count)
+        reference = make_crowd(count)
+        resolve_collisions(crowd, grid)
+        resolve_collisions_bruteforce(reference)
+        matches = all(a.rect == b.rect for a, b in zip(crowd, reference))
+
+        start = time.perf_counter()
+        for _ in range(ticks):
+            resolve_collisions(crowd, grid)
+        elapsed = (time.perf_counter() - start) / ticks
+        print(f"{count:>8} {elapsed * 1000:>10.3f} {elapsed * 1e6 / count:>10.2f} {str(matches):>8}")
+
+
+# Неуязвимая цель, к которой сходится орда
+class BenchTarget(BenchEnemy):
+    def take_damage(self, damage=1):
+        pass
+
+
+def make_horde(count, target, clock, seed=0):
+    # Настоящие враги, равномерно разбросанные по миру и идущие к цели
+    rng = random.Random(seed)
+    # Шина и планировщик общие для всей орды, как у врагов из одной фабрики
+    events = EventBus()
+    scheduler = Scheduler()
+    return [Enemy((rng.randint(0, WORLD_WIDTH), rng.randint(0, WORLD_HEIGHT)), target, events, clock,
+                  scheduler) for _ in range(count)]
+
+
+def bench_steering(counts=(100, 500, 2000), ticks=30):
+    # Сравниваем скалярный и пакетный расчет движения на одной и той же орде
+    init_headless()
+    target = BenchTarget(WORLD_WIDTH // 2, WORLD_HEIGHT // 2)
+    print(f"{'enemies':>8} {'scalar ms':>10} {'batch ms':>10}")
+    for count in counts:
+        timings = []
+        for steering in (None, BatchSteering()):
+            clock = SimulationClock()
+            horde = make_horde(count, target, clock)
+            start = time.perf_counter()
+            for _ in range(ticks):
+                clock.step()
+                if steering is not None:
+                    steering.step(horde, target)
+                for enemy in horde:
+                    enemy.update()
+            timings.append((time.perf_counter() - start) / ticks * 1000)
+        print(f"{count:>8} {timings[0]:>10.3f} {timings[1]:>10.3f}")
+
+
+def bench_depth_sort(counts=(1000, 10000), frames=50, seed=0):
+    # Полная сортировка каждый кадр против устойчивого списка глубины:
+    # каждый кадр половина спрайтов слегка сдвигается, а 2% выходят из обзора и возвращаются
+    print(f"{'sprites':>8} {'sorted ms':>10} {'depth ms':>10} {'matches':>8}")
+    for count in counts:
+        rng = random.Random(seed)
+        sprites = [BenchEnemy(rng.randint(0, WORLD_WIDTH), rng.randint(0, WORLD_HEIGHT)) for _ in range(count)]
+        sequence = {sprite: i for i, sprite in enumerate(sprites)}
+        depth_order = DepthOrder()
+        full_time = depth_time = 0.0
+        matches = True
+        for _ in range(frames):
+            for sprite in rng.sample(sprites, count // 2):
+                sprite.rect.y += rng.randint(-3, 3)
+            hidden = set(rng.sample(sprites, count // 50))
+            visible = [sprite for sprite in sprites if sprite not in hidden]
+
+            start = time.perf_counter()
+            expected = sorted(visible, key=lambda s: (s.rect.bottom, sequence[s]))
+            full_time += time.perf_counter() - start
+
+            start = time.perf_counter()
+            ordered = depth_order.update(visible, sequence)
+            depth_time += time.perf_counter() - start
+            matches = matches and ordered == expected
+        print(f"{count:>8} {full_time / frames * 1000:>10.3f} {depth_time / frames * 1000:>10.3f} {str(matches):>8}")
+
+
+def draw_tiled_background_reference(screen, background, camera_offset):
+    # Прежний способ: блит тайла (tiles_x+3)×(tiles_y+3) раз за кадр – эталон для сравнения
+    bg_width, bg_height = background.get_size()
+    start_x = -int(camera_offset.x) % bg_width - bg_width
+    start_y = -int(camera_offset.y) % bg_height - bg_height
+    tiles_x = (screen.get_width() // bg_width) + 3
+    tiles_y = (screen.get_height() // bg_height) + 3
+    for x in range(start_x, start_x + tiles_x * bg_width, bg_width):
+        for y in range(start_y, start_y + tiles_y * bg_height, bg_height):
+            screen.blit(background, (x, y))
+
+
+def bench_background(resolutions=((1920, 1080), (3840, 2160)), frames=60):
+    # Поклеточный тайлинг против заранее собранного композита на полноэкранных разрешениях
+    init_headless()
+    print(f"{'resolution':>10} {'per-tile ms':>12} {'cached ms':>10} {'matches':>8}")
+    for width, height in resolutions:
+        screen = pygame.Surface((width, height)).convert()
+        reference = screen.copy()
+        # Прежний путь грузил фон с альфа-каналом, новый – без него
+        tile_alpha = pygame.image.load(os.path.join(SPRITES_DIR, "background.png")).convert_alpha()
+        background = TiledBackground(load_sprite("background", "background.png", alpha=False))
+        offset = pygame.Vector2(-1234.5, -777.9)
+
+        draw_tiled_background_reference(reference, tile_alpha, offset)
+        background.draw(screen, offset)
+        matches = pygame.image.tobytes(reference, "RGB") == pygame.image.tobytes(screen, "RGB")
+
+        timings = []
+        for draw, tile in ((draw_tiled_background_reference, tile_alpha), (background.draw, None)):
+            start = time.perf_counter()
+            for frame in range(frames):
+                offset.update(-frame * 7.3, -frame * 4.1)
+                if tile is None:
+                    draw(screen, offset)
+                else:
+                    draw(screen, tile, offset)
+            timings.append((time.perf_counter() - start) / frames * 1000)
+        print(f"{width}x{height:<5} {timings[0]:>12.3f} {timings[1]:>10.3f} {str(matches):>8}")
+
+
+
+# Набор сценариев с сохраненным эталоном
+# Каждый сценарий возвращает медиану времени операции в миллисекундах по нескольким повторам;
+# результаты пишутся в JSON и сравниваются с эталоном, закоммиченным рядом с кодом
+BASELINE_FILE = os.path.join(BASE_DIR, "benchmarks_baseline.json")
+
+
+def best_ms(operation, repeats, warmup=1):
+    # Лучшее из repeats измерений после прогревочных вызовов: паузы планировщика ОС и соседние процессы
+    # только замедляют замер, поэтому минимум воспроизводимее медианы. Сборщик мусора на время замера
+    # отключается, как в timeit. warmup=0 – для операций, меняющих состояние (каждый вызов – отдельный тик)
+    timings = []
+    gc.collect()
+    gc.disable()
+    try:
+        for _ in range(warmup):
+            operation()
+        for _ in range(repeats):
+            start = time.perf_counter()
+            operation()
+            timings.append((time.perf_counter() - start) * 1000)
+    finally:
+        gc.enable()
+    return min(timings)
+
+
+def scenario_collisions(counts=(10, 100, 1000, 5000), ticks=10):
+    # Настоящие скелеты плотной толпой сходятся на игрока; замеряется только разрешение столкновений,
+    # движение врагов между тиками в замер не входит
+    results = {}
+    target = BenchTarget(WORLD_WIDTH // 2, WORLD_HEIGHT // 2)
+    for count in counts:
+        clock = SimulationClock()
+        events = EventBus()
+        scheduler = Scheduler()
+        horde = [Enemy(enemy.rect.center, target, events, clock, scheduler) for enemy in make_crowd(count)]
+        grid = SpatialHash()
+        timings = []
+        for _ in range(ticks):
+            clock.step()
+            for enemy in horde:
+                enemy.update()
+            timings.append(best_ms(lambda: resolve_collisions(horde, grid), 1, warmup=0))
+        results[f"collisions_{count}"] = statistics.median(timings)
+    return results
+
+
+def scenario_render(size=(1920, 1080), count=600, dying_fraction=0.5, frames=30, seed=0):
+    # Полный кадр RenderSystem.render на 1080p: толпа в кадре, половина врагов в разных фазах смерти и затухания
+    from states import RenderSystem
+    rng = random.Random(seed)
+    # Кадры берутся так же, как в игре: из предзагрузки с запеченными вариантами и атласом
+    preload_resources()
+    world = create_world(seed=seed)
+    clock = world.clock
+    for _ in range(300):
+        clock.step()
+
+    camera = Camera(*size)
+    camera.set_world_size(WORLD_WIDTH, WORLD_HEIGHT)
+    for _ in range(60):
+        camera.update(world.player.rect)
+    view = camera.view_rect(0)
+
+    for _ in range(count):
+        enemy = world.factory.create_enemy((rng.randint(view.left, view.right), rng.randint(view.top, view.bottom)),
+                                           world.player)
+        if rng.random() < dying_fraction:
+            enemy.take_damage(enemy.health)
+            # Разносим моменты смерти, чтобы в кадре были и кадры анимации, и ступени затухания
+            enemy.death_start_time = clock.now() - rng.randint(0, 4000)
+        enemy.update()
+        world.enemies.add(enemy)
+        world.all_sprites.add(enemy)
+    world.spatial_index.sync(world.all_sprites)
+    world.remember_positions()
+
+    screen = pygame.Surface(size).convert()
+    render_system = RenderSystem(camera, load_sprite("background", "background.png", alpha=False),
+                                 HudReadout(world.player, lambda: world.level))
+    render_system.render(screen, world, 0.5)
+    return {f"render_{size[1]}p_{count}": best_ms(lambda: render_system.render(screen, world, 0.5), frames)}
+
+
+def scenario_generate_wave(levels=(1, 10, 25, 50), repeats=20, seed=0):
+    # Генерация волн разного размера и суммарно всех уровней с 1 по 50
+    world = create_world(seed=seed)
+    results = {}
+    for level in levels:
+        random.seed(seed)
+        results[f"generate_wave_{level}"] = best_ms(
+            lambda: generate_wave(level, world.player, world.factory), repeats)
+    random.seed(seed)
+    results["generate_wave_1_to_50"] = best_ms(
+        lambda: [generate_wave(level, world.player, world.factory) for level in range(1, 51)], 5)
+
+    # Фоновая выборка точек волны и порция спавна, которую режиссер волн выполняет за один тик
+    for level in levels:
+        results[f"wave_points_{level}"] = best_ms(lambda: poisson_disk_points(seed, wave_size(level) * 3 // 2 + 1),
+                                                  repeats)
+    director = WaveDirector(world.factory, world.player)
+    director.start_wave(levels[-1])
+    batches = len(director.pending) // director.spawns_per_tick
+    # Прогревочный вызов тоже забирает порцию из очереди
+    results["wave_spawn_batch"] = best_ms(director.spawn_batch, min(repeats, batches - 1))
+    return results
+
+
+def scenario_preload(repeats=5):
+    # Холодная предзагрузка после сброса всех кэшей и теплая – с уже заполненными кэшами
+    def cold():
+        clear_caches()
+        preload_resources()
+
+    results = {"preload_cold": best_ms(cold, repeats), "preload_warm": best_ms(preload_resources, repeats)}
+    preload_resources()
+    return results
+
+
+def scenario_snapshot(counts=(1000, 5000), repeats=5, seed=0):
+    # Запись и восстановление снимка мира с толпой врагов, часть из которых умирает
+    from snapshot import dump_world, load_world
+    from game_state import GameState
+    from entities import GameObjectFactory
+    results = {}
+    for count in counts:
+        world = create_world(seed=seed)
+        for enemy in make_crowd(count, seed):
+            horde_enemy = world.factory.create_enemy(enemy.rect.center, world.player)
+            if enemy.state == "dying":
+                horde_enemy.take_damage(horde_enemy.health)
+            world.enemies.add(horde_enemy)
+            world.all_sprites.add(horde_enemy)
+        data = dump_world(world)
+        results[f"snapshot_dump_{count}"] = best_ms(lambda: dump_world(world), repeats)
+        results[f"snapshot_load_{count}"] = best_ms(
+            lambda: load_world(data, GameObjectFactory(NullSoundService(), SimulationClock()),
+                               GameState(save_file=None)), repeats)
+    return results
+
+
+class BenchTimerTarget:
+    def expire(self):
+        pass
+
+
+def scenario_scheduler(counts=(1000, 10000), ticks=300, seed=0):
+    # Очередь событий с разбросанными на 5 с сроками (оглушения, затухания, уборка трупов);
+    # за тик срабатывает лишь малая доля, поэтому стоимость тика почти не растет вместе с очередью
+    rng = random.Random(seed)
+    results = {}
+    target = BenchTimerTarget()
+    for count in counts:
+        scheduler = Scheduler()
+        for _ in range(count):
+            scheduler.schedule(rng.uniform(0, 5000), target, "expire")
+        timings = [best_ms(lambda: scheduler.run(tick * 1000 / 60), 1, warmup=0) for tick in range(ticks)]
+        results[f"scheduler_tick_{count}"] = statistics.median(timings)
+    return results
+
+
+SCENARIOS = {
+    "collisions": scenario_collisions,
+    "render": scenario_render,
+    "generate_wave": scenario_generate_wave,
+    "preload": scenario_preload,
+    "snapshot": scenario_snapshot,
+    "scheduler": scenario_scheduler
+}
+
+
+def calibration_workload(size=20000):
+    # Фиксированная смесь операций интерпретатора (арифметика, словари, строки) – мерило текущей скорости машины
+    table = {}
+    total = 0
+    for i in range(size):
+        table[i & 255] = table.get(i & 255, 0) + i * 3 % 7
+        total += len(str(i))
+    return total
+
+
+def run_suite(names=None, rounds=5):
+    # Каждый сценарий прогоняется несколько раз и берется лучший результат: шум соседних процессов
+    # только замедляет замер, поэтому минимум воспроизводимее между запусками.
+    # Первый прогон прогревочный и не учитывается: импорты, кэши ресурсов и аллокатор еще не прогреты.
+    # Раунды чередуют сценарии, а не повторяют один подряд: всплеск нагрузки на машине длится десятки секунд
+    # и иначе накрыл бы все раунды одного сценария. Перед каждым сценарием замеряется и эталонная нагрузка:
+    # если машина целиком медленнее, чем при записи эталона, сравнение делает поправку на это
+    # (замеры эталона рассыпаны по всему прогону, чтобы их минимум не зависел от одного всплеска)
+    init_headless()
+    names = names or list(SCENARIOS)
+    for name in names:
+        print(f"Warming up {name}...")
+        SCENARIOS[name]()
+    results = {}
+    calibration = None
+    for round_index in range(rounds):
+        print(f"Round {round_index + 1}/{rounds}...")
+        for name in names:
+            value = best_ms(calibration_workload, 3)
+            calibration = value if calibration is None else min(calibration, value)
+            for key, value in SCENARIOS[name]().items():
+                results[key] = min(value, results.get(key, value))
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "pygame": pygame.version.ver,
+            "platform": platform.platform(),
+            "machine": platform.machine()
+        },
+        "calibration_ms": calibration,
+        "results": results
+    }
+
+
+def compare(report, baseline, threshold, min_delta_ms):
+    # Регрессия – сценарий медленнее эталона больше чем на threshold (доля) и на min_delta_ms по абсолютной величине;
+    # абсолютный порог отсекает шум сценариев длительностью в микросекунды.
+    # Эталон имеет смысл только для той же машины, на которой он записан. Текущие замеры приводятся к скорости
+    # машины при записи эталона по отношению эталонных нагрузок: общее замедление машины регрессией не считается
+    regressions = []
+    scale = 1.0
+    if baseline.get("calibration_ms") and report.get("calibration_ms"):
+        scale = baseline["calibration_ms"] / report["calibration_ms"]
+        print(f"Machine speed correction: x{scale:.2f}")
+    print(f"{'scenario':<24} {'baseline ms':>12} {'current ms':>12} {'change':>8}")
+    for name, measured in report["results"].items():
+        current = measured * scale
+        reference = baseline["results"].get(name)
+        if reference is None:
+            print(f"{name:<24} {'-':>12} {current:>12.3f} {'new':>8}")
+            continue
+        change = (current - reference) / reference if reference > 0 else 0.0
+        regressed = change > threshold and current - reference > min_delta_ms
+        print(f"{name:<24} {reference:>12.3f} {current:>12.3f} {change:>+7.0%}{' REGRESSION' if regressed else ''}")
+        if regressed:
+            regressions.append(name)
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pairwise micro-benchmarks or the scenario suite with baseline gate")
+    parser.add_argument("--suite", action="store_true", help="run the scenario suite instead of pairwise comparisons")
+    parser.add_argument("--scenario", action="append", choices=list(SCENARIOS), help="run only these scenarios")
+    parser.add_argument("--output", help="write suite results to this JSON file")
+    parser.add_argument("--rounds", type=int, default=5, help="best-of rounds per scenario")
+    parser.add_argument("--baseline", default=BASELINE_FILE)
+    parser.add_argument("--threshold", type=float, default=0.5, help="allowed slowdown as a fraction of baseline")
+    parser.add_argument("--min-delta-ms", type=float, default=0.1)
+    parser.add_argument("--update-baseline", action="store_true", help="store the results as the new baseline")
+    args = parser.parse_args(argv)
+
+    if not args.suite:
+        bench_collisions()
+        bench_steering()
+        bench_depth_sort()
+        bench_background()
+        return 0
+
+    report = run_suite(args.scenario, args.rounds)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.update_baseline:
+        # Частичный прогон обновляет в эталоне только свои сценарии
+        baseline = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline, "r") as f:
+                baseline = json.load(f)
+        # Частичный прогон приводится к эталонной нагрузке уже записанного эталона, чтобы сценарии
+        # из разных прогонов оставались сравнимы между собой
+        scale = 1.0
+        if baseline.get("calibration_ms") and report["calibration_ms"]:
+            scale = baseline["calibration_ms"] / report["calibration_ms"]
+        else:
+            baseline["calibration_ms"] = report["calibration_ms"]
+        baseline["meta"] = report["meta"]
+        results = {name: value * scale for name, value in report["results"].items()}
+        baseline["results"] = dict(baseline.get("results", {}), **results)
+        with open(args.baseline, "w") as f:
+            json.dump(baseline, f, indent=2)
+        print(f"Baseline updated: {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; run with --update-baseline first")
+        return 1
+    with open(args.baseline, "r") as f:
+        baseline = json.load(f)
+    regressions = compare(report, baseline, args.threshold, args.min_delta_ms)
+    if regressions:
+        print(f"{len(regressions)} scenario(s) regressed more than {args.threshold:.0%}: {', '.join(regressions)}")
+        return 1
+    print("No regressions")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
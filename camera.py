@@ -8,8 +8,13 @@ class Camera:
         self.height = height
         # Начальное смещение камеры, используем для преобразования мировых координат в экранные
         self.offset = pygame.Vector2(0, 0)
+        # Смещение на предыдущем тике симуляции – для интерполяции между тиками при отрисовке
+        self.previous_offset = pygame.Vector2(0, 0)
         # Определяем пределы игрового мира для ограничения перемещения камеры
         self.world_rect = pygame.Rect(0, 0, WORLD_WIDTH, WORLD_HEIGHT)
+        # Кэш области обзора в мировых координатах – отдельный для каждого буфера: отсечение и звук
+        # запрашивают разные буферы в одном кадре, и общий прямоугольник пересчитывался бы при каждом запросе
+        self._view_rects = {}  # буфер -> [смещение, прямоугольник]
 
     def set_world_size(self, world_width, world_height):
         # Задаем размеры мира, чтобы камера оставалась в рамках игрового поля
@@ -20,7 +25,7 @@ class Camera:
         # Преобразуем координаты объекта, учитывая текущее смещение камеры, для корректной отрисовки на экране
         return rect.move(self.offset.x, self.offset.y)
 
-    def update(self, target_rect):
+    def ideal_offset(self, target_rect):
         # Вычисляем идеальное положение камеры: цель должна оказаться по центру экрана
         ideal_x = -target_rect.centerx + self.width // 2
         ideal_y = -target_rect.centery + self.height // 2
@@ -30,14 +35,41 @@ class Camera:
         ideal_y = min(0, ideal_y)
         ideal_x = max(-(self.world_rect.width - self.width), ideal_x)
         ideal_y = max(-(self.world_rect.height - self.height), ideal_y)
+        return ideal_x, ideal_y
+
+    def snap(self, target_rect):
+        # Мгновенно наводим камеру на цель без плавного перехода (например, при восстановлении забега)
+        self.offset.update(self.ideal_offset(target_rect))
+        self.previous_offset.update(self.offset)
+
+    def update(self, target_rect):
+        self.previous_offset.update(self.offset)
+        ideal_x, ideal_y = self.ideal_offset(target_rect)
 
         # Плавно приближаем текущее смещение к рассчитанному идеальному положению
         self.offset.x += (ideal_x - self.offset.x) * CAMERA_SMOOTHNESS
         self.offset.y += (ideal_y - self.offset.y) * CAMERA_SMOOTHNESS
 
+    def interpolated_offset(self, alpha):
+        # Смещение камеры между предыдущим и текущим тиком в доле alpha
+        return self.previous_offset.lerp(self.offset, alpha)
+
+    def view_rect(self, buffer=0):
+        # Область видимости с запасом (буфер) в мировых координатах; пересчитывается только при сдвиге камеры
+        key = (int(self.offset.x), int(self.offset.y))
+        cached = self._view_rects.get(buffer)
+        if cached is None:
+            cached = self._view_rects[buffer] = [None, pygame.Rect(0, 0, 0, 0)]
+        if key != cached[0]:
+            cached[0] = key
+            cached[1].update(-key[0] - buffer, -key[1] - buffer, self.width + 2 * buffer, self.height + 2 * buffer)
+        return cached[1]
+
     def is_visible(self, rect, buffer=0):
-        # Формируем область видимости с дополнительным запасом (буфер) для оптимизации отрисовки объектов
-        view_rect = pygame.Rect(-buffer, -buffer, self.width + 2 * buffer, self.height + 2 * buffer)
-        temp_rect = rect.move(self.offset.x, self.offset.y)
-        # Проверяем пересечение объекта с областью видимости экрана
-        return view_rect.colliderect(temp_rect)
+        # Проверяем пересечение объекта с областью видимости экрана без создания временных прямоугольников
+        return self.view_rect(buffer).colliderect(rect)
+
+    def query_visible(self, spatial_index, buffer=0):
+        # Возвращает только объекты из пространственного индекса, попадающие в расширенную область обзора
+        view = self.view_rect(buffer)
+        return [item for item in spatial_index.query_rect(view) if view.colliderect(item.rect)]
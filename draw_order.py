@@ -0,0 +1,30 @@
+# Сдвиг, под которым порядковый номер спрайта упаковывается в ключ сортировки рядом с нижней границей
+SEQUENCE_BITS = 32
+
+
+# Устойчивый список отрисовки, упорядоченный по нижней границе спрайтов (y-sort)
+# Между кадрами объекты почти не двигаются, поэтому список не строится заново, а «чинится»:
+# из него убираются ушедшие из обзора спрайты, дописываются появившиеся, после чего
+# выполняется сортировка на месте. Timsort находит уже упорядоченные участки и на почти
+# отсортированных данных сводится к проходу вставками, то есть работает почти за O(n)
+class DepthOrder:
+    def __init__(self):
+        self.order = []
+
+    def update(self, visible, sequence):
+        # visible – спрайты, видимые в этом кадре; sequence – порядок добавления в группу для равных границ
+        visible_set = set(visible)
+        order = self.order
+        if len(order) != len(visible_set) or not visible_set.issuperset(order):
+            kept = [sprite for sprite in order if sprite in visible_set]
+            if len(kept) != len(visible_set):
+                kept_set = set(kept)
+                kept.extend(sprite for sprite in visible if sprite not in kept_set)
+            order = self.order = kept
+
+        # Единый целочисленный ключ сравнивается быстрее кортежа (bottom, sequence)
+        order.sort(key=lambda s: (s.rect.bottom << SEQUENCE_BITS) + sequence[s])
+        return order
+
+    def clear(self):
+        self.order = []
@@ -1,6 +1,6 @@
 import pygame
 import math
-from resources import load_sprite_sheet
+from resources import load_sprite_sheet, get_frame_variant
 
 class SwordSwingEffect(pygame.sprite.Sprite):
     # Карта параметров дуговой атаки для различных направлений
@@ -12,17 +12,21 @@ class SwordSwingEffect(pygame.sprite.Sprite):
         "down": (60, 120, (0, 0.5))
     }
 
-    # Определяет преобразования кадров для корректного визуального отображения направления атаки
+    # Определяет преобразования кадров (отражение, угол поворота) для корректного отображения направления атаки
+    # Сами повернутые кадры заранее подготовлены в кэше вариантов ресурсов
     ROTATION_MAP = {
-        "left": lambda frames: [pygame.transform.flip(f, True, False) for f in frames],
-        "up": lambda frames: [pygame.transform.rotate(f, 90) for f in frames],
-        "down": lambda frames: [pygame.transform.rotate(f, -90) for f in frames]
+        "left": (True, 0),
+        "up": (False, 90),
+        "down": (False, -90)
     }
 
     def __init__(self, player, enemy_group, duration=200, scale=(50, 50), arc_radius=60):
         super().__init__()
         # Загружаем спрайт-лист удара мечом с нужным масштабом для создания эффекта атаки
         self.frames = load_sprite_sheet("slash_effect", "slash_effect.png", 3, 3, scale)
+        self.scale = scale
+        # Направление удара фиксируется в момент создания: от него зависят дуга и поворот кадров
+        self.direction = player.direction
 
         # Устанавливаем начальное состояние анимации
         self.frame_index = 0
@@ -35,7 +39,8 @@ class SwordSwingEffect(pygame.sprite.Sprite):
         # Инициализируем параметры временного контроля эффекта
         self.duration = duration
         self.elapsed = 0
-        self.last_update = pygame.time.get_ticks()
+        self.clock = player.clock
+        self.last_update = self.clock.now()
 
         # Настраиваем параметры атаки: радиус дуги и урон берутся из состояния игрока
         self.arc_radius = arc_radius
@@ -49,7 +54,8 @@ class SwordSwingEffect(pygame.sprite.Sprite):
 
         # Корректируем кадры анимации, если направление игрока требует поворота
         if player.direction in self.ROTATION_MAP:
-            self.frames = self.ROTATION_MAP[player.direction](self.frames)
+            flip_x, angle = self.ROTATION_MAP[player.direction]
+            self.frames = [get_frame_variant("slash_effect", i, flip_x, angle) for i in range(len(self.frames))]
 
     def setup_angles(self):
         # Определяем диапазон углов для движения эффекта, чтобы он соответствовал направлению удара
@@ -77,8 +83,9 @@ class SwordSwingEffect(pygame.sprite.Sprite):
 
     def update(self):
         # Обновляем анимацию эффекта на основе прошедшего времени для достижения плавности движения
-        now = pygame.time.get_ticks()
+        now = self.clock.now()
         dt = now - self.last_update
+        self.last_update = now
         self.elapsed += dt
 
         # Рассчитываем текущий кадр в зависимости от прогресса анимации
@@ -1,8 +1,15 @@
 import pygame
 import random
 import math
-from resources import load_sprite_sheet, load_sprite
-from settings import WORLD_WIDTH, WORLD_HEIGHT, PLAYER_BASE_HP, ENEMY_SPAWN_MARGIN
+from resources import load_sprite_sheet, load_sprite, get_frame_variant
+from spatial import SpatialHash
+from scheduler import Scheduler
+from event_bus import EventBus, SPAWNED, DAMAGED, ATTACKED, DIED, DECAYED
+from settings import (
+    WORLD_WIDTH, WORLD_HEIGHT, PLAYER_BASE_HP, ENEMY_SPAWN_MARGIN,
+    ENEMY_BASE_SPEED, ENEMY_BASE_HEALTH, ENEMY_ATTACK_RANGE, ENEMY_DAMAGE_FRAME, ENEMY_FADE_DURATION,
+    ENEMY_HIT_DURATION, CORPSE_DESPAWN_TIME
+)
 
 # Конфигурация анимационных диапазонов для игрока по направлениям
 PLAYER_ANIMATIONS = {
@@ -14,29 +21,48 @@ PLAYER_ANIMATIONS = {
 
 # Централизованная фабрика игровых объектов для единообразного создания сущностей
 class GameObjectFactory:
-    def __init__(self, sound_service):
+    def __init__(self, sound_service, clock):
         # Инициализация с передачей сервиса звука для использования аудиоэффектов
+        # и часов симуляции, от которых отсчитываются все игровые таймеры
         self.sound_service = sound_service
+        self.clock = clock
+        # Шина событий жизненного цикла: созданные фабрикой сущности сообщают в нее о появлении, уроне и смерти
+        self.events = EventBus()
+        # Планировщик событий мира: объекты регистрируют сроки вместо опроса своих таймеров каждый тик
+        self.scheduler = Scheduler()
+        # Убитые враги возвращаются в пул и переиспользуются следующими волнами
+        self.enemy_pool = EnemyPool(self.events, clock, self.scheduler)
 
     def create_player(self, pos, game_state):
         # Создает объект игрока, связывая его с текущим игровым состоянием
-        return Player(pos, game_state, self.sound_service)
+        player = Player(pos, game_state, self.events, self.clock)
+        self.events.emit(SPAWNED, player)
+        return player
 
-    def create_enemy(self, pos, target):
-        # Создает врага, целенаправленно ориентированного на заданную цель
-        return Enemy(pos, target, self.sound_service)
+    def create_enemy(self, pos, target, archetype="skeleton"):
+        # Берет врага нужного вида из пула (или создает нового), ориентированного на заданную цель
+        enemy = self.enemy_pool.acquire(pos, target, archetype)
+        self.events.emit(SPAWNED, enemy)
+        return enemy
 
     def create_healing_item(self, pos, player):
         # Создает аптечку для восстановления здоровья, привязанную к игроку
-        return HealingItem(pos, player)
+        healing_item = HealingItem(pos, player, self.clock)
+        self.events.emit(SPAWNED, healing_item)
+        return healing_item
 
 
 class Player(pygame.sprite.Sprite):
-    def __init__(self, pos, game_state, sound_service):
+    event_group = "player"
+
+    def __init__(self, pos, game_state, events, clock):
         super().__init__()
-        # Связываем объект игрока с игровым состоянием и звуковым сервисом
+        # Связываем объект игрока с игровым состоянием, шиной событий и часами симуляции
         self.game_state = game_state
-        self.sound_service = sound_service
+        self.events = events
+        self.clock = clock
+        # Источник состояния клавиш; в безоконном режиме подменяется сценарием ввода
+        self.input_source = pygame.key.get_pressed
 
         # Задаем базовые характеристики игрока, используемые при обновлении статов
         self.base_speed = 5
@@ -53,7 +79,7 @@ class Player(pygame.sprite.Sprite):
         self.image = self.current_animation[0]
         self.rect = self.image.get_rect(center=pos)
         self.animation_speed = 200
-        self.last_update = pygame.time.get_ticks()
+        self.last_update = clock.now()
 
         # Загружаем изображения для индикатора здоровья и отображаем текущий статус
         self.health_bar_images = load_sprite_sheet("health", "health_bar.png", 5, 1, (256, 64))
@@ -80,12 +106,17 @@ class Player(pygame.sprite.Sprite):
         return self.current_hp_image
 
     def take_damage(self, damage=1):
-        # Обрабатывает урон игрока и обновляет индикатор здоровья; уничтожает объект при полном исчерпании здоровья
+        # Обрабатывает урон игрока и обновляет индикатор здоровья; уничтожает объект при полном исчерпании здоровья.
+        # Удары, пришедшие в тот же тик после смертельного, игнорируются: смерть сообщается ровно один раз
+        if self.hits >= self.max_hits:
+            return
         self.hits = min(self.hits + damage, self.max_hits)
         self.update_hp_bar()
-        self.sound_service.play("player_damage")
         if self.hits >= self.max_hits:
+            self.events.emit(DIED, self)
             self.kill()
+        else:
+            self.events.emit(DAMAGED, self, damage)
 
     def heal(self, amount=1):
         # Восстанавливает здоровье, уменьшая накопленный урон
@@ -102,7 +133,7 @@ class Player(pygame.sprite.Sprite):
 
     def update(self):
         # Обрабатывает ввод и перемещение игрока, обновляя анимацию и обеспечивая цикличность игрового поля
-        keys = pygame.key.get_pressed()
+        keys = self.input_source()
         dx = dy = 0
         new_direction = self.direction
         is_moving = False
@@ -142,7 +173,7 @@ class Player(pygame.sprite.Sprite):
             self.current_animation = self.animations[self.direction]
             self.frame_index = 0
 
-        now = pygame.time.get_ticks()
+        now = self.clock.now()
         if not is_moving:
             self.frame_index = 0
         elif now - self.last_update > self.animation_speed:
@@ -152,10 +183,51 @@ class Player(pygame.sprite.Sprite):
         self.image = self.current_animation[self.frame_index]
 
     def attack(self, effects_group, enemy_group):
-        # Запускает эффект атаки мечом и воспроизводит соответствующий звуковой сигнал
+        # Запускает эффект атаки мечом и сообщает об ударе (звук воспроизводит подписчик)
         from effects import SwordSwingEffect
         effects_group.add(SwordSwingEffect(self, enemy_group, 200, (50, 50), 15))
-        self.sound_service.play("sword_attack")
+        self.events.emit(ATTACKED, self)
+
+
+# Вид врага: листы анимаций и базовые характеристики, общие для всех его экземпляров.
+# Листы ищутся в кэше ресурсов один раз на вид, а не при каждом появлении врага
+class EnemyArchetype:
+    def __init__(self, name, sheets, speed, health, attack_range, damage_frame, fade_duration):
+        self.name = name
+        # Имена листов по назначению – по ним же берутся отраженные и полупрозрачные варианты кадров
+        self.walk_sheet, self.attack_sheet, self.death_sheet, self.hit_sheet = (sheet[0] for sheet in sheets)
+        self.walk_animations, self.attack_animations, self.death_animations, self.hit_animations = (
+            load_sprite_sheet(*sheet) for sheet in sheets)
+        self.speed = speed
+        self.health = health
+        self.attack_range = attack_range
+        self.damage_frame = damage_frame
+        self.fade_duration = fade_duration
+
+
+# Описание видов врагов: листы (ходьба, атака, смерть, попадание) и характеристики
+ENEMY_ARCHETYPES = {
+    "skeleton": {
+        "sheets": (("skeleton_walk", "skeleton_walk.png", 1, 13, (50, 70)),
+                   ("skeleton_attack", "skeleton_attack.png", 1, 18, (80, 80)),
+                   ("skeleton_dead", "skeleton_dead.png", 1, 15, (50, 70)),
+                   ("skeleton_hit", "skeleton_hit.png", 1, 8, (50, 70))),
+        "speed": ENEMY_BASE_SPEED,
+        "health": ENEMY_BASE_HEALTH,
+        "attack_range": ENEMY_ATTACK_RANGE,
+        "damage_frame": ENEMY_DAMAGE_FRAME,
+        "fade_duration": ENEMY_FADE_DURATION
+    }
+}
+# Созданные виды; кадры загружаются при первом обращении, когда уже есть видеорежим
+ARCHETYPE_CACHE = {}
+
+
+def get_archetype(name):
+    archetype = ARCHETYPE_CACHE.get(name)
+    if archetype is None:
+        archetype = ARCHETYPE_CACHE[name] = EnemyArchetype(name, **ENEMY_ARCHETYPES[name])
+    return archetype
 
 
 class Enemy(pygame.sprite.Sprite):
@@ -163,37 +235,64 @@ class Enemy(pygame.sprite.Sprite):
     STATE_ATTACK = "attacking"
     STATE_HIT = "hit"
     STATE_DYING = "dying"
-
-    def __init__(self, pos, target, sound_service):
+    event_group = "enemy"
+
+    # Состояние врага в слотах; у базового pygame.sprite.Sprite слотов нет, поэтому __dict__ остается,
+    # но в нем хранится только служебный набор групп спрайта
+    __slots__ = (
+        "clock", "archetype", "walk_animations", "attack_animations", "death_animations", "hit_animations",
+        "state", "frame_index", "image", "rect", "last_update", "speed", "target", "health", "attack_range",
+        "damage_frame", "attacked", "death_animation_completed", "death_start_time", "death_completed_time",
+        "fade_start_time", "fade_duration", "alpha", "hit_start_time", "events", "steering",
+        "scheduler", "hit_timer"
+    )
+
+    def __init__(self, pos, target, events, clock, scheduler, archetype=None):
         super().__init__()
-        # Загружает набор анимаций для различных состояний врага
-        self.walk_animations = load_sprite_sheet("skeleton_walk", "skeleton_walk.png", 1, 13, (50, 70))
-        self.attack_animations = load_sprite_sheet("skeleton_attack", "skeleton_attack.png", 1, 18, (80, 80))
-        self.death_animations = load_sprite_sheet("skeleton_dead", "skeleton_dead.png", 1, 15, (50, 70))
-        self.hit_animations = load_sprite_sheet("skeleton_hit", "skeleton_hit.png", 1, 8, (50, 70))
+        self.clock = clock
+        self.scheduler = scheduler
+        self.events = events
+        self.rect = None
+        self.reset(pos, target, archetype or get_archetype("skeleton"))
+
+    def reset(self, pos, target, archetype):
+        # Приводит врага в начальное состояние – и новый экземпляр, и взятый повторно из пула
+        self.archetype = archetype
+        # Наборы анимаций для различных состояний врага берутся из вида
+        self.walk_animations = archetype.walk_animations
+        self.attack_animations = archetype.attack_animations
+        self.death_animations = archetype.death_animations
+        self.hit_animations = archetype.hit_animations
         self.state = self.STATE_WALK
         self.frame_index = 0
         self.image = self.walk_animations[0]
-        self.rect = self.image.get_rect(center=pos)
-        self.last_update = pygame.time.get_ticks()
-        self.speed = 3
+        if self.rect is None:
+            self.rect = self.image.get_rect(center=pos)
+        else:
+            self.rect.size = self.image.get_size()
+            self.rect.center = pos
+        self.last_update = self.clock.now()
+        self.speed = archetype.speed
         self.target = target
-        self.health = 3
-        self.attack_range = 30
-        self.damage_frame = 7
+        self.health = archetype.health
+        self.attack_range = archetype.attack_range
+        self.damage_frame = archetype.damage_frame
         self.attacked = False
         self.death_animation_completed = False
         self.death_start_time = None
         self.death_completed_time = None
         self.fade_start_time = None
-        self.fade_duration = 2000
+        self.fade_duration = archetype.fade_duration
         self.alpha = 255
         self.hit_start_time = None
-        self.sound_service = sound_service
+        # Событие окончания оглушения в планировщике мира
+        self.hit_timer = None
+        # Результат пакетного расчета движения (состояние, позиция) на текущий тик
+        self.steering = None
 
     def update(self):
         # Основной цикл обновления состояния врага, выбирающий поведение в зависимости от дистанции до цели
-        now = pygame.time.get_ticks()
+        now = self.clock.now()
 
         if self.state == self.STATE_DYING:
             self.handle_death_state(now)
@@ -203,15 +302,21 @@ class Enemy(pygame.sprite.Sprite):
             self.handle_hit_state(now)
             return
 
-        distance = math.hypot(
-            self.target.rect.centerx - self.rect.centerx,
-            self.target.rect.centery - self.rect.centery
-        )
-
-        self.state = self.STATE_ATTACK if distance < self.attack_range else self.STATE_WALK
+        if self.steering is not None:
+            # Пакетный режим: состояние и новая позиция уже рассчитаны векторизованным проходом
+            self.state, destination = self.steering
+            self.steering = None
+            distance = None
+        else:
+            distance = math.hypot(
+                self.target.rect.centerx - self.rect.centerx,
+                self.target.rect.centery - self.rect.centery
+            )
+            self.state = self.STATE_ATTACK if distance < self.attack_range else self.STATE_WALK
+            destination = None
 
         if self.state == self.STATE_WALK:
-            self.handle_walk_state(now, distance)
+            self.handle_walk_state(now, distance, destination)
         elif self.state == self.STATE_ATTACK:
             self.handle_attack_state(now)
 
@@ -227,35 +332,42 @@ class Enemy(pygame.sprite.Sprite):
             if self.death_completed_time is None:
                 self.death_completed_time = now
                 self.fade_start_time = now
+                self.events.emit(DECAYED, self)
+                # Конец затухания и уборку трупа обрабатывает мир по сроку, без опроса всех врагов
+                self.scheduler.schedule(now + self.fade_duration, self, "hide_corpse")
+                self.scheduler.schedule(now + CORPSE_DESPAWN_TIME, self, "despawn_corpse")
 
         if self.fade_start_time:
             fade_elapsed = now - self.fade_start_time
             self.alpha = max(0, 255 - int(255 * min(1.0, fade_elapsed / self.fade_duration)))
-            self.image.set_alpha(self.alpha)
+            # Берем заранее подготовленный полупрозрачный вариант, не трогая общий кадр других скелетов
+            self.image = get_frame_variant(self.archetype.death_sheet, self.frame_index, alpha=self.alpha)
 
     def handle_hit_state(self, now):
-        # Обрабатывает ситуацию, когда враг получает урон, переключая анимацию при кратковременном эффекте попадания
+        # Проигрывает анимацию попадания; выход из оглушения наступает по событию end_hit планировщика
         elapsed = now - self.hit_start_time
-        frame_duration = 500 / len(self.hit_animations)
-        self.frame_index = min(int(elapsed / frame_duration), len(self.hit_animations))
+        frame_duration = ENEMY_HIT_DURATION / len(self.hit_animations)
+        self.frame_index = min(int(elapsed / frame_duration), len(self.hit_animations) - 1)
+        self.image = self.facing_frame(self.archetype.hit_sheet, self.frame_index)
 
-        if self.frame_index >= len(self.hit_animations):
-            self.state = self.STATE_WALK
-            self.frame_index = 0
-            self.image = self.walk_animations[0]
-        else:
-            self.image = self.hit_animations[self.frame_index]
-            self.mirror_image()
+    def end_hit(self):
+        # Срок оглушения истек – враг возвращается к преследованию цели
+        self.hit_timer = None
+        self.state = self.STATE_WALK
+        self.frame_index = 0
+        self.image = self.walk_animations[0]
 
-    def handle_walk_state(self, now, distance):
+    def handle_walk_state(self, now, distance, destination=None):
         # Управляет движением врага к цели с регулярной сменой кадров и проверкой границ игрового мира
         if now - self.last_update > 50:
             self.last_update = now
             self.frame_index = (self.frame_index + 1) % len(self.walk_animations)
-            self.image = self.walk_animations[self.frame_index]
-            self.mirror_image()
+            self.image = self.facing_frame(self.archetype.walk_sheet, self.frame_index)
 
-        if distance > 0:
+        if destination is not None:
+            # Позиция с учетом цикличности мира уже вычислена пакетным проходом
+            self.rect.topleft = destination
+        elif distance > 0:
             move_x = int((self.target.rect.centerx - self.rect.centerx) / distance * self.speed)
             move_y = int((self.target.rect.centery - self.rect.centery) / distance * self.speed)
 
@@ -278,6 +390,7 @@ class Enemy(pygame.sprite.Sprite):
             self.frame_index += 1
 
             if self.frame_index == self.damage_frame and not self.attacked:
+                self.events.emit(ATTACKED, self)
                 if self.rect.colliderect(self.target.rect):
                     self.target.take_damage(1)
                 self.attacked = True
@@ -288,13 +401,11 @@ class Enemy(pygame.sprite.Sprite):
                 self.attacked = False
                 self.image = self.walk_animations[0]
             else:
-                self.image = self.attack_animations[self.frame_index]
-                self.mirror_image()
+                self.image = self.facing_frame(self.archetype.attack_sheet, self.frame_index)
 
-    def mirror_image(self):
-        # Отражает изображение врага для корректного отображения направления движения
-        if self.target.rect.centerx < self.rect.centerx:
-            self.image = pygame.transform.flip(self.image, True, False)
+    def facing_frame(self, sheet, index):
+        # Возвращает кадр, отраженный для корректного отображения направления движения, из кэша вариантов
+        return get_frame_variant(sheet, index, flip_x=self.target.rect.centerx < self.rect.centerx)
 
     def take_damage(self, amount=1):
         # Обрабатывает получение урона врагом, переходя в соответствующее состояние анимации
@@ -302,25 +413,68 @@ class Enemy(pygame.sprite.Sprite):
             return
 
         self.health = max(0, self.health - amount)
+        # Повторное попадание перезапускает оглушение, а смерть отменяет его
+        self.scheduler.cancel(self.hit_timer)
+        self.hit_timer = None
         if self.health <= 0:
             self.state = self.STATE_DYING
             self.frame_index = 0
-            self.death_start_time = pygame.time.get_ticks()
+            self.death_start_time = self.clock.now()
             self.death_animation_completed = False
             self.death_completed_time = None
             self.fade_start_time = None
             self.alpha = 255
-            self.sound_service.play("skeleton_death")
+            self.events.emit(DIED, self)
         else:
             self.state = self.STATE_HIT
             self.frame_index = 0
-            self.hit_start_time = pygame.time.get_ticks()
-            self.sound_service.play("skeleton_damage")
+            self.hit_start_time = self.clock.now()
+            self.hit_timer = self.scheduler.schedule(self.hit_start_time + ENEMY_HIT_DURATION, self, "end_hit")
+            self.events.emit(DAMAGED, self, amount)
+
+
+# Пул врагов: убранные трупы не уничтожаются, а ждут следующей волны в списке свободных своего вида,
+# поэтому в долгой сессии число объектов врагов не растет и сборщику мусора нечего собирать
+class EnemyPool:
+    def __init__(self, events, clock, scheduler):
+        self.events = events
+        self.clock = clock
+        self.scheduler = scheduler
+        self.free = {}  # имя вида -> свободные экземпляры
+        self.stats = {"created": 0, "reused": 0, "released": 0}
+
+    def acquire(self, pos, target, archetype="skeleton"):
+        free = self.free.get(archetype)
+        if free:
+            enemy = free.pop()
+            enemy.reset(pos, target, get_archetype(archetype))
+            self.stats["reused"] += 1
+            return enemy
+        self.stats["created"] += 1
+        return Enemy(pos, target, self.events, self.clock, self.scheduler, get_archetype(archetype))
+
+    def release(self, enemy):
+        # Убирает врага из всех групп и возвращает в пул; ссылка на цель сбрасывается, чтобы не держать игрока
+        enemy.kill()
+        enemy.target = None
+        self.free.setdefault(enemy.archetype.name, []).append(enemy)
+        self.stats["released"] += 1
+
+    def report(self):
+        # Заполненность пула: создано всего, в игре, свободно и доля повторных выдач
+        free = sum(len(enemies) for enemies in self.free.values())
+        acquired = self.stats["created"] + self.stats["reused"]
+        reuse = self.stats["reused"] / acquired if acquired else 0.0
+        return (f"enemies created {self.stats['created']}, in use {self.stats['created'] - free}, free {free}, "
+                f"reused {self.stats['reused']} ({reuse:.0%})")
 
 
 class HealingItem(pygame.sprite.Sprite):
-    def __init__(self, pos, player, speed=3):
+    event_group = "healing_item"
+
+    def __init__(self, pos, player, clock, speed=3):
         super().__init__()
+        self.clock = clock
         # Инициализирует аптечку с анимацией и случайной целью движения в пределах мира
         self.animations = load_sprite_sheet("meep_moop", "meep_moop.png", 1, 2, (50, 65))
         self.image = self.animations[0]
@@ -344,35 +498,47 @@ class HealingItem(pygame.sprite.Sprite):
         move_vec = (self.dest - self.pos).normalize() * self.speed
         self.pos += move_vec
         self.rect.center = (int(self.pos.x), int(self.pos.y))
-        self.image = self.animations[0] if pygame.time.get_ticks() % 200 < 100 else self.animations[1]
+        self.image = self.animations[0] if self.clock.now() % 200 < 100 else self.animations[1]
 
 
-def resolve_collisions(enemies):
+def resolve_collisions(enemies, grid=None):
     # Корректирует позиционирование врагов, предотвращая их наложение при столкновениях
-    enemy_list = list(enemies)
+    # Умирающие враги в разрешении столкновений не участвуют, поэтому сразу отбрасываем их
+    enemy_list = [enemy for enemy in enemies if enemy.state != "dying"]
+
+    # Широкая фаза: раскладываем врагов по сетке и проверяем только соседей по ячейкам
+    if grid is None:
+        grid = SpatialHash()
+    grid.rebuild(enemy_list)
+    order = {enemy: i for i, enemy in enumerate(enemy_list)}
+
+    # Пары обходятся в том же порядке (i < j), что и при полном переборе,
+    # поэтому последовательные смещения дают прежний результат
+    for i, e1 in enumerate(enemy_list):
+        candidates = {order[e2] for e2 in grid.nearby(e1)}
+        for j in sorted(j for j in candidates if j > i):
+            separate_enemies(e1, enemy_list[j])
 
-    for i in range(len(enemy_list)):
-        for j in range(i + 1, len(enemy_list)):
-            e1, e2 = enemy_list[i], enemy_list[j]
 
-            # Пропускает обработку, если враг умирает или прямого столкновения не происходит
-            if e1.state == "dying" or e2.state == "dying" or not e1.rect.colliderect(e2.rect):
-                continue
+def separate_enemies(e1, e2):
+    # Пропускает обработку, если прямого столкновения не происходит
+    if not e1.rect.colliderect(e2.rect):
+        return
 
-            dx = e2.rect.centerx - e1.rect.centerx
-            dy = e2.rect.centery - e1.rect.centery
+    dx = e2.rect.centerx - e1.rect.centerx
+    dy = e2.rect.centery - e1.rect.centery
 
-            # Рассчитывает расстояние между центрами для определения степени перекрытия
-            dist = max(1, math.hypot(dx, dy))
-            overlap = (e1.rect.width / 2 + e2.rect.width / 2) - dist
+    # Рассчитывает расстояние между центрами для определения степени перекрытия
+    dist = max(1, math.hypot(dx, dy))
+    overlap = (e1.rect.width / 2 + e2.rect.width / 2) - dist
 
-            if overlap > 0:
-                # Вычисляет нормализованный вектор смещения для устранения наложения объектов
-                shift_x = (dx / dist) * (overlap / 2)
-                shift_y = (dy / dist) * (overlap / 2)
+    if overlap > 0:
+        # Вычисляет нормализованный вектор смещения для устранения наложения объектов
+        shift_x = (dx / dist) * (overlap / 2)
+        shift_y = (dy / dist) * (overlap / 2)
 
-                e1.rect.x -= shift_x  # Смещает первого врага назад от центра столкновения
-                e1.rect.y -= shift_y
+        e1.rect.x -= shift_x  # Смещает первого врага назад от центра столкновения
+        e1.rect.y -= shift_y
 
-                e2.rect.x += shift_x  # Смещает второго врага вперед в противоположном направлении
-                e2.rect.y += shift_y
+        e2.rect.x += shift_x  # Смещает второго врага вперед в противоположном направлении
+        e2.rect.y += shift_y
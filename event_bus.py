@@ -0,0 +1,65 @@
+from collections import defaultdict
+
+# События жизненного цикла сущностей мира
+SPAWNED = "spawned"
+DAMAGED = "damaged"  # урон без смерти; смертельный удар сообщается событием DIED
+ATTACKED = "attacked"
+DIED = "died"
+DECAYED = "decayed"  # анимация смерти закончилась, остался труп
+DESPAWNED = "despawned"
+PICKED_UP = "picked_up"
+
+# Стадии жизненного цикла, по которым ведутся счетчики групп
+ALIVE = "alive"
+DYING = "dying"
+CORPSE = "corpse"
+
+# Переход между стадиями, который означает событие: (из стадии, в стадию); None – сущности нет в мире
+TRANSITIONS = {
+    SPAWNED: (None, ALIVE),
+    DIED: (ALIVE, DYING),
+    DECAYED: (DYING, CORPSE),
+    DESPAWNED: (CORPSE, None),
+    PICKED_UP: (ALIVE, None)
+}
+
+
+# Шина событий мира: сущности сообщают о происшествиях, а завершение волны, звук и статистика
+# подписываются на них вместо опроса всех объектов каждый кадр.
+# Группа сущности берется из ее атрибута event_group; счетчики стадий по группам обновляются
+# при каждом событии за O(1)
+class EventBus:
+    def __init__(self):
+        self.subscribers = defaultdict(list)  # событие -> обработчики handler(event, entity, *args)
+        self.counts = defaultdict(lambda: {ALIVE: 0, DYING: 0, CORPSE: 0})
+        self.totals = defaultdict(int)  # (группа, событие) -> сколько раз произошло
+
+    def subscribe(self, event, handler):
+        self.subscribers[event].append(handler)
+
+    def unsubscribe(self, event, handler):
+        self.subscribers[event].remove(handler)
+
+    def emit(self, event, entity, *args):
+        group = entity.event_group
+        transition = TRANSITIONS.get(event)
+        if transition is not None:
+            self.move(group, *transition)
+        self.totals[group, event] += 1
+        for handler in self.subscribers.get(event, ()):
+            handler(event, entity, *args)
+
+    def move(self, group, source, target):
+        # Перевод сущности между стадиями без оповещения подписчиков (нужен и при восстановлении снимка)
+        counts = self.counts[group]
+        if source is not None:
+            counts[source] -= 1
+        if target is not None:
+            counts[target] += 1
+
+    def count(self, group, stage):
+        return self.counts[group][stage]
+
+    def report(self, group):
+        counts = self.counts[group]
+        return f"{counts[ALIVE]} alive, {counts[DYING]} dying, {counts[CORPSE]} corpses"
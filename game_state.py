@@ -1,6 +1,7 @@
 import json
 import os
 from dataclasses import dataclass, asdict
+from save_writer import SAVE_WRITER
 
 # Хранение прогресса игрока между игровыми сессиями
 @dataclass
@@ -54,16 +55,18 @@ class GameSession:
 class GameState:
     SAVE_FILE = "save.json"
 
-    def __init__(self):
+    def __init__(self, save_file=SAVE_FILE):
+        # save_file=None отключает работу с диском (безоконные прогоны и замеры)
+        self.save_file = save_file
         self.progress = PlayerProgress()
         self.session = GameSession()
         self.game = None
         self.load()  # Если есть сохраненные данные, загрузим их
 
     def load(self):  # Загружаем предыдущий прогресс при наличии файла сохранения
-        if os.path.exists(self.SAVE_FILE):
+        if self.save_file and os.path.exists(self.save_file):
             try:
-                with open(self.SAVE_FILE, "r") as f:
+                with open(self.save_file, "r") as f:
                     data = json.load(f)
                     self.progress = PlayerProgress(**data.get("progress", {}))
                     self.session = GameSession(**data.get("session", {}))
@@ -71,12 +74,13 @@ class GameState:
                 print(f"Failed to load save file: {e}")
 
     def save(self):
-        # Сохраняем текущие данные прогресса и сессии в файл
-        with open(self.SAVE_FILE, "w") as f:
-            json.dump({
-                "progress": asdict(self.progress),
-                "session": asdict(self.session)
-            }, f)
+        # Снимок прогресса и сессии делается сразу, а запись в файл – в фоне (см. SaveWriter)
+        if not self.save_file:
+            return
+        SAVE_WRITER.submit(self.save_file, {
+            "progress": asdict(self.progress),
+            "session": asdict(self.session)
+        })
 
     def start_new_game(self):
         # Запускаем новую игру с перерасчетом максимального здоровья
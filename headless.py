@@ -0,0 +1,188 @@
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import pygame
+from settings import ATTACK_COOLDOWN, ENEMY_STEERING_MODE
+
+
+def init_headless():
+    # Фиктивные драйверы SDL: без окна и без аудиоустройства, но с видеорежимом для convert_alpha
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    pygame.init()
+    if pygame.display.get_surface() is None:
+        pygame.display.set_mode((1, 1))
+
+
+# Звуковой сервис-заглушка с тем же интерфейсом воспроизведения, что и audio.VoiceManager
+class NullSoundService:
+    def play(self, sound_name, pos=None):
+        pass
+
+
+# Сценарий ввода: по номеру тика задает удерживаемые клавиши и удары мечом
+# Формат файла – JSON-список вида [{"tick": 0, "keys": ["left", "up"], "attack": true}, ...];
+# клавиши удерживаются до следующей записи, удар выполняется на указанном тике
+class ScriptedInput:
+    KEY_NAMES = {
+        "left": pygame.K_LEFT,
+        "right": pygame.K_RIGHT,
+        "up": pygame.K_UP,
+        "down": pygame.K_DOWN
+    }
+
+    def __init__(self, entries=()):
+        self.entries = sorted(entries, key=lambda entry: entry["tick"])
+        self.position = 0
+        self.held = set()
+        self.attack = False
+
+    @classmethod
+    def from_file(cls, path):
+        with open(path, "r") as f:
+            return cls(json.load(f))
+
+    def advance(self, tick):
+        # Применяем все записи сценария, наступившие к данному тику
+        self.attack = False
+        while self.position < len(self.entries) and self.entries[self.position]["tick"] <= tick:
+            entry = self.entries[self.position]
+            self.held = {self.KEY_NAMES[name] for name in entry.get("keys", [])}
+            self.attack = self.attack or entry.get("attack", False)
+            self.position += 1
+
+    def pressed(self):
+        # Совместимо с pygame.key.get_pressed(): индексируется кодом клавиши
+        return self
+
+    def __getitem__(self, key):
+        return key in self.held
+
+
+def create_world(level=1, seed=0, steering_mode=ENEMY_STEERING_MODE, sound_service=None, clock=None, snapshot=None):
+    # Собирает GameWorld без окна и без файла сохранения – основа для замеров и балансировочных прогонов.
+    # snapshot – путь к снимку мира: прогон начинается сразу с сохраненного состояния (уровень и seed не нужны)
+    from game_state import GameState
+    from entities import GameObjectFactory
+    from sim_clock import SimulationClock
+    from states import GameWorld
+    from snapshot import load_snapshot
+
+    random.seed(seed)
+    game_state = GameState(save_file=None)
+    game_state.session.level = level
+    factory = GameObjectFactory(sound_service or NullSoundService(), clock or SimulationClock())
+    if snapshot:
+        world = load_snapshot(snapshot, factory, game_state, steering_mode=steering_mode)
+        if world is None:
+            raise SystemExit(f"Cannot start from snapshot {snapshot}")
+        return world
+    player = factory.create_player((400, 300), game_state)
+    return GameWorld(player, factory, level, steering_mode)
+
+
+def run_headless(level=1, seed=0, ticks=3600, script=None, steering_mode=ENEMY_STEERING_MODE,
+                 snapshot=None, save_snapshot_path=None):
+    # Прогоняет симуляцию с максимальной скоростью, без ограничения clock.tick(FPS);
+    # можно начать со снимка и сохранить снимок конечного состояния для следующих прогонов
+    init_headless()
+    world = create_world(level, seed, steering_mode, snapshot=snapshot)
+    clock = world.clock
+    script = script or ScriptedInput()
+    world.player.input_source = script.pressed
+    last_attack_time = None
+    result = None
+
+    start = time.perf_counter()
+    for tick in range(ticks):
+        script.advance(tick)
+        clock.step()
+        now = clock.now()
+        # Удар подчиняется той же перезарядке, что и в PlayState.handle_attack
+        if script.attack and (last_attack_time is None or now - last_attack_time > ATTACK_COOLDOWN):
+            world.player.attack(world.effects, world.enemies)
+            last_attack_time = now
+        world.remember_positions()
+        result = world.update(now)
+        if result:
+            break
+    elapsed = time.perf_counter() - start
+
+    if save_snapshot_path:
+        from snapshot import save_snapshot
+        save_snapshot(world, save_snapshot_path)
+
+    return {
+        "ticks": clock.ticks,
+        "seconds": elapsed,
+        "ticks_per_second": clock.ticks / elapsed if elapsed > 0 else 0.0,
+        "level": world.level,
+        "enemies": len(world.enemies),
+        "player_hits": world.player.hits,
+        "result": result
+    }
+
+
+# Нажатия клавиш для прохода по экранам: навигация по меню, выбор пункта, пауза в игре и выход из нее
+SCREEN_KEYS = {
+    "menu": [pygame.K_DOWN, pygame.K_UP],
+    "upgrade": [pygame.K_UP, pygame.K_DOWN, pygame.K_DOWN, pygame.K_RETURN],
+    "play": [pygame.K_ESCAPE, pygame.K_DOWN, pygame.K_UP, pygame.K_RETURN],
+    "gameover": [pygame.K_DOWN],
+    "victory": [pygame.K_DOWN]
+}
+
+
+def run_screens(frames=10):
+    # Проверка экранов игры: каждый создается через StateManager, получает нажатия из SCREEN_KEYS
+    # и проходит несколько кадров обновления и отрисовки; исключение в любом экране прерывает прогон.
+    # Прогресс не пишется на диск, чтобы проверка не трогала сохранение игрока
+    init_headless()
+    from main import Game
+    from game_state import GameState
+    game = Game()
+    game.game_state = GameState(save_file=None)
+    manager = game.state_manager
+    screens = []
+    for name, keys in SCREEN_KEYS.items():
+        manager.change_state(name)
+        for frame in range(frames):
+            events = [pygame.event.Event(pygame.KEYDOWN, key=keys[frame], mod=0, unicode="", scancode=0)
+                      if frame < len(keys) else pygame.event.Event(pygame.NOEVENT)]
+            manager.handle_events(events)
+            manager.update(16)
+            game.sound_service.flush()
+            manager.draw(game.screen)
+        screens.append(type(manager.current_state).__name__)
+    return screens
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run GameWorld headless as fast as possible")
+    parser.add_argument("--level", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--ticks", type=int, default=3600)
+    parser.add_argument("--script", help="JSON input script: [{\"tick\": 0, \"keys\": [\"left\"], \"attack\": true}]")
+    parser.add_argument("--steering", default=ENEMY_STEERING_MODE, choices=["scalar", "batch"])
+    parser.add_argument("--snapshot", help="start from a world snapshot instead of a fresh level")
+    parser.add_argument("--save-snapshot", help="write a world snapshot after the run")
+    parser.add_argument("--screens", action="store_true", help="walk every game screen with scripted keys instead")
+    args = parser.parse_args(argv)
+
+    if args.screens:
+        print(f"Screens ok: {', '.join(run_screens())}")
+        return 0
+
+    script = ScriptedInput.from_file(args.script) if args.script else None
+    stats = run_headless(args.level, args.seed, args.ticks, script, args.steering, args.snapshot, args.save_snapshot)
+    print(f"{stats['ticks']} ticks in {stats['seconds']:.3f}s: {stats['ticks_per_second']:.1f} ticks/s "
+          f"(level {stats['level']}, enemies {stats['enemies']}, hits {stats['player_hits']}, "
+          f"result {stats['result']})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
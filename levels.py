@@ -1,31 +1,123 @@
+import math
 import random
-from settings import WORLD_WIDTH, WORLD_HEIGHT, ENEMY_SPAWN_MARGIN
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from settings import (
+    WORLD_WIDTH, WORLD_HEIGHT, ENEMY_SPAWN_MARGIN, WAVE_BASE_ENEMIES, WAVE_ENEMY_INCREMENT,
+    WAVE_SPAWN_PLAYER_DISTANCE, WAVE_SPAWN_SPACING, WAVE_SPAWN_MAX_ATTEMPTS, WAVE_SPAWNS_PER_TICK
+)
 
+# Один фоновый поток на все волны: точки следующей волны считаются, пока игрок сражается с текущей
+WAVE_EXECUTOR = ThreadPoolExecutor(max_workers=1, thread_name_prefix="waves")
 
-def generate_wave(level, player, factory):
+
+def wave_size(level):
     # Определяем число врагов с повышением сложности на каждом уровне
-    enemy_count = 5 + 2 * level
-    enemies = []
+    return WAVE_BASE_ENEMIES + WAVE_ENEMY_INCREMENT * level
+
 
-    # Расширяем зону спавна для повышения справедливости игры
+def far_from_player(x, y, center):
+    # Вычисляем расстояние до центра игрока чтобы избежать мгновенного столкновения
+    return (x - center[0]) ** 2 + (y - center[1]) ** 2 > WAVE_SPAWN_PLAYER_DISTANCE ** 2
+
+
+def random_spawn_point(rng, center):
+    # Случайная точка вдали от игрока; число попыток ограничено, при неудаче берется последняя
     spawn_margin = ENEMY_SPAWN_MARGIN * 2
+    for _ in range(WAVE_SPAWN_MAX_ATTEMPTS):
+        # Генерируем случайные координаты в пределах мира с учетом отступа
+        x = rng.randint(spawn_margin, WORLD_WIDTH - spawn_margin)
+        y = rng.randint(spawn_margin, WORLD_HEIGHT - spawn_margin)
+        if far_from_player(x, y, center):
+            break
+    return x, y
+
+
+def generate_wave(level, player, factory):
+    # Синхронная генерация всей волны сразу (первая волна уровня, замеры)
+    center = player.rect.center
+    return [factory.create_enemy(random_spawn_point(random, center), player) for _ in range(wave_size(level))]
+
+
+def poisson_disk_points(seed, count, spacing=WAVE_SPAWN_SPACING, attempts=WAVE_SPAWN_MAX_ATTEMPTS):
+    # Выборка Пуассона по диску методом бросания дротиков: случайные точки по всему миру, каждая не ближе
+    # spacing к уже принятым, поэтому враги волны не появляются друг в друге и не сбиваются в кучу.
+    # Число бросков ограничено (attempts на точку), при плотном заполнении мира точек может оказаться меньше.
+    # Работает в фоновом потоке, поэтому пользуется только собственным генератором с заданным seed –
+    # результат воспроизводим и не трогает общий random
+    rng = random.Random(seed)
+    margin = ENEMY_SPAWN_MARGIN * 2
+    # В ячейке сетки со стороной spacing / sqrt(2) помещается не больше одной точки
+    cell = spacing / math.sqrt(2)
+    grid = {}
+    spacing_sq = spacing * spacing
+    points = []
+    for _ in range(count * attempts):
+        if len(points) == count:
+            break
+        x = rng.randint(margin, WORLD_WIDTH - margin)
+        y = rng.randint(margin, WORLD_HEIGHT - margin)
+        col, row = int(x // cell), int(y // cell)
+        if all((other[0] - x) ** 2 + (other[1] - y) ** 2 >= spacing_sq
+               for c in range(col - 2, col + 3) for r in range(row - 2, row + 3)
+               for other in grid.get((c, r), ())):
+            grid[(col, row)] = ((x, y),)
+            points.append((x, y))
+    return points
+
 
-    for _ in range(enemy_count):
-        # Ищем допустимую позицию для появления врага
-        while True:
-            # Генерируем случайные координаты в пределах мира с учетом отступа
-            x = random.randint(spawn_margin, WORLD_WIDTH - spawn_margin)
-            y = random.randint(spawn_margin, WORLD_HEIGHT - spawn_margin)
+# Режиссер волн: точки следующей волны готовятся заранее в фоне, а враги появляются
+# постепенно – не больше spawns_per_tick за тик, чтобы смена волны не давала рывка кадра
+class WaveDirector:
+    def __init__(self, factory, player, spawns_per_tick=WAVE_SPAWNS_PER_TICK):
+        self.factory = factory
+        self.player = player
+        self.spawns_per_tick = spawns_per_tick
+        self.pending = deque()  # Позиции врагов текущей волны, еще не появившихся в мире
+        # Уровень и seed волны, точки которой считаются в фоне
+        self.level = None
+        self.seed = None
+        self.future = None
 
-            # Вычисляем расстояние до центра игрока чтобы избежать мгновенного столкновения
-            distance_to_player = ((x - player.rect.centerx) ** 2 +
-                                  (y - player.rect.centery) ** 2) ** 0.5
+    def prepare(self, level, seed=None):
+        # Запускаем расчет точек волны уровня level; seed берется из общего random в главном потоке,
+        # поэтому при одинаковом начальном состоянии волны совпадают (безоконные прогоны, снимки).
+        # Точек берется с запасом: часть отсеется у игрока, который к началу волны уже переместится
+        self.level = level
+        self.seed = random.getrandbits(32) if seed is None else seed
+        count = wave_size(level) * 3 // 2 + 1
+        self.future = WAVE_EXECUTOR.submit(poisson_disk_points, self.seed, count)
 
-            # Принимаем координаты если расстояние превышает 500 пикселей
-            if distance_to_player > 500:
-                break  # Позиция удовлетворяет условию
+    def start_wave(self, level, occupied=()):
+        # Отбираем заранее посчитанные точки вдали от игрока и от оставшихся в мире врагов;
+        # если фоновый расчет еще не закончен, дожидаемся его (обычно он готов задолго до конца волны)
+        if self.future is None or self.level != level:
+            self.prepare(level)
+        points = self.future.result()
+        self.future = None
+        center = self.player.rect.center
+        # Занятые клетки со стороной WAVE_SPAWN_SPACING: точка рядом с врагом отбрасывается
+        blocked = {(x // WAVE_SPAWN_SPACING, y // WAVE_SPAWN_SPACING) for x, y in occupied}
+        count = wave_size(level)
+        positions = []
+        for x, y in points:
+            if len(positions) == count:
+                break
+            col, row = x // WAVE_SPAWN_SPACING, y // WAVE_SPAWN_SPACING
+            if far_from_player(x, y, center) and not any((col + dc, row + dr) in blocked
+                                                         for dc in (-1, 0, 1) for dr in (-1, 0, 1)):
+                positions.append((x, y))
+        # На очень высоких уровнях точек выборки может не хватить – добираем случайными
+        rng = random.Random(self.seed)
+        while len(positions) < count:
+            positions.append(random_spawn_point(rng, center))
+        self.pending.extend(positions)
+        self.prepare(level + 1)
 
-        # Создаем врага через фабрику для поддержки модульности спавна
-        enemies.append(factory.create_enemy((x, y), player))
+    def spawn(self, limit=None):
+        # Создаем очередную порцию врагов волны; limit=None – весь остаток сразу
+        count = len(self.pending) if limit is None else min(limit, len(self.pending))
+        return [self.factory.create_enemy(self.pending.popleft(), self.player) for _ in range(count)]
 
-    return enemies  # Возвращаем список сгенерированной волны врагов
+    def spawn_batch(self):
+        return self.spawn(self.spawns_per_tick)
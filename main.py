@@ -1,84 +1,119 @@
 import sys
 import pygame
-from settings import FPS, BACKGROUND_COLOR, TITLE, FULLSCREEN
+from settings import BACKGROUND_COLOR, TITLE, FULLSCREEN, ASSET_PUMP_BUDGET_MS, AUDIO_FREQUENCY, AUDIO_BUFFER
 from game_state import GameState
+from save_writer import SAVE_WRITER
 from state_manager import StateManager
-from resources import preload_resources
-
-
-class SoundService:
-    def __init__(self, volumes_dict):
-        self.sounds = {}
-        for name, volume in volumes_dict.items():
-            # Используем запасной звук для ситуаций, когда файл не найден,
-            # чтобы игра продолжала работать даже при ошибке загрузки
-            sound = pygame.mixer.Sound(buffer=bytes(8000))
-            try:
-                sound = pygame.mixer.Sound(f"assets/sounds/{name}.wav")
-                sound.set_volume(volume)
-            except:
-                print(f"Warning: Sound {name} not found")
-            self.sounds[name] = sound
-
-    def play(self, sound_name):
-        sound = self.sounds.get(sound_name)
-        if sound:
-            sound.play()
+from resources import start_loading, sprite_cache_report, ASSET_LOADER
+from audio import VoiceManager
+from sim_clock import SimulationClock
+from pacing import FramePacer, create_display
+from profiler import PROFILER, now
+from widgets import ProfilerOverlay
 
 
 class Game:
     def __init__(self):
+        # Параметры микшера задаются до инициализации: короткий буфер уменьшает задержку звука удара
+        pygame.mixer.pre_init(AUDIO_FREQUENCY, -16, 2, AUDIO_BUFFER)
         pygame.init()
         pygame.mixer.init()
 
         if FULLSCREEN:
             # Переходим в полноэкранный режим для использования нативного разрешения устройства,
             # что обеспечивает оптимальное отображение интерфейса
-            self.screen = pygame.display.set_mode((0, 0), pygame.FULLSCREEN)
+            self.screen, pacing_mode = create_display((0, 0), pygame.FULLSCREEN)
             self.screen_width, self.screen_height = self.screen.get_size()
         else:
             # Выбираем оконный режим с фиксированными размерами, что удобно для отладки и тестирования
             self.screen_width, self.screen_height = 800, 600
-            self.screen = pygame.display.set_mode((self.screen_width, self.screen_height))
+            self.screen, pacing_mode = create_display((self.screen_width, self.screen_height))
 
         pygame.display.set_caption(TITLE)
         self.clock = pygame.time.Clock()
+        # Темп кадров задается режимом из настроек; при недоступной вертикальной синхронизации – фиксированный
+        self.pacer = FramePacer(self.clock, pacing_mode)
+        # Оверлей перцентилей времени фаз кадра (F3), выгрузка буфера замеров – F4
+        self.profiler_overlay = ProfilerOverlay(PROFILER)
+        self.show_profiler = False
+        # Область экрана под оверлеем в последнем кадре: (копия, прямоугольник) или None
+        self.overlay_underlay = None
 
+        # Шрифты загружаются сразу, спрайты и звуки – в фоне, пока на экране главное меню
         try:
-            preload_resources()
+            start_loading()
         except Exception as e:
             print(f"Resource preloading error: {e}")
 
         self.game_state = GameState()
+        # Единые часы симуляции, которые PlayState передает всем игровым объектам
+        self.sim_clock = SimulationClock()
         self.state_manager = StateManager(self)
 
-        self.sound_service = SoundService({
-            "menu_navigate": 0.2,
-            "menu_confirm": 0.2,
-            "upgrade_success": 0.2,
-            "sword_attack": 0.2,
-            "player_damage": 0.2,
-            "skeleton_damage": 0.2,
-            "skeleton_death": 0.2,
-            "health": 0.2
-        })
+        # Звуки из единого реестра resources.SOUND_CACHE воспроизводятся через менеджер голосов
+        self.sound_service = VoiceManager()
+
+    def world_frame(self):
+        # Последний выведенный кадр без оверлея профилировщика – основа застывших экранов паузы и конца забега
+        if self.overlay_underlay is None:
+            return self.screen
+        frame = self.screen.copy()
+        underlay, covered = self.overlay_underlay
+        frame.blit(underlay, covered)
+        return frame
 
     def run(self):
         while True:
-            dt = self.clock.tick(FPS)
+            dt = self.pacer.tick()
+            frame_start = now()
+            # Завершаем в главном потоке загруженные в фоне ресурсы, не выходя за бюджет кадра
+            ASSET_LOADER.pump(ASSET_PUMP_BUDGET_MS)
             events = pygame.event.get()
 
             for event in events:
                 if event.type == pygame.QUIT:
                     # Завершаем выполнение игры, так как пользователь закрыл окно
+                    print(f"Frame pacing: {self.pacer.summary()}")
+                    # Текущее состояние успевает сохраниться (снимок забега), затем дописываем отложенные сохранения
+                    self.state_manager.current_state.on_quit()
+                    SAVE_WRITER.close()
+                    print(f"Saves: {SAVE_WRITER.summary()}")
                     pygame.quit()
                     sys.exit()
+                elif event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+                    self.show_profiler = not self.show_profiler
+                elif event.type == pygame.KEYDOWN and event.key == pygame.K_F4:
+                    # Вместе с замерами кадра выводим, сколько памяти держат спрайты
+                    PROFILER.dump()
+                    print("\n".join(sprite_cache_report()))
+                    print(f"Audio: {self.sound_service.report()}")
 
             self.state_manager.handle_events(events)
+            PROFILER.add("events", frame_start)
+
+            started = now()
             self.state_manager.update(dt)
+            # Звуки, запрошенные за кадр, запускаются разом – с дедупликацией и бюджетом каналов
+            self.sound_service.flush()
+            PROFILER.add("update", started)
+
+            started = now()
             self.screen.fill(BACKGROUND_COLOR)
             self.state_manager.draw(self.screen)
+            self.overlay_underlay = None
+            if self.show_profiler:
+                # Оверлей рисуется поверх кадра отдельным слоем: то, что он закрыл, сохраняется для world_frame
+                self.profiler_overlay.refresh()
+                covered = self.profiler_overlay.rect.clip(self.screen.get_rect())
+                self.overlay_underlay = (self.screen.subsurface(covered).copy(), covered)
+                self.profiler_overlay.draw(self.screen)
+            PROFILER.add("draw", started)
+
+            started = now()
             pygame.display.flip()
+            PROFILER.add("flip", started)
+            PROFILER.add("total", frame_start)
+            PROFILER.end_frame()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,109 @@
+import time
+import pygame
+from settings import FPS, FRAME_PACING_MODE, FRAME_DEADLINE_TOLERANCE_MS, PRECISE_SPIN_MS
+
+PACING_FIXED = "fixed"
+PACING_VSYNC = "vsync"
+PACING_UNCAPPED = "uncapped"
+PACING_PRECISE = "precise"
+PACING_MODES = (PACING_FIXED, PACING_VSYNC, PACING_UNCAPPED, PACING_PRECISE)
+
+
+def create_display(size, flags=0, mode=FRAME_PACING_MODE):
+    # Вертикальная синхронизация задается при создании окна (в pygame 2 – только вместе с SCALED или OPENGL);
+    # если драйвер ее не поддерживает, откатываемся к фиксированному ограничению частоты
+    if mode == PACING_VSYNC:
+        try:
+            # SCALED требует явного размера – в полноэкранном режиме берем размер рабочего стола
+            vsync_size = pygame.display.get_desktop_sizes()[0] if size == (0, 0) else size
+            return pygame.display.set_mode(vsync_size, flags | pygame.SCALED, vsync=1), mode
+        except pygame.error as e:
+            print(f"VSync unavailable ({e}), falling back to fixed frame cap")
+            mode = PACING_FIXED
+    return pygame.display.set_mode(size, flags), mode
+
+
+def display_refresh_rate(default=FPS):
+    # Частота обновления дисплея доступна не во всех сборках pygame
+    get_rate = getattr(pygame.display, "get_current_refresh_rate", None)
+    try:
+        rate = get_rate() if get_rate else 0
+    except pygame.error:
+        rate = 0
+    return rate or default
+
+
+# Темп вывода кадров
+# fixed – ограничение clock.tick(fps) на основе SDL_Delay;
+# vsync – темп задает flip(), ожидающий кадровый импульс дисплея, бюджет равен частоте обновления;
+# uncapped – без ожидания, бюджет служит только ориентиром для статистики;
+# precise – сон до момента чуть раньше срока и добор остатка активным ожиданием: точнее SDL_Delay,
+# чья гранулярность на части систем достигает нескольких миллисекунд
+# Время кадра возвращается дробным числом миллисекунд, чтобы на 120/144 Гц часы симуляции не накапливали
+# ошибку округления, а кадры дольше бюджета учитываются как пропущенные сроки
+class FramePacer:
+    def __init__(self, clock, mode=FRAME_PACING_MODE, target_fps=FPS):
+        if mode not in PACING_MODES:
+            print(f"Unknown frame pacing mode {mode}, using {PACING_FIXED}")
+            mode = PACING_FIXED
+        self.clock = clock
+        self.mode = mode
+        self.target_fps = display_refresh_rate(target_fps) if mode == PACING_VSYNC else target_fps
+        self.budget_ms = 1000.0 / self.target_fps
+        self.last_frame = time.perf_counter()
+        self.deadline = self.last_frame + self.budget_ms / 1000.0
+        # Статистика: число кадров, пропущенные сроки, худшие время кадра и время работы без ожидания
+        self.frames = 0
+        self.missed = 0
+        self.worst_frame_ms = 0.0
+        self.worst_work_ms = 0.0
+
+    def tick(self):
+        # Ждем начала следующего кадра согласно режиму и возвращаем время прошедшего кадра в миллисекундах
+        work_ms = (time.perf_counter() - self.last_frame) * 1000.0
+        if self.mode == PACING_FIXED:
+            self.clock.tick(self.target_fps)
+        else:
+            if self.mode == PACING_PRECISE:
+                self.wait_precise()
+            # Без аргумента tick только измеряет время – get_fps() продолжает работать во всех режимах
+            self.clock.tick()
+
+        now = time.perf_counter()
+        frame_ms = (now - self.last_frame) * 1000.0
+        self.last_frame = now
+        self.record(frame_ms, work_ms)
+        return frame_ms
+
+    def wait_precise(self):
+        # Спим до момента за PRECISE_SPIN_MS до срока, остаток добираем активным ожиданием
+        deadline = self.deadline
+        remaining = deadline - time.perf_counter()
+        if remaining > PRECISE_SPIN_MS / 1000.0:
+            time.sleep(remaining - PRECISE_SPIN_MS / 1000.0)
+        while time.perf_counter() < deadline:
+            pass
+
+        # Сроки идут с постоянным шагом; после серьезного опоздания отсчет начинается заново,
+        # чтобы не выдавать серию кадров без пауз ради догоняния
+        period = self.budget_ms / 1000.0
+        now = time.perf_counter()
+        self.deadline = deadline + period if now - deadline < period else now + period
+
+    def record(self, frame_ms, work_ms):
+        self.frames += 1
+        if frame_ms > self.budget_ms + FRAME_DEADLINE_TOLERANCE_MS:
+            self.missed += 1
+        self.worst_frame_ms = max(self.worst_frame_ms, frame_ms)
+        self.worst_work_ms = max(self.worst_work_ms, work_ms)
+
+    def reset_stats(self):
+        self.frames = 0
+        self.missed = 0
+        self.worst_frame_ms = 0.0
+        self.worst_work_ms = 0.0
+
+    def summary(self):
+        # Краткая сводка для экрана паузы и вывода при выходе
+        return (f"{self.mode} {self.target_fps:.0f} Hz | missed {self.missed}/{self.frames} "
+                f"| worst {self.worst_frame_ms:.1f} ms (work {self.worst_work_ms:.1f} ms)")
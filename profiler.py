@@ -0,0 +1,101 @@
+import csv
+import json
+import time
+from settings import PROFILER_HISTORY, PROFILER_REFRESH_MS
+
+# Фазы кадра в порядке выполнения; вложенные фазы (entities и collisions внутри update,
+# cull_sort, blits и hud внутри draw) учитываются и отдельно, и в составе охватывающей фазы
+PHASES = ("events", "update", "entities", "collisions", "draw", "cull_sort", "blits", "hud", "flip", "total")
+PERCENTILES = (50, 95, 99)
+
+# Часы высокого разрешения для замеров: вызов стоит десятки наносекунд, поэтому замеры включены всегда
+now = time.perf_counter
+
+
+# Покадровые замеры по фазам в кольцевом буфере фиксированного размера
+# Время фаз копится в текущем кадре (за кадр может пройти несколько шагов симуляции) и при
+# завершении кадра переносится в буфер; старые кадры перезаписываются, поэтому память не растет
+class FrameProfiler:
+    def __init__(self, history=PROFILER_HISTORY):
+        self.history = history
+        self.samples = {phase: [0.0] * history for phase in PHASES}
+        self.frame_numbers = [0] * history
+        self.current = dict.fromkeys(PHASES, 0.0)
+        self.position = 0
+        self.count = 0
+        self.frame = 0
+        self.cached_percentiles = {}
+        self.percentiles_time = 0.0
+        self.percentiles_count = 0  # число кадров, по которым посчитаны перцентили
+
+    def add(self, phase, started):
+        # started – значение now() в начале фазы; время копится в миллисекундах
+        self.current[phase] += (now() - started) * 1000.0
+
+    def end_frame(self):
+        position = self.position
+        current = self.current
+        for phase in PHASES:
+            self.samples[phase][position] = current[phase]
+            current[phase] = 0.0
+        self.frame_numbers[position] = self.frame
+        self.frame += 1
+        self.position = (position + 1) % self.history
+        self.count = min(self.count + 1, self.history)
+
+    def ordered(self, values):
+        # Значения буфера от самого старого кадра к самому новому
+        if self.count < self.history:
+            return values[:self.count]
+        return values[self.position:] + values[:self.position]
+
+    def percentiles(self, force=False):
+        # Перцентили по фазам; пересчитываются не чаще PROFILER_REFRESH_MS, чтобы оверлей сам не стал нагрузкой
+        current_time = now()
+        if not force and self.cached_percentiles and \
+                (current_time - self.percentiles_time) * 1000.0 < PROFILER_REFRESH_MS:
+            return self.cached_percentiles
+        self.percentiles_time = current_time
+        self.percentiles_count = self.count
+
+        result = {}
+        for phase in PHASES:
+            values = sorted(self.ordered(self.samples[phase]))
+            if values:
+                result[phase] = tuple(values[min(len(values) - 1, len(values) * p // 100)] for p in PERCENTILES)
+            else:
+                result[phase] = (0.0,) * len(PERCENTILES)
+        self.cached_percentiles = result
+        return result
+
+    def rows(self):
+        # Строки буфера: номер кадра и время каждой фазы
+        frames = self.ordered(self.frame_numbers)
+        columns = [self.ordered(self.samples[phase]) for phase in PHASES]
+        return [[frame] + [column[i] for column in columns] for i, frame in enumerate(frames)]
+
+    def dump(self, base_name=None):
+        # Сохраняем буфер в CSV и JSON для поиска рывков после игровой сессии
+        base_name = base_name or time.strftime("profile_%Y%m%d_%H%M%S")
+        rows = self.rows()
+        try:
+            with open(f"{base_name}.csv", "w", newline="") as f:
+                writer = csv.writer(f)
+                writer.writerow(("frame",) + PHASES)
+                writer.writerows(rows)
+            with open(f"{base_name}.json", "w") as f:
+                json.dump({
+                    "phases": PHASES,
+                    "percentiles": {phase: dict(zip((f"p{p}" for p in PERCENTILES), values))
+                                    for phase, values in self.percentiles(force=True).items()},
+                    "frames": [dict(zip(("frame",) + PHASES, row)) for row in rows]
+                }, f)
+        except OSError as e:
+            print(f"Profile dump error: {e}")
+            return None
+        print(f"Profile dumped to {base_name}.csv and {base_name}.json ({len(rows)} frames)")
+        return base_name
+
+
+# Единый профилировщик игры: его фазы заполняют Game.run, GameWorld.update и RenderSystem.render
+PROFILER = FrameProfiler()
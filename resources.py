@@ -1,72 +1,316 @@
 import os
+import time
 import pygame
-from typing import Optional, Tuple, List, Dict
+from collections import OrderedDict
+from concurrent import futures
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Tuple, List, Dict, Callable
+
+def surface_bytes(surface: pygame.Surface) -> int:
+    # Объем пикселей поверхности; для подповерхностей атласа – занимаемая ими область страницы
+    return surface.get_width() * surface.get_height() * surface.get_bytesize()
+
+
+# LRU-кэш спрайтов и спрайт-листов с учетом занимаемой памяти
+# Ключ включает все параметры, влияющие на пиксели (файл, масштаб, колоркей, альфа, нарезка),
+# поэтому запрос другого размера загружает свои кадры, а не возвращает чужие.
+# При превышении бюджета вытесняются давно не использованные записи; закрепленные (предзагруженные,
+# нужные игре постоянно) не вытесняются никогда.
+# Производные поверхности (варианты кадров листа) учитываются в байтах записи, из которой получены,
+# и сбрасываются обработчиком on_drop, когда запись вытеснена или заменена
+class SpriteCache:
+    def __init__(self, budget: Optional[int] = None, on_drop: Optional[Callable[[tuple], None]] = None):
+        self._budget = budget
+        self.on_drop = on_drop
+        self.entries: "OrderedDict[tuple, list]" = OrderedDict()  # ключ -> [значение, байты, метка, закреплена]
+        self.bytes = 0
+        self.stats: Dict[str, int] = {"hits": 0, "misses": 0, "evictions": 0}
+
+    @property
+    def budget(self) -> int:
+        # Без явного бюджета берется SPRITE_CACHE_BUDGET_MB из настроек при первом обращении
+        if self._budget is None:
+            from settings import SPRITE_CACHE_BUDGET_MB
+            self._budget = SPRITE_CACHE_BUDGET_MB * 1024 * 1024
+        return self._budget
+
+    @budget.setter
+    def budget(self, budget: int) -> None:
+        self._budget = budget
+
+    def get(self, key: tuple):
+        entry = self.entries.get(key)
+        if entry is None:
+            self.stats["misses"] += 1
+            return None
+        self.entries.move_to_end(key)
+        self.stats["hits"] += 1
+        return entry[0]
+
+    def put(self, key: tuple, value, label: str, pinned: bool = False) -> None:
+        old = self.entries.pop(key, None)
+        if old is not None:
+            self.bytes -= old[1]
+            pinned = pinned or old[3]
+            if old[0] is not value:
+                self.drop(key)
+        surfaces = value if isinstance(value, list) else [value]
+        size = sum(surface_bytes(surface) for surface in surfaces)
+        self.entries[key] = [value, size, label, pinned]
+        self.bytes += size
+        self.evict()
+
+    def charge(self, key: tuple, size: int) -> None:
+        # Добавляем к записи байты полученной из нее поверхности; сама запись при этом не вытесняется,
+        # иначе только что созданная поверхность сразу же была бы сброшена
+        entry = self.entries.get(key)
+        if entry is not None:
+            entry[1] += size
+            self.bytes += size
+            self.evict(keep=key)
+
+    def touch(self, key: tuple) -> None:
+        # Отмечаем запись использованной без чтения значения (кадр нарисован через производную поверхность)
+        if key in self.entries:
+            self.entries.move_to_end(key)
+
+    def drop(self, key: tuple) -> None:
+        if self.on_drop is not None:
+            self.on_drop(key)
+
+    def evict(self, keep: Optional[tuple] = None) -> None:
+        # Вытесняем от самых старых к новым, пропуская закрепленные записи и запись keep
+        for key in list(self.entries):
+            if self.bytes <= self.budget:
+                return
+            value, size, _, pinned = self.entries[key]
+            if not pinned and key != keep:
+                del self.entries[key]
+                self.bytes -= size
+                self.stats["evictions"] += 1
+                self.drop(key)
+
+    def pin(self, key: tuple, pinned: bool = True) -> None:
+        if key in self.entries:
+            self.entries[key][3] = pinned
+            if not pinned:
+                self.evict()
+
+    def clear(self) -> None:
+        self.entries.clear()
+        self.bytes = 0
+
+    def report(self) -> Dict[str, int]:
+        # Байты по листам и спрайтам (метка – имя и итоговый размер кадра)
+        result: Dict[str, int] = {}
+        for _, size, label, _ in self.entries.values():
+            result[label] = result.get(label, 0) + size
+        return result
+
+
+def sprite_key(filename: str, scale, colorkey, alpha: bool) -> tuple:
+    return ("sprite", filename, tuple(scale) if scale else None, tuple(colorkey) if colorkey else None, alpha)
+
+def sheet_key(filename: str, rows: int, cols: int, scale) -> tuple:
+    return ("sheet", filename, rows, cols, tuple(scale) if scale else None)
+
+def cache_label(name: str, surface: pygame.Surface) -> str:
+    return f"{name} {surface.get_width()}x{surface.get_height()}"
+
 
 # Глобальные кэши для избежания повторной загрузки ресурсов
-SPRITE_CACHE: Dict[str, pygame.Surface] = {}
+SPRITE_CACHE = SpriteCache(on_drop=lambda key: drop_variants(key))
+# Последний загруженный спрайт по имени – для get_sprite
+SPRITE_NAMES: Dict[str, tuple] = {}
 FONT_CACHE: Dict[int, pygame.font.Font] = {}
 SOUND_CACHE: Dict[str, pygame.mixer.Sound] = {}
+# Ключ кэша спрайтов по имени листа и заранее подготовленные преобразованные варианты кадров.
+# Сами кадры хранит только кэш спрайтов, поэтому вытесненный лист действительно освобождает память.
+# Варианты неизменяемы: их нельзя модифицировать (set_alpha и т.п.), так как они общие для всех объектов
+SHEET_KEYS: Dict[str, tuple] = {}
+VARIANT_CACHE: Dict[Tuple[str, int, bool, int, int], pygame.Surface] = {}
+# LRU-кэш отрендеренного текста: (текст, размер шрифта, цвет, сглаживание) -> поверхность
+TEXT_CACHE: "OrderedDict[Tuple[str, int, Tuple[int, ...], bool], pygame.Surface]" = OrderedDict()
+TEXT_CACHE_STATS: Dict[str, int] = {"hits": 0, "misses": 0}
+# Атлас текстур, на страницах которого лежат кадры листов и их варианты после предзагрузки
+ATLAS = None
 
 def load_sprite(name: str, filename: str, scale: Optional[Tuple[int, int]] = None,
-                colorkey: Optional[Tuple[int, int, int]] = None) -> pygame.Surface:
-    if name in SPRITE_CACHE:
-        return SPRITE_CACHE[name]
+                colorkey: Optional[Tuple[int, int, int]] = None, alpha: bool = True) -> pygame.Surface:
+    key = sprite_key(filename, scale, colorkey, alpha)
+    image = SPRITE_CACHE.get(key)
+    if image is not None:
+        SPRITE_NAMES[name] = key
+        return image
 
     from settings import SPRITES_DIR
     path = os.path.join(SPRITES_DIR, filename)
 
     try:
-        image = pygame.image.load(path).convert_alpha()
-        if scale:
-            image = pygame.transform.scale(image, scale)
-        if colorkey:
-            image.set_colorkey(colorkey)
-        SPRITE_CACHE[name] = image
-        return image
+        return finish_sprite(name, filename, pygame.image.load(path), scale, colorkey, alpha)
     except pygame.error as e:
         print(f"Error loading sprite {path}: {e}")
         fallback = pygame.Surface((32, 32), pygame.SRCALPHA)
         pygame.draw.rect(fallback, (255, 0, 255), (0, 0, 32, 32))
-        SPRITE_CACHE[name] = fallback
+        SPRITE_CACHE.put(key, fallback, cache_label(name, fallback))
+        SPRITE_NAMES[name] = key
         return fallback
 
+def finish_sprite(name: str, filename: str, image: pygame.Surface, scale: Optional[Tuple[int, int]] = None,
+                  colorkey: Optional[Tuple[int, int, int]] = None, alpha: bool = True,
+                  pinned: bool = False) -> pygame.Surface:
+    # Зависящая от дисплея часть загрузки – только в главном потоке.
+    # Непрозрачные изображения (например, фон) конвертируем без альфа-канала – они копируются быстрее
+    image = image.convert_alpha() if alpha else image.convert()
+    if scale:
+        image = pygame.transform.scale(image, scale)
+    if colorkey:
+        image.set_colorkey(colorkey)
+    key = sprite_key(filename, scale, colorkey, alpha)
+    SPRITE_CACHE.put(key, image, cache_label(name, image), pinned)
+    SPRITE_NAMES[name] = key
+    return image
+
 def load_sprite_sheet(name: str, filename: str, rows: int, cols: int,
                       scale: Optional[Tuple[int, int]] = None) -> List[pygame.Surface]:
-    cache_key = f"{name}_{rows}x{cols}"
-    if cache_key in SPRITE_CACHE:
-        return SPRITE_CACHE[cache_key]
+    frames = SPRITE_CACHE.get(sheet_key(filename, rows, cols, scale))
+    if frames is not None:
+        if SHEET_KEYS.get(name) != sheet_key(filename, rows, cols, scale):
+            store_sheet(name, filename, rows, cols, scale, frames)
+        return frames
 
     from settings import SPRITES_DIR
     path = os.path.join(SPRITES_DIR, filename)
 
     try:
-        sheet = pygame.image.load(path).convert_alpha()
-        sheet_width, sheet_height = sheet.get_size()
-        frame_width = sheet_width // cols
-        frame_height = sheet_height // rows
-        frames = []
-
-        for row in range(rows):
-            for col in range(cols):
-                rect = pygame.Rect(col * frame_width, row * frame_height, frame_width, frame_height)
-                frame = sheet.subsurface(rect)
-                if scale:
-                    frame = pygame.transform.scale(frame, scale)
-                frames.append(frame)
-
-        SPRITE_CACHE[cache_key] = frames
-        return frames
+        return finish_sprite_sheet(name, filename, pygame.image.load(path), rows, cols, scale)
     except pygame.error as e:
         print(f"Error loading spritesheet {path}: {e}")
         fallback = [pygame.Surface((32, 32), pygame.SRCALPHA) for _ in range(rows * cols)]
         for i, surf in enumerate(fallback):
             pygame.draw.rect(surf, (255, 0, 255), (0, 0, 32, 32))
             pygame.draw.line(surf, (0, 0, 0), (0, 0), (32, 32), 2)
-        SPRITE_CACHE[cache_key] = fallback
-        return fallback
+        return store_sheet(name, filename, rows, cols, scale, fallback)
+
+def finish_sprite_sheet(name: str, filename: str, sheet: pygame.Surface, rows: int, cols: int,
+                        scale: Optional[Tuple[int, int]] = None, pinned: bool = False) -> List[pygame.Surface]:
+    # Конвертация и нарезка уже декодированного листа на кадры – в главном потоке
+    sheet = sheet.convert_alpha()
+    sheet_width, sheet_height = sheet.get_size()
+    frame_width = sheet_width // cols
+    frame_height = sheet_height // rows
+    frames = []
+
+    for row in range(rows):
+        for col in range(cols):
+            rect = pygame.Rect(col * frame_width, row * frame_height, frame_width, frame_height)
+            frame = sheet.subsurface(rect)
+            if scale:
+                frame = pygame.transform.scale(frame, scale)
+            frames.append(frame)
+    return store_sheet(name, filename, rows, cols, scale, frames, pinned)
+
+def store_sheet(name: str, filename: str, rows: int, cols: int, scale: Optional[Tuple[int, int]],
+                frames: List[pygame.Surface], pinned: bool = False) -> List[pygame.Surface]:
+    key = sheet_key(filename, rows, cols, scale)
+    entry = SPRITE_CACHE.entries.get(key)
+    if entry is None or entry[0] is not frames:
+        SPRITE_CACHE.put(key, frames, cache_label(name, frames[0]), pinned)
+    # Имя листа теперь указывает на другие кадры – варианты, запеченные из прежних, больше не годятся
+    previous = SHEET_KEYS.get(name)
+    if previous is not None and previous != key:
+        drop_variants(previous, [name])
+    SHEET_KEYS[name] = key
+    return frames
+
+def sheet_frames(name: str) -> List[pygame.Surface]:
+    # Кадры листа по имени; вытесненный из кэша лист загружается заново по своему ключу
+    key = SHEET_KEYS[name]
+    frames = SPRITE_CACHE.get(key)
+    if frames is None:
+        frames = load_sprite_sheet(name, *key[1:])
+    return frames
+
+def drop_variants(key: tuple, names: Optional[List[str]] = None) -> None:
+    # Сбрасываем варианты, запеченные из листа с этим ключом (по умолчанию – у всех имен этого листа)
+    if names is None:
+        names = [name for name, sheet in SHEET_KEYS.items() if sheet == key]
+    for variant_key in [variant_key for variant_key in VARIANT_CACHE if variant_key[0] in names]:
+        del VARIANT_CACHE[variant_key]
+
+def quantize_alpha(alpha: int) -> int:
+    # Приводим прозрачность к одной из ALPHA_STEPS ступеней, чтобы число вариантов кадра было конечным
+    from settings import ALPHA_STEPS
+    step = 255 / ALPHA_STEPS
+    return int(round(round(max(0, min(255, alpha)) / step) * step))
+
+def get_frame_variant(sheet: str, index: int, flip_x: bool = False, angle: int = 0,
+                      alpha: int = 255) -> pygame.Surface:
+    # Возвращает кадр листа с отражением, поворотом и прозрачностью, создавая его только при первом запросе
+    alpha = quantize_alpha(alpha)
+    key = (sheet, index, flip_x, angle, alpha)
+    variant = VARIANT_CACHE.get(key)
+    if variant is not None:
+        # Лист, который рисуется только через свои варианты, тоже считается используемым
+        SPRITE_CACHE.touch(SHEET_KEYS[sheet])
+        return variant
+
+    variant = sheet_frames(sheet)[index]
+    if flip_x:
+        variant = pygame.transform.flip(variant, True, False)
+    if angle:
+        variant = pygame.transform.rotate(variant, angle)
+    if alpha < 255:
+        # Прозрачность запекается в пиксели копии, исходный общий кадр не меняется
+        variant = variant.copy()
+        variant.fill((255, 255, 255, alpha), special_flags=pygame.BLEND_RGBA_MULT)
+    VARIANT_CACHE[key] = variant
+    # Вариант занимает бюджет листа и будет сброшен вместе с ним
+    SPRITE_CACHE.charge(SHEET_KEYS[sheet], surface_bytes(variant))
+    return variant
+
+def prebake_variants(sheet: str, flip_x: bool = False, angles: Tuple[int, ...] = (),
+                     fade: bool = False, indices: Optional[List[int]] = None) -> None:
+    # Заранее создаем варианты кадров, чтобы в игровом цикле не выделялись новые поверхности
+    from settings import ALPHA_STEPS
+    if sheet not in SHEET_KEYS:
+        return
+    frames = sheet_frames(sheet)
+    indices = range(len(frames)) if indices is None else [i % len(frames) for i in indices]
+    for index in indices:
+        if flip_x:
+            get_frame_variant(sheet, index, flip_x=True)
+        for angle in angles:
+            get_frame_variant(sheet, index, angle=angle)
+        if fade:
+            for step in range(ALPHA_STEPS + 1):
+                get_frame_variant(sheet, index, alpha=int(255 * step / ALPHA_STEPS))
+
+def clear_caches() -> None:
+    # Сбрасываем все кэши ресурсов – следующая загрузка снова читает файлы (холодный старт)
+    global ATLAS
+    for cache in (SPRITE_CACHE, SPRITE_NAMES, FONT_CACHE, SOUND_CACHE, SHEET_KEYS, VARIANT_CACHE, TEXT_CACHE):
+        cache.clear()
+    ATLAS = None
+    ASSET_LOADER.reset()
 
 def get_sprite(name: str) -> Optional[pygame.Surface]:
-    return SPRITE_CACHE.get(name)
+    key = SPRITE_NAMES.get(name)
+    return SPRITE_CACHE.get(key) if key else None
+
+def sprite_cache_report() -> List[str]:
+    # Строки отчета о памяти: байты по листам и спрайтам, бюджет, вытеснения, а также атлас и варианты
+    lines = [f"Sprite cache: {SPRITE_CACHE.bytes / 1024:.0f} KiB of {SPRITE_CACHE.budget / 1024:.0f} KiB, "
+             f"{len(SPRITE_CACHE.entries)} entries, {SPRITE_CACHE.stats['evictions']} evictions"]
+    for label, size in sorted(SPRITE_CACHE.report().items(), key=lambda item: -item[1]):
+        lines.append(f"  {label:<28} {size / 1024:>8.1f} KiB")
+    lines.append(f"Variants: {len(VARIANT_CACHE)} surfaces, "
+                 f"{sum(surface_bytes(variant) for variant in VARIANT_CACHE.values()) / 1024:.0f} KiB")
+    if ATLAS is not None:
+        pages = ATLAS.stats()
+        lines.append(f"Atlas: {pages['pages']} page(s) of {ATLAS.page_size}x{ATLAS.page_size}, "
+                     f"{pages['fill']:.0%} filled")
+    return lines
 
 def load_font(size: int) -> pygame.font.Font:
     if size in FONT_CACHE:
@@ -88,6 +332,28 @@ def load_font(size: int) -> pygame.font.Font:
 def get_font(size: int) -> pygame.font.Font:
     return FONT_CACHE.get(size) or load_font(size)
 
+def render_text(text: str, size: int, color: Tuple[int, ...], antialias: bool = True) -> pygame.Surface:
+    # Возвращает отрендеренную строку из кэша; растеризация глифов выполняется только при промахе.
+    # Поверхность общая для всех вызовов, поэтому изменять ее нельзя
+    key = (text, size, tuple(color), antialias)
+    surface = TEXT_CACHE.get(key)
+    if surface is not None:
+        TEXT_CACHE.move_to_end(key)
+        TEXT_CACHE_STATS["hits"] += 1
+        return surface
+
+    from settings import TEXT_CACHE_SIZE
+    TEXT_CACHE_STATS["misses"] += 1
+    surface = get_font(size).render(text, antialias, color)
+    TEXT_CACHE[key] = surface
+    if len(TEXT_CACHE) > TEXT_CACHE_SIZE:
+        TEXT_CACHE.popitem(last=False)
+    return surface
+
+def text_cache_stats() -> Dict[str, int]:
+    # Счетчики попаданий и промахов кэша текста вместе с текущим размером
+    return dict(TEXT_CACHE_STATS, size=len(TEXT_CACHE))
+
 def load_sound(name: str, filename: str, volume: float = 1.0) -> pygame.mixer.Sound:
     if name in SOUND_CACHE:
         return SOUND_CACHE[name]
@@ -109,36 +375,205 @@ def load_sound(name: str, filename: str, volume: float = 1.0) -> pygame.mixer.So
 def get_sound(name: str) -> Optional[pygame.mixer.Sound]:
     return SOUND_CACHE.get(name)
 
-def preload_resources():
+# Состав предзагрузки: одиночные спрайты, спрайт-листы и варианты кадров, запекаемые после загрузки листов
+SPRITE_MANIFEST = [
+    ("background", "background.png", {"alpha": False})
+]
+SHEET_MANIFEST = [
+    ("player", "player.png", 4, 4, (50, 50)),
+    ("skeleton_walk", "skeleton_walk.png", 1, 13, (50, 70)),
+    ("skeleton_attack", "skeleton_attack.png", 1, 18, (80, 80)),
+    ("skeleton_dead", "skeleton_dead.png", 1, 15, (50, 70)),
+    ("skeleton_hit", "skeleton_hit.png", 1, 8, (50, 70)),
+    ("health", "health_bar.png", 5, 1, (256, 64)),
+    ("slash_effect", "slash_effect.png", 3, 3, (50, 50)),
+    ("meep_moop", "meep_moop.png", 1, 2, (50, 65))
+]
+# Листы, которые мир рисует каждый кадр и которые поэтому переносятся на страницы атласа.
+# Закрепляются в кэше спрайтов только они и только при включенном атласе: его страницы не освобождаются.
+# Остальные спрайты и листы (фон, полоска здоровья HUD) подчиняются бюджету и при вытеснении загружаются заново
+ATLAS_SHEETS = ("player", "skeleton_walk", "skeleton_attack", "skeleton_dead", "skeleton_hit", "slash_effect",
+                "meep_moop")
+# Шрифты интерфейса: HUD, информация, меню улучшений, основное меню, заголовки, акцентный текст, главный заголовок
+FONT_SIZES = (20, 24, 28, 36, 48, 64, 72)
+
+def prebake_all_variants() -> None:
+    # Запекаем варианты кадров: зеркальные для врагов, повернутые для удара мечом
+    # и ступени затухания для последнего кадра смерти (затухает только он)
+    prebake_variants("skeleton_walk", flip_x=True)
+    prebake_variants("skeleton_attack", flip_x=True)
+    prebake_variants("skeleton_hit", flip_x=True)
+    prebake_variants("slash_effect", flip_x=True, angles=(90, -90))
+    prebake_variants("skeleton_dead", fade=True, indices=[-1])
+
+def pinned_sheet(name: str) -> bool:
+    from settings import TEXTURE_ATLAS
+    return TEXTURE_ATLAS and name in ATLAS_SHEETS
+
+def build_atlas() -> None:
+    # Переносим все кадры листов и запеченные варианты на страницы атласа; списки кадров меняются на месте,
+    # поэтому враги и игрок, уже получившие список из load_sprite_sheet, сразу видят кадры атласа.
+    # На страницы попадают только закрепленные листы: страницы атласа не освобождаются,
+    # и вытесняемый лист, оказавшись на них, не вернул бы память
+    global ATLAS
+    from settings import TEXTURE_ATLAS
+    if not TEXTURE_ATLAS:
+        return
+    from atlas import TextureAtlas
+    ATLAS = TextureAtlas()
+    pinned = {name: SPRITE_CACHE.entries[key][0] for name, key in SHEET_KEYS.items()
+              if key in SPRITE_CACHE.entries and SPRITE_CACHE.entries[key][3]}
+    sheets = list({id(frames): frames for frames in pinned.values()}.values())
+    variants = [key for key in VARIANT_CACHE if key[0] in pinned]
+    packed = ATLAS.pack([frame for frames in sheets for frame in frames] + [VARIANT_CACHE[key] for key in variants])
+    for frames in sheets:
+        frames[:] = [packed.get(id(frame), frame) for frame in frames]
+    for key in variants:
+        VARIANT_CACHE[key] = packed.get(id(VARIANT_CACHE[key]), VARIANT_CACHE[key])
+
+def decode_sound(path: str, volume: float) -> pygame.mixer.Sound:
+    sound = pygame.mixer.Sound(path)
+    sound.set_volume(volume)
+    return sound
+
+
+# Фоновая загрузка ресурсов
+# Чтение файлов и декодирование PNG/WAV выполняются пулом потоков, пока главное меню уже на экране;
+# зависящие от дисплея операции (convert_alpha, нарезка листов, запекание вариантов) и запись в кэши
+# выполняет главный поток в pump() с ограничением времени на кадр.
+# Ресурсы сгруппированы ("sprites", "sounds"), состояния ждут готовности нужных им групп через wait()
+class AssetLoader:
+    def __init__(self):
+        self.reset()
+
+    def reset(self) -> None:
+        # Забываем о проделанной загрузке – после сброса кэшей ресурсы загружаются заново
+        self.executor = None
+        self.started = False
+        # Открытый пак ресурсов; хранится, пока живо отображение файла в память
+        self.pack = None
+        self.pending: List[Tuple[str, futures.Future, Callable]] = []
+        self.remaining: Dict[str, int] = {}
+        self.total = 0
+        self.completed = 0
+
+    def submit(self, group: str, decode: Callable, finish: Callable, fallback: Callable) -> None:
+        # decode выполняется в потоке пула; finish получает результат в главном потоке,
+        # fallback – обычная синхронная загрузка с заглушкой, если декодирование не удалось
+        future = self.executor.submit(decode)
+        self.pending.append((group, future, lambda: self.finish(future, finish, fallback)))
+        self.remaining[group] = self.remaining.get(group, 0) + 1
+        self.total += 1
+
+    @staticmethod
+    def finish(future, finish: Callable, fallback: Callable) -> None:
+        try:
+            finish(future.result())
+        except Exception:
+            fallback()
+
+    def start(self) -> None:
+        from settings import SPRITES_DIR, SOUNDS_DIR, SOUND_VOLUMES, ASSET_LOADER_WORKERS, USE_ASSET_PACK
+        if self.started:
+            return
+        self.started = True
+
+        # Собранный пак не требует декодирования и масштабирования – загружаем из него сразу,
+        # а при отсутствии или устаревании пака читаем исходные файлы в фоне
+        if USE_ASSET_PACK:
+            from asset_pack import open_pack
+            self.pack = open_pack()
+            if self.pack is not None:
+                self.load_from_pack(self.pack)
+                return
+
+        # Потоков больше, чем ядер, не нужно: декодирование упирается в процессор
+        workers = max(1, min(ASSET_LOADER_WORKERS, os.cpu_count() or 1))
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="assets")
+
+        for name, filename, options in SPRITE_MANIFEST:
+            path = os.path.join(SPRITES_DIR, filename)
+            self.submit("sprites", lambda path=path: pygame.image.load(path),
+                        lambda image, name=name, filename=filename, options=options:
+                        finish_sprite(name, filename, image, **options),
+                        lambda name=name, filename=filename, options=options: load_sprite(name, filename, **options))
+        for name, filename, rows, cols, scale in SHEET_MANIFEST:
+            path = os.path.join(SPRITES_DIR, filename)
+            self.submit("sprites", lambda path=path: pygame.image.load(path),
+                        lambda sheet, args=(name, filename, rows, cols, scale):
+                        finish_sprite_sheet(args[0], args[1], sheet, *args[2:], pinned=pinned_sheet(args[0])),
+                        lambda args=(name, filename, rows, cols, scale): load_sprite_sheet(*args))
+        # Единый реестр звуков: имена и громкость из SOUND_VOLUMES, файл – assets/sounds/<имя>.wav
+        for name, volume in SOUND_VOLUMES.items():
+            path = os.path.join(SOUNDS_DIR, f"{name}.wav")
+            self.submit("sounds", lambda path=path, volume=volume: decode_sound(path, volume),
+                        lambda sound, name=name: SOUND_CACHE.__setitem__(name, sound),
+                        lambda name=name, volume=volume: load_sound(name, f"{name}.wav", volume))
+
+    def load_from_pack(self, pack) -> None:
+        from settings import SOUND_VOLUMES
+        for name, filename, options in SPRITE_MANIFEST:
+            finish_sprite(name, filename, pack.image(pack.index["sprites"][name]), **options)
+        for name, filename, rows, cols, scale in SHEET_MANIFEST:
+            store_sheet(name, filename, rows, cols, scale,
+                        [pack.image(entry).convert_alpha() for entry in pack.index["sheets"][name]["frames"]],
+                        pinned_sheet(name))
+        for name, volume in SOUND_VOLUMES.items():
+            SOUND_CACHE[name] = pack.sound(name, volume)
+        prebake_all_variants()
+        build_atlas()
+        self.total = self.completed = len(SPRITE_MANIFEST) + len(SHEET_MANIFEST) + len(SOUND_VOLUMES)
+
+    def pump(self, budget_ms: Optional[float] = None) -> None:
+        # Завершаем в главном потоке уже декодированные ресурсы, пока не исчерпан бюджет времени кадра.
+        # Порядок сохраняется, поэтому незавершенный ресурс задерживает следующие за ним
+        deadline = None if budget_ms is None else time.perf_counter() + budget_ms / 1000
+        while self.pending and self.pending[0][1].done():
+            group, _, finish = self.pending.pop(0)
+            finish()
+            self.completed += 1
+            self.remaining[group] -= 1
+            if group == "sprites" and not self.remaining[group]:
+                prebake_all_variants()
+                build_atlas()
+            if deadline is not None and time.perf_counter() > deadline:
+                break
+        if not self.pending and self.executor is not None:
+            self.executor.shutdown(wait=False)
+
+    def is_ready(self, *groups: str) -> bool:
+        if not self.started:
+            return False
+        return all(not self.remaining.get(group, 0) for group in groups or self.remaining)
+
+    def wait(self, *groups: str) -> None:
+        # Блокирующее ожидание готовности групп (всех, если группы не указаны)
+        self.start()
+        while not self.is_ready(*groups):
+            # Ждем следующий по порядку ресурс и сразу завершаем все готовые
+            futures.wait([self.pending[0][1]])
+            self.pump()
+
+    def progress(self) -> float:
+        return self.completed / self.total if self.total else 0.0
+
+
+ASSET_LOADER = AssetLoader()
+
+def load_fonts() -> None:
+    # Шрифты нужны главному меню с первого кадра, поэтому загружаются сразу
+    for size in FONT_SIZES:
+        get_font(size)
+
+def start_loading() -> None:
+    # Шрифты – сразу, спрайты и звуки – в фоне; ход загрузки отслеживается через ASSET_LOADER
+    load_fonts()
+    ASSET_LOADER.start()
+
+def preload_resources() -> None:
+    # Синхронная предзагрузка: те же фоновые задачи, но с ожиданием их завершения
     try:
-        # Предзагружаем шрифты для стабильного отображения интерфейса
-        get_font(20)  # HUD
-        get_font(24)  # Информационные элементы
-        get_font(28)  # Меню улучшений
-        get_font(36)  # Основное меню
-        get_font(48)  # Заголовки
-        get_font(64)  # Акцентный текст
-        get_font(72)  # Главный заголовок
-
-        # Загружаем звуки для быстрого отклика на действие
-        load_sound("menu_navigate", "menu_navigate.wav", 0.5)
-        load_sound("menu_confirm", "menu_confirm.wav", 0.7)
-        load_sound("upgrade_success", "upgrade_success.wav", 0.7)
-        load_sound("player_damage", "player_damage.wav", 0.7)
-        load_sound("skeleton_damage", "skeleton_damage.wav", 0.7)
-        load_sound("skeleton_death", "skeleton_death.wav", 0.7)
-        load_sound("health", "health.wav", 0.7)
-        load_sound("sword_attack", "sword_swing.wav", 0.6)
-
-        # Загружаем спрайты и спрайт-листы для динамики игры
-        load_sprite("background", "background.png")
-        load_sprite_sheet("player", "player.png", 4, 4, (50, 50))
-        load_sprite_sheet("skeleton_walk", "skeleton_walk.png", 1, 13, (50, 70))
-        load_sprite_sheet("skeleton_attack", "skeleton_attack.png", 1, 18, (80, 80))
-        load_sprite_sheet("skeleton_dead", "skeleton_dead.png", 1, 15, (50, 70))
-        load_sprite_sheet("skeleton_hit", "skeleton_hit.png", 1, 8, (50, 70))
-        load_sprite_sheet("health", "health_bar.png", 5, 1, (256, 64))
-        load_sprite_sheet("slash_effect", "slash_effect.png", 3, 3, (50, 50))
-        load_sprite_sheet("meep_moop", "meep_moop.png", 1, 2, (50, 65))
+        start_loading()
+        ASSET_LOADER.wait()
     except Exception as e:
         print(f"Error during resource preloading: {e}")
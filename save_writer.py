@@ -0,0 +1,136 @@
+import os
+import json
+import time
+import atexit
+import threading
+from collections import deque
+from settings import SAVE_ASYNC, SAVE_FLUSH_TIMEOUT, SAVE_LATENCY_HISTORY
+
+
+def write_atomic(path, data):
+    # Пишем во временный файл рядом с целевым, сбрасываем на диск и атомарно подменяем:
+    # при сбое посреди записи на диске остается либо старое, либо новое сохранение целиком.
+    # bytes записываются как есть, остальное – как JSON
+    temp_path = path + ".tmp"
+    try:
+        with open(temp_path, "wb" if isinstance(data, bytes) else "w") as f:
+            if isinstance(data, bytes):
+                f.write(data)
+            else:
+                json.dump(data, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+    except OSError:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    # Переименование становится надежным после сброса каталога (на Windows каталог не открыть – пропускаем)
+    if hasattr(os, "O_DIRECTORY"):
+        directory = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(directory)
+        finally:
+            os.close(directory)
+
+
+# Отложенная запись сохранений в фоновом потоке
+# Главный поток только кладет готовый словарь в очередь; серия сохранений подряд (конец уровня,
+# несколько покупок улучшений) схлопывается – на диск попадает лишь последнее состояние каждого файла
+class SaveWriter:
+    def __init__(self, async_mode=SAVE_ASYNC, history=SAVE_LATENCY_HISTORY):
+        self.async_mode = async_mode
+        self.condition = threading.Condition()
+        self.pending = {}  # путь -> (данные, время постановки первого несохраненного запроса)
+        self.writing = False
+        self.closed = False
+        self.thread = None
+        self.submitted = 0
+        self.written = 0
+        self.coalesced = 0
+        self.errors = 0
+        # Время записи файла и полная задержка от запроса до надежного сохранения, мс
+        self.write_times = deque(maxlen=history)
+        self.latencies = deque(maxlen=history)
+
+    def submit(self, path, data):
+        self.submitted += 1
+        if not self.async_mode or self.closed:
+            self.write(path, data, time.perf_counter())
+            return
+        with self.condition:
+            if path in self.pending:
+                # Более раннее несохраненное состояние заменяется новым; задержку считаем от первого запроса
+                self.coalesced += 1
+                queued = self.pending[path][1]
+            else:
+                queued = time.perf_counter()
+            self.pending[path] = (data, queued)
+            if self.thread is None:
+                # Поток запускается при первом сохранении – безоконные прогоны без файла его не создают
+                self.thread = threading.Thread(target=self.run, name="save-writer", daemon=True)
+                self.thread.start()
+            self.condition.notify()
+
+    def run(self):
+        while True:
+            with self.condition:
+                while not self.pending and not self.closed:
+                    self.condition.wait()
+                if not self.pending:
+                    return
+                batch = self.pending
+                self.pending = {}
+                self.writing = True
+            for path, (data, queued) in batch.items():
+                self.write(path, data, queued)
+            with self.condition:
+                self.writing = False
+                self.condition.notify_all()
+
+    def write(self, path, data, queued):
+        started = time.perf_counter()
+        try:
+            write_atomic(path, data)
+        except (OSError, TypeError, ValueError) as e:
+            self.errors += 1
+            print(f"Save error: {e}")
+            return
+        finished = time.perf_counter()
+        self.written += 1
+        self.write_times.append((finished - started) * 1000.0)
+        self.latencies.append((finished - queued) * 1000.0)
+
+    def flush(self, timeout=SAVE_FLUSH_TIMEOUT):
+        # Ждем, пока все поставленные сохранения окажутся на диске; False – если не уложились в timeout
+        deadline = time.perf_counter() + timeout
+        with self.condition:
+            while self.pending or self.writing:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    print("Save flush timed out, latest save may be lost")
+                    return False
+                self.condition.wait(remaining)
+        return True
+
+    def close(self, timeout=SAVE_FLUSH_TIMEOUT):
+        # Хук выхода: дописываем очередь и останавливаем поток; последующие сохранения пишутся синхронно
+        flushed = self.flush(timeout)
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
+        return flushed
+
+    def summary(self):
+        if not self.written:
+            return f"saves {self.submitted}, none written"
+        write_times = sorted(self.write_times)
+        latencies = sorted(self.latencies)
+        return (f"saves {self.submitted}, written {self.written}, coalesced {self.coalesced}, errors {self.errors} | "
+                f"write p50 {write_times[len(write_times) // 2]:.1f} ms, max {write_times[-1]:.1f} ms | "
+                f"latency max {latencies[-1]:.1f} ms")
+
+
+# Единый писатель сохранений; при завершении интерпретатора очередь дописывается даже без явного close
+SAVE_WRITER = SaveWriter()
+atexit.register(SAVE_WRITER.close)
@@ -0,0 +1,57 @@
+import heapq
+
+
+# Планировщик событий мира по времени симуляции (двоичная куча сроков)
+# Вместо того чтобы каждый тик опрашивать поля всех объектов, объект один раз регистрирует срок
+# и действие; за тик извлекаются только наступившие события, поэтому стоимость – O(сработавших · log n).
+# Событие – список [срок, порядковый номер, объект, действие]: номер делает порядок срабатывания
+# при равных сроках детерминированным (в порядке регистрации), а действие – имя, а не функция,
+# поэтому очередь можно сохранить в снимок мира и восстановить
+class Scheduler:
+    def __init__(self):
+        self.queue = []
+        self.sequence = 0
+        # Обработчики действий уровня мира: имя -> функция(объект); остальные действия – методы объекта
+        self.handlers = {}
+        self.stats = {"scheduled": 0, "fired": 0, "cancelled": 0}
+
+    def schedule(self, deadline, target, action):
+        timer = [deadline, self.sequence, target, action]
+        self.sequence += 1
+        heapq.heappush(self.queue, timer)
+        self.stats["scheduled"] += 1
+        return timer
+
+    def cancel(self, timer):
+        # Ленивое удаление: событие остается в куче, но без объекта и будет пропущено при извлечении
+        if timer is not None and timer[2] is not None:
+            timer[2] = None
+            self.stats["cancelled"] += 1
+
+    def run(self, now):
+        # Выполняем все события со сроком не позже now в порядке сроков
+        queue = self.queue
+        while queue and queue[0][0] <= now:
+            timer = heapq.heappop(queue)
+            target = timer[2]
+            if target is None:
+                continue
+            timer[2] = None
+            handler = self.handlers.get(timer[3])
+            if handler is not None:
+                handler(target)
+            else:
+                getattr(target, timer[3])()
+            self.stats["fired"] += 1
+
+    def pending(self):
+        # Действующие события в порядке срабатывания – для снимка мира
+        return sorted(timer for timer in self.queue if timer[2] is not None)
+
+    def restore(self, timers, sequence):
+        self.queue = list(timers)
+        heapq.heapify(self.queue)
+        self.sequence = sequence
+
+    def __len__(self):
+        return sum(1 for timer in self.queue if timer[2] is not None)
@@ -15,11 +15,64 @@ SCREEN_HEIGHT = 600
 BACKGROUND_COLOR = (30, 30, 30)
 TITLE = "Papich's Adventure"
 FPS = 60
+# Темп вывода кадров – режим (fixed, vsync, uncapped, precise), допуск опоздания кадра и запас активного ожидания
+FRAME_PACING_MODE = "fixed"
+FRAME_DEADLINE_TOLERANCE_MS = 1.0
+PRECISE_SPIN_MS = 2.0
+# Профилирование кадра – число кадров в кольцевом буфере и период пересчета перцентилей оверлея
+PROFILER_HISTORY = 600
+PROFILER_REFRESH_MS = 250
+
+# Симуляция с фиксированным шагом – частота тиков, защита от лавины шагов и пределы масштаба времени
+SIM_TICK_RATE = 60
+SIM_MAX_STEPS_PER_FRAME = 5
+SIM_MIN_TIME_SCALE = 0.25
+SIM_MAX_TIME_SCALE = 4.0
+# Смещение за тик, после которого объект считается телепортированным (перенос через край мира)
+# и отрисовывается без интерполяции
+INTERPOLATION_SNAP_DISTANCE = 200
 
 # Габариты игрового мира и плавность перемещения камеры
 WORLD_WIDTH = 3200
 WORLD_HEIGHT = 2400
 CAMERA_SMOOTHNESS = 0.1
+# Размер ячейки пространственной сетки – не меньше самого крупного спрайта врага (80 px),
+# чтобы пересекающиеся объекты всегда оказывались в соседних ячейках
+SPATIAL_CELL_SIZE = 100
+
+# Фоновая загрузка ресурсов – число потоков декодирования и время на завершение загрузок в кадре
+ASSET_LOADER_WORKERS = 4
+ASSET_PUMP_BUDGET_MS = 4
+
+# Сохранения – запись в фоновом потоке, предельное ожидание дозаписи при выходе (с) и число замеров задержки
+SAVE_ASYNC = True
+SAVE_FLUSH_TIMEOUT = 2.0
+SAVE_LATENCY_HISTORY = 100
+
+# Снимок незавершенного забега – восстанавливается пунктом меню Continue
+WORLD_SNAPSHOT_FILE = "world.snap"
+
+# Бюджет памяти кэша спрайтов и листов (МБ); предзагруженные ресурсы закреплены и не вытесняются
+SPRITE_CACHE_BUDGET_MB = 64
+
+# Собранный пак ресурсов (python asset_pack.py) – готовые кадры и PCM звуков в одном файле
+USE_ASSET_PACK = True
+ASSET_PACK_FILE = os.path.join(BASE_DIR, "assets.pack")
+
+# Атлас текстур – размер квадратной страницы и зазор между кадрами
+TEXTURE_ATLAS = True
+ATLAS_PAGE_SIZE = 1024
+ATLAS_PADDING = 1
+
+# Микшер – частота, размер буфера в сэмплах (меньше – ниже задержка звука) и число каналов
+AUDIO_FREQUENCY = 44100
+AUDIO_BUFFER = 512
+AUDIO_CHANNELS = 16
+# Звук в мире – полная громкость до AUDIO_FULL_DISTANCE от центра камеры, тишина с AUDIO_MAX_DISTANCE;
+# при горизонтальном смещении AUDIO_PAN_DISTANCE звук целиком уходит в один канал
+AUDIO_FULL_DISTANCE = 500
+AUDIO_MAX_DISTANCE = 1500
+AUDIO_PAN_DISTANCE = 800
 
 # Громкость звуков – настройка аудиоэффектов
 SOUND_VOLUMES = {
@@ -32,6 +85,26 @@ SOUND_VOLUMES = {
     "skeleton_death": 0.2,
     "health": 0.2
 }
+# Голоса звуков: (приоритет, предел одновременных экземпляров); при нехватке каналов важные вытесняют остальные
+SOUND_VOICES = {
+    "menu_navigate": (3, 1),
+    "menu_confirm": (3, 1),
+    "upgrade_success": (3, 1),
+    "player_damage": (3, 2),
+    "health": (2, 1),
+    "sword_attack": (2, 2),
+    "skeleton_death": (1, 4),
+    "skeleton_damage": (0, 4)
+}
+# Звуки событий мира: (группа сущности, событие) -> имя звука
+EVENT_SOUNDS = {
+    ("player", "damaged"): "player_damage",
+    ("player", "died"): "player_damage",
+    ("player", "attacked"): "sword_attack",
+    ("enemy", "damaged"): "skeleton_damage",
+    ("enemy", "died"): "skeleton_death",
+    ("healing_item", "picked_up"): "health"
+}
 
 # Характеристики игрока – базовые параметры силы, скорости и здоровья
 PLAYER_BASE_HP = 4
@@ -50,6 +123,10 @@ ENEMY_WALK_ANIMATION_SPEED = 50
 ENEMY_ATTACK_ANIMATION_SPEED = 25
 ENEMY_DEATH_DURATION = 2000
 ENEMY_HIT_DURATION = 500
+# Число ступеней прозрачности для заранее подготовленных кадров затухания
+ALPHA_STEPS = 16
+# Режим расчета движения врагов: "scalar" – каждый враг сам по себе, "batch" – векторизованно через NumPy
+ENEMY_STEERING_MODE = "scalar"
 
 # Параметры лечения – спавн, скорость движения и величина исцеления
 HEALING_ITEM_SPAWN_DISTANCE = 200
@@ -66,6 +143,12 @@ CORPSE_CLEANUP_INTERVAL = 1000
 CORPSE_DESPAWN_TIME = 5000
 WAVE_BASE_ENEMIES = 5
 WAVE_ENEMY_INCREMENT = 2  # Дополнительные враги за волну
+# Спавн волны – минимальное расстояние до игрока и между врагами, предел попыток поиска точки
+# и число врагов, появляющихся за один тик
+WAVE_SPAWN_PLAYER_DISTANCE = 500
+WAVE_SPAWN_SPACING = 80
+WAVE_SPAWN_MAX_ATTEMPTS = 30
+WAVE_SPAWNS_PER_TICK = 4
 
 # Параметры прокачки – коэффициенты улучшений характеристик
 SPEED_UPGRADE_MULTIPLIER = 0.1
@@ -94,6 +177,9 @@ UI_STAT_COLOR_SPEED = (100, 255, 100)
 UI_STAT_COLOR_HEALTH = (255, 100, 100)
 UI_STAT_COLOR_DAMAGE = (200, 100, 255)
 
+# Максимальное число отрендеренных строк текста в LRU-кэше
+TEXT_CACHE_SIZE = 256
+
 # Шрифты – выбор между кастомным и системным
 CUSTOM_FONT_PATH = os.path.join(FONT_DIR, "OldeTome.ttf")
 DEFAULT_FONT = "arial"
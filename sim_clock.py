@@ -0,0 +1,48 @@
+from settings import SIM_TICK_RATE, SIM_MAX_STEPS_PER_FRAME, SIM_MIN_TIME_SCALE, SIM_MAX_TIME_SCALE
+
+
+# Часы симуляции с фиксированным шагом
+# Все игровые таймеры (анимации, атаки, исчезновение трупов) читают время отсюда,
+# а не из pygame.time.get_ticks(), поэтому скорость игры не зависит от FPS,
+# а пауза останавливает и анимации, и таймеры
+class SimulationClock:
+    def __init__(self, tick_rate=SIM_TICK_RATE, max_steps_per_frame=SIM_MAX_STEPS_PER_FRAME):
+        self.step_ms = 1000.0 / tick_rate
+        self.max_steps_per_frame = max_steps_per_frame
+        self.time = 0.0  # Время симуляции в миллисекундах
+        self.ticks = 0
+        self.accumulator = 0.0
+        self.time_scale = 1.0
+
+    def now(self):
+        # Текущее время симуляции в целых миллисекундах, как у get_ticks()
+        return int(self.time)
+
+    def advance(self, real_dt):
+        # Накапливаем реальное время кадра с учетом масштаба и возвращаем число шагов для выполнения.
+        # Число шагов за кадр ограничено, чтобы долгий кадр не вызвал лавину догоняющих обновлений
+        self.accumulator += real_dt * self.time_scale
+        steps = int(self.accumulator // self.step_ms)
+        if steps > self.max_steps_per_frame:
+            steps = self.max_steps_per_frame
+            self.accumulator = 0.0
+        else:
+            self.accumulator -= steps * self.step_ms
+        return steps
+
+    def step(self):
+        # Один фиксированный шаг симуляции
+        self.time += self.step_ms
+        self.ticks += 1
+
+    @property
+    def alpha(self):
+        # Доля следующего шага, уже прошедшая в реальном времени – для интерполяции отрисовки
+        return min(1.0, self.accumulator / self.step_ms)
+
+    def set_time_scale(self, scale):
+        # Замедление (< 1) или ускорение (> 1) симуляции без изменения шага
+        self.time_scale = max(SIM_MIN_TIME_SCALE, min(SIM_MAX_TIME_SCALE, scale))
+
+    def reset_accumulator(self):
+        self.accumulator = 0.0
@@ -0,0 +1,320 @@
+import os
+import struct
+import random
+from save_writer import write_atomic
+from entities import ENEMY_ARCHETYPES
+from event_bus import ALIVE, DYING, CORPSE
+from settings import ENEMY_STEERING_MODE, WORLD_SNAPSHOT_FILE
+
+# Двоичный снимок запущенного GameWorld: заголовок с сигнатурой и версией, затем блоки фиксированных
+# структур – часы и поля мира, прогресс и сессия, состояние ГСЧ, игрок, спрайты мира в порядке групп, эффекты,
+# события планировщика и очередь спавна волны.
+# При изменении любой структуры версия увеличивается, а снимки старой версии отвергаются
+MAGIC = b"PSNP"
+VERSION = 4
+HEADER = struct.Struct("<4sH")
+WORLD = struct.Struct("<dQdII?qQ")
+PROGRESS = struct.Struct("<6i")
+SESSION = struct.Struct("<4i")
+RANDOM = struct.Struct("<i625I?d")
+PLAYER = struct.Struct("<iiBHqi")
+COUNT = struct.Struct("<I")
+KIND = struct.Struct("<B")
+ENEMY = struct.Struct("<BiiBHqdhHBHB??qqqq")
+HEALING_ITEM = struct.Struct("<dddddi")
+EFFECT = struct.Struct("<BiqqiiHHH?iiH")
+INDEX = struct.Struct("<I")
+TIMER = struct.Struct("<qQIB")
+WAVE = struct.Struct("<IIQI")
+SPAWN_POINT = struct.Struct("<ii")
+
+KIND_ENEMY = 0
+KIND_HEALING_ITEM = 1
+# Затухший труп: враг вне all_sprites, который ждет уборки только в группе врагов
+KIND_HIDDEN_CORPSE = 2
+# Отсутствующая отметка времени (None); время симуляции не бывает отрицательным
+NO_TIME = -1
+
+DIRECTIONS = ("down", "left", "right", "up")
+ENEMY_STATES = ("walking", "attacking", "hit", "dying")
+# Вид врага хранится номером в описании видов; новые виды дописываются в конец ENEMY_ARCHETYPES
+ENEMY_ARCHETYPE_NAMES = tuple(ENEMY_ARCHETYPES)
+# Действия событий планировщика, целью которых служит враг
+TIMER_ACTIONS = ("end_hit", "hide_corpse", "despawn_corpse")
+PROGRESS_FIELDS = ("upgrade_points", "speed_upgrades", "health_upgrades", "damage_upgrades",
+                   "highest_level", "total_points")
+SESSION_FIELDS = ("level", "player_hp", "current_hp", "score")
+
+
+def pack_time(value):
+    return NO_TIME if value is None else value
+
+
+def unpack_time(value):
+    return None if value == NO_TIME else value
+
+
+def dump_world(world):
+    # Сериализует мир в bytes; враги, на которых ссылаются эффекты, записываются индексом в порядке групп
+    from entities import HealingItem
+    clock = world.clock
+    player = world.player
+    progress = player.game_state.progress
+    session = player.game_state.session
+    version, state, gauss_next = random.getstate()
+
+    parts = [
+        HEADER.pack(MAGIC, VERSION),
+        WORLD.pack(clock.time, clock.ticks, clock.time_scale, world.level, world.removed_corpses,
+                   world.healing_item_spawned, world.last_attack_time, world.scheduler.sequence),
+        PROGRESS.pack(*(getattr(progress, field) for field in PROGRESS_FIELDS)),
+        SESSION.pack(*(getattr(session, field) for field in SESSION_FIELDS)),
+        RANDOM.pack(version, *state, gauss_next is not None, gauss_next or 0.0),
+        PLAYER.pack(player.rect.x, player.rect.y, DIRECTIONS.index(player.direction), player.frame_index,
+                    player.last_update, player.hits)
+    ]
+
+    # Спрайты мира, кроме игрока, в порядке группы: порядок обновления влияет на результат симуляции
+    # Затухшие трупы дописываются следом – их нет в all_sprites, но на них ссылаются события уборки
+    sprites = [sprite for sprite in world.all_sprites.sprites() if sprite is not player]
+    hidden = [enemy for enemy in world.enemies.sprites() if enemy not in world.all_sprites]
+    enemy_index = {}
+    parts.append(COUNT.pack(len(sprites) + len(hidden)))
+    for position, sprite in enumerate(sprites + hidden):
+        if isinstance(sprite, HealingItem):
+            parts.append(KIND.pack(KIND_HEALING_ITEM))
+            parts.append(HEALING_ITEM.pack(sprite.pos.x, sprite.pos.y, sprite.dest.x, sprite.dest.y,
+                                           sprite.speed, sprite.heal_amount))
+        else:
+            enemy_index[sprite] = len(enemy_index)
+            parts.append(KIND.pack(KIND_HIDDEN_CORPSE if position >= len(sprites) else KIND_ENEMY))
+            parts.append(ENEMY.pack(
+                ENEMY_ARCHETYPE_NAMES.index(sprite.archetype.name), sprite.rect.x, sprite.rect.y, ENEMY_STATES.index(sprite.state), sprite.frame_index,
+                sprite.last_update, sprite.speed, sprite.health, sprite.attack_range, sprite.damage_frame,
+                sprite.fade_duration, sprite.alpha, sprite.attacked, sprite.death_animation_completed,
+                pack_time(sprite.death_start_time), pack_time(sprite.death_completed_time),
+                pack_time(sprite.fade_start_time), pack_time(sprite.hit_start_time)))
+
+    effects = world.effects.sprites()
+    parts.append(COUNT.pack(len(effects)))
+    for effect in effects:
+        damaged = [enemy_index[enemy] for enemy in effect.damaged_enemies if enemy in enemy_index]
+        width, height = effect.scale
+        parts.append(EFFECT.pack(DIRECTIONS.index(effect.direction), effect.duration, effect.elapsed,
+                                 effect.last_update, effect.arc_radius, effect.damage, width, height,
+                                 effect.frame_index, effect.hit_done, effect.rect.centerx, effect.rect.centery,
+                                 len(damaged)))
+        parts.extend(INDEX.pack(index) for index in damaged)
+
+    # Действующие события планировщика с исходными порядковыми номерами – порядок срабатывания сохраняется
+    timers = world.scheduler.pending()
+    parts.append(COUNT.pack(len(timers)))
+    for deadline, sequence, target, action in timers:
+        parts.append(TIMER.pack(deadline, sequence, enemy_index[target], TIMER_ACTIONS.index(action)))
+
+    # Режиссер волн: еще не появившиеся враги текущей волны и seed точек следующей
+    director = world.wave_director
+    parts.append(WAVE.pack(director.level or 0, director.seed is not None, director.seed or 0,
+                           len(director.pending)))
+    parts.extend(SPAWN_POINT.pack(x, y) for x, y in director.pending)
+    return b"".join(parts)
+
+
+class SnapshotReader:
+    def __init__(self, data):
+        self.data = memoryview(data)
+        self.offset = 0
+
+    def read(self, layout):
+        try:
+            values = layout.unpack_from(self.data, self.offset)
+        except struct.error:
+            raise ValueError("truncated snapshot")
+        self.offset += layout.size
+        return values
+
+
+def load_world(data, factory, game_state, restore_progress=True, steering_mode=ENEMY_STEERING_MODE):
+    # Восстанавливает GameWorld из bytes. restore_progress=False оставляет прогресс игрока из game_state:
+    # улучшения, купленные после снимка, не должны теряться при продолжении игры
+    from states import GameWorld
+    from effects import SwordSwingEffect
+    reader = SnapshotReader(data)
+    magic, version = reader.read(HEADER)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"unsupported snapshot format {magic!r} v{version}")
+
+    time_ms, ticks, time_scale, level, removed_corpses, healing_item_spawned, last_attack_time, \
+        timer_sequence = reader.read(WORLD)
+    progress = reader.read(PROGRESS)
+    session = reader.read(SESSION)
+    random_state = reader.read(RANDOM)
+
+    clock = factory.clock
+    clock.time = time_ms
+    clock.ticks = ticks
+    clock.time_scale = time_scale
+    clock.reset_accumulator()
+    if restore_progress:
+        for field, value in zip(PROGRESS_FIELDS, progress):
+            setattr(game_state.progress, field, value)
+    for field, value in zip(SESSION_FIELDS, session):
+        setattr(game_state.session, field, value)
+
+    x, y, direction, frame_index, last_update, hits = reader.read(PLAYER)
+    player = factory.create_player((0, 0), game_state)
+    player.rect.topleft = (x, y)
+    player.direction = DIRECTIONS[direction]
+    player.current_animation = player.animations[player.direction]
+    player.frame_index = frame_index
+    player.image = player.current_animation[frame_index]
+    player.last_update = last_update
+    player.hits = hits
+    player.update_stats()
+
+    world = GameWorld(player, factory, level, steering_mode, populate=False)
+    world.removed_corpses = removed_corpses
+    world.healing_item_spawned = healing_item_spawned
+    world.last_attack_time = last_attack_time
+
+    enemies = []
+    sprites = []
+    for _ in range(reader.read(COUNT)[0]):
+        kind, = reader.read(KIND)
+        if kind in (KIND_ENEMY, KIND_HIDDEN_CORPSE):
+            record = reader.read(ENEMY)
+            enemy = restore_enemy(factory.create_enemy((0, 0), player, ENEMY_ARCHETYPE_NAMES[record[0]]), record[1:])
+            enemies.append(enemy)
+            if kind == KIND_ENEMY:
+                sprites.append(enemy)
+        elif kind == KIND_HEALING_ITEM:
+            pos_x, pos_y, dest_x, dest_y, speed, heal_amount = reader.read(HEALING_ITEM)
+            item = factory.create_healing_item((int(pos_x), int(pos_y)), player)
+            item.pos.update(pos_x, pos_y)
+            item.dest.update(dest_x, dest_y)
+            item.speed = speed
+            item.heal_amount = heal_amount
+            world.healing_items.add(item)
+            sprites.append(item)
+        else:
+            raise ValueError(f"unknown sprite kind {kind}")
+    world.enemies.add(enemies)
+    world.all_sprites.add(sprites)
+
+    for _ in range(reader.read(COUNT)[0]):
+        direction, duration, elapsed, last_update, arc_radius, damage, width, height, frame_index, hit_done, \
+            center_x, center_y, damaged_count = reader.read(EFFECT)
+        # Углы дуги и повернутые кадры эффект берет из направления игрока в момент удара
+        player_direction = player.direction
+        player.direction = DIRECTIONS[direction]
+        effect = SwordSwingEffect(player, world.enemies, duration, (width, height), arc_radius)
+        player.direction = player_direction
+        effect.elapsed = elapsed
+        effect.last_update = last_update
+        effect.damage = damage
+        effect.frame_index = frame_index
+        effect.image = effect.frames[frame_index]
+        effect.hit_done = hit_done
+        effect.rect.center = (center_x, center_y)
+        effect.damaged_enemies = {enemies[reader.read(INDEX)[0]] for _ in range(damaged_count)}
+        world.effects.add(effect)
+
+    timers = []
+    for _ in range(reader.read(COUNT)[0]):
+        deadline, sequence, index, action = reader.read(TIMER)
+        timer = [deadline, sequence, enemies[index], TIMER_ACTIONS[action]]
+        if timer[3] == "end_hit":
+            timer[2].hit_timer = timer
+        timers.append(timer)
+    world.scheduler.restore(timers, timer_sequence)
+
+    next_level, has_seed, seed, pending_count = reader.read(WAVE)
+    world.wave_director.pending.extend(reader.read(SPAWN_POINT) for _ in range(pending_count))
+    if has_seed:
+        # Фоновый расчет точек следующей волны перезапускается с тем же seed
+        world.wave_director.prepare(next_level, seed)
+
+    # ГСЧ восстанавливается последним: создание аптечек выше само потребляет случайные числа
+    version, *state, has_gauss, gauss_next = random_state
+    random.setstate((version, tuple(state), gauss_next if has_gauss else None))
+    world.spatial_index.sync(world.all_sprites)
+    return world
+
+
+def restore_enemy(enemy, record):
+    x, y, state, frame_index, last_update, speed, health, attack_range, damage_frame, fade_duration, alpha, \
+        attacked, death_animation_completed, death_start_time, death_completed_time, fade_start_time, \
+        hit_start_time = record
+    enemy.rect.topleft = (x, y)
+    enemy.state = ENEMY_STATES[state]
+    enemy.frame_index = frame_index
+    enemy.last_update = last_update
+    enemy.speed = speed
+    enemy.health = health
+    enemy.attack_range = attack_range
+    enemy.damage_frame = damage_frame
+    enemy.fade_duration = fade_duration
+    enemy.alpha = alpha
+    enemy.attacked = attacked
+    enemy.death_animation_completed = death_animation_completed
+    enemy.death_start_time = unpack_time(death_start_time)
+    enemy.death_completed_time = unpack_time(death_completed_time)
+    enemy.fade_start_time = unpack_time(fade_start_time)
+    enemy.hit_start_time = unpack_time(hit_start_time)
+    enemy.image = enemy_image(enemy)
+    # Фабрика учла врага живым; стадию в счетчиках шины приводим к восстановленной без оповещения подписчиков
+    if enemy.state == enemy.STATE_DYING:
+        enemy.events.move(enemy.event_group, ALIVE, DYING)
+        if enemy.death_completed_time is not None:
+            enemy.events.move(enemy.event_group, DYING, CORPSE)
+    return enemy
+
+
+def enemy_image(enemy):
+    # Кадр на экране выводится из состояния так же, как его выбирают обработчики состояний врага
+    from resources import get_frame_variant
+    if enemy.state == enemy.STATE_DYING:
+        if enemy.fade_start_time is not None:
+            return get_frame_variant(enemy.archetype.death_sheet, enemy.frame_index, alpha=enemy.alpha)
+        return enemy.death_animations[enemy.frame_index]
+    if enemy.state == enemy.STATE_ATTACK:
+        return enemy.facing_frame(enemy.archetype.attack_sheet, min(enemy.frame_index, len(enemy.attack_animations) - 1))
+    if enemy.state == enemy.STATE_HIT:
+        return enemy.facing_frame(enemy.archetype.hit_sheet, min(enemy.frame_index, len(enemy.hit_animations) - 1))
+    # Враг, только что вышедший из атаки, до смены кадра ходьбы еще хранит номер кадра атаки
+    return enemy.facing_frame(enemy.archetype.walk_sheet, min(enemy.frame_index, len(enemy.walk_animations) - 1))
+
+
+def save_snapshot(world, path=WORLD_SNAPSHOT_FILE):
+    # Атомарная запись: прерванное сохранение не портит предыдущий снимок
+    try:
+        write_atomic(path, dump_world(world))
+    except OSError as e:
+        print(f"Snapshot save error: {e}")
+        return False
+    return True
+
+
+def load_snapshot(path, factory, game_state, restore_progress=True, steering_mode=ENEMY_STEERING_MODE):
+    # Возвращает восстановленный GameWorld или None, если снимка нет или он поврежден
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, "rb") as f:
+            return load_world(f.read(), factory, game_state, restore_progress, steering_mode)
+    except (OSError, ValueError, IndexError) as e:
+        print(f"Error loading snapshot {path}: {e}")
+        return None
+
+
+def has_snapshot(path=WORLD_SNAPSHOT_FILE):
+    return os.path.exists(path)
+
+
+def discard_snapshot(path=WORLD_SNAPSHOT_FILE):
+    # Снимок завершенного или брошенного забега больше не нужен
+    if os.path.exists(path):
+        try:
+            os.remove(path)
+        except OSError as e:
+            print(f"Snapshot remove error: {e}")
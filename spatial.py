@@ -0,0 +1,109 @@
+from collections import defaultdict
+from settings import WORLD_WIDTH, WORLD_HEIGHT, SPATIAL_CELL_SIZE
+
+
+# Равномерная сетка (spatial hash) для быстрого поиска соседних объектов
+# Индексы ячеек берутся по модулю размеров мира, поэтому объекты, вышедшие
+# за край при цикличном переходе, попадают в корректные ячейки, а соседство
+# через шов мира сохраняется
+class SpatialHash:
+    def __init__(self, cell_size=SPATIAL_CELL_SIZE, world_width=WORLD_WIDTH, world_height=WORLD_HEIGHT):
+        self.cell_size = cell_size
+        self.cols = max(1, -(-world_width // cell_size))
+        self.rows = max(1, -(-world_height // cell_size))
+        self.cells = defaultdict(list)
+        # Запоминаем ячейку каждого объекта для инкрементального обновления
+        self.item_cells = {}
+        # Порядковый номер первого добавления – сохраняет порядок группы спрайтов для стабильной сортировки
+        self.sequence = {}
+        self.next_sequence = 0
+
+    def cell_of(self, x, y):
+        # Переводим мировые координаты в индекс ячейки с учетом цикличности мира
+        return (int(x // self.cell_size) % self.cols, int(y // self.cell_size) % self.rows)
+
+    def clear(self):
+        self.cells.clear()
+        self.item_cells.clear()
+        self.sequence.clear()
+        self.next_sequence = 0
+
+    def insert(self, item, rect=None):
+        rect = rect or item.rect
+        cell = self.cell_of(rect.centerx, rect.centery)
+        self.cells[cell].append(item)
+        self.item_cells[item] = cell
+        if item not in self.sequence:
+            self.sequence[item] = self.next_sequence
+            self.next_sequence += 1
+
+    def remove(self, item):
+        self.sequence.pop(item, None)
+        cell = self.item_cells.pop(item, None)
+        if cell is not None:
+            bucket = self.cells[cell]
+            bucket.remove(item)
+            if not bucket:
+                del self.cells[cell]
+
+    def update(self, item, rect=None):
+        # Перемещаем объект между ячейками только если он пересек границу ячейки
+        rect = rect or item.rect
+        cell = self.cell_of(rect.centerx, rect.centery)
+        old_cell = self.item_cells.get(item)
+        if old_cell == cell:
+            return
+        if old_cell is None:
+            self.insert(item, rect)
+            return
+        bucket = self.cells[old_cell]
+        bucket.remove(item)
+        if not bucket:
+            del self.cells[old_cell]
+        self.cells[cell].append(item)
+        self.item_cells[item] = cell
+
+    def sync(self, group):
+        # Инкрементально приводим сетку в соответствие группе: двигаем переместившиеся объекты,
+        # добавляем новые в порядке группы и убираем удаленные из нее
+        for item in group:
+            self.update(item)
+        if len(self.item_cells) != len(group):
+            for item in [item for item in self.item_cells if item not in group]:
+                self.remove(item)
+
+    def rebuild(self, items):
+        # Полная перестройка сетки за O(n) – дешевле инкрементального обновления,
+        # когда почти все объекты двигаются каждый тик
+        self.clear()
+        for item in items:
+            self.insert(item)
+
+    def neighbours(self, cell):
+        # Возвращаем уникальные ячейки окрестности 3x3 (для маленьких сеток соседи могут совпадать)
+        cx, cy = cell
+        return {((cx + ox) % self.cols, (cy + oy) % self.rows) for ox in (-1, 0, 1) for oy in (-1, 0, 1)}
+
+    def query_rect(self, rect):
+        # Объекты, чей центр может лежать в прямоугольнике, расширенном на ячейку (объект не крупнее ячейки);
+        # точную проверку пересечения выполняет вызывающий код
+        first_col = int((rect.left - self.cell_size) // self.cell_size)
+        last_col = int((rect.right + self.cell_size) // self.cell_size)
+        first_row = int((rect.top - self.cell_size) // self.cell_size)
+        last_row = int((rect.bottom + self.cell_size) // self.cell_size)
+        cells = {(cx % self.cols, cy % self.rows)
+                 for cx in range(first_col, last_col + 1) for cy in range(first_row, last_row + 1)}
+        result = []
+        for cell in cells:
+            result.extend(self.cells.get(cell, ()))
+        return result
+
+    def nearby(self, item):
+        # Объекты из соседних ячеек – кандидаты на пересечение с данным объектом
+        cell = self.item_cells.get(item)
+        if cell is None:
+            return []
+        result = []
+        for neighbour in self.neighbours(cell):
+            result.extend(self.cells.get(neighbour, ()))
+        return result
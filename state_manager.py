@@ -5,6 +5,7 @@ class StateManager:
     STATE_MAP = {
         "menu": lambda self: MenuState(self),
         "play": lambda self: PlayState(self),
+        "resume": lambda self: PlayState(self, resume=True),
         "upgrade": lambda self: UpgradeState(self, self.game.game_state.progress),
         "gameover": lambda self: GameOverState(self, self.game.game_state.session.level),
         "victory": lambda self: VictoryState(self, {"Waves": self.game.game_state.session.level})
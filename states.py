@@ -4,14 +4,22 @@ from settings import (
     TITLE, BACKGROUND_COLOR,
     WORLD_WIDTH, WORLD_HEIGHT, HEALING_ITEM_SPAWN_DISTANCE,
     ATTACK_COOLDOWN, PAUSE_BG_COLOR, MENU_TEXT_COLOR,
-    MENU_SELECTED_COLOR, MENU_HOVER_COLOR
+    MENU_HOVER_COLOR, ENEMY_STEERING_MODE,
+    INTERPOLATION_SNAP_DISTANCE, WORLD_SNAPSHOT_FILE, EVENT_SOUNDS
 )
-from resources import load_sprite, get_font
+from resources import load_sprite, get_font, ASSET_LOADER
 from camera import Camera
-from levels import generate_wave
-from ui import draw_hud, draw_tiled_background
+from levels import generate_wave, WaveDirector
+from ui import TiledBackground, get_level_text, freeze_frame
+from widgets import Label, MenuList, StatPanel, HudReadout
 from entities import resolve_collisions, GameObjectFactory
+from spatial import SpatialHash
+from steering import create_steering
+from draw_order import DepthOrder
 from game_state import PlayerProgress
+from event_bus import ALIVE, DIED, DESPAWNED, PICKED_UP
+from snapshot import save_snapshot, load_snapshot, has_snapshot, discard_snapshot
+from profiler import PROFILER, now
 
 
 # Базовый класс для игровых состояний
@@ -38,6 +46,10 @@ class BaseState:
     def play_sound(self, sound_name):
         self.game.sound_service.play(sound_name)
 
+    def on_quit(self):
+        # Вызывается перед закрытием игры, пока состояние еще активно
+        pass
+
 
 # Состояние главного меню
 # Реализует логику навигации по меню, выбора опций и запуска соответствующих действий
@@ -47,10 +59,15 @@ class MenuState(BaseState):
     def __init__(self, state_manager):
         super().__init__(state_manager)
         self.selected = 0  # Индекс выбранной опции меню
-        # Инициализация шрифтов для отображения заголовка и пунктов меню
-        self.title_font = get_font(48)
-        self.option_font = get_font(36)
-        self.option_rects = []  # Хранит области для определения клика по опциям
+        # Пункт Continue появляется, если есть снимок незавершенного забега
+        self.options = (["Continue"] if has_snapshot() else []) + self.OPTIONS
+        # Виджеты заголовка и пунктов меню хранят отрендеренный текст и области для определения клика
+        self.title_label = Label(TITLE, 48, (255, 255, 255), pos=(self.screen_width // 2, self.screen_height // 4))
+        self.option_list = MenuList(self.options, 36, self.screen_width // 2, self.screen_height // 2, 50,
+                                    lambda: self.selected)
+        # Ход фоновой загрузки спрайтов и звуков, пока она не завершена
+        self.loading_label = Label(lambda: f"Loading... {ASSET_LOADER.progress():.0%}", 24, (200, 200, 200),
+                                   pos=(self.screen_width // 2, self.screen_height - 40))
 
         # Определение позиций элементов меню по центру экрана
         self.OPTION_POSITIONS = {
@@ -64,10 +81,10 @@ class MenuState(BaseState):
             # Обработка клавиатурных событий для навигации меню
             if event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_UP:
-                    self.selected = (self.selected - 1) % len(self.OPTIONS)
+                    self.selected = (self.selected - 1) % len(self.options)
                     self.play_sound("menu_navigate")
                 elif event.key == pygame.K_DOWN:
-                    self.selected = (self.selected + 1) % len(self.OPTIONS)
+                    self.selected = (self.selected + 1) % len(self.options)
                     self.play_sound("menu_navigate")
                 elif event.key == pygame.K_RETURN:
                     self.play_sound("menu_confirm")
@@ -81,15 +98,16 @@ class MenuState(BaseState):
 
     def handle_mouse_motion(self, mouse_pos):
         # Определяем, над каким пунктом находится курсор для подсветки выбора
-        for i, rect in enumerate(self.option_rects):
-            if rect.collidepoint(mouse_pos):
-                self.selected = i
-                break
+        index = self.option_list.hit_test(mouse_pos)
+        if index is not None:
+            self.selected = index
 
     def handle_option_select(self):
         # Обработка выбранной опции меню с учетом бизнес-логики
-        option = self.OPTIONS[self.selected]
-        if option == "New Game":
+        option = self.options[self.selected]
+        if option == "Continue":
+            self.state_manager.change_state("resume")
+        elif option == "New Game":
             self.start_new_game()
         elif option == "Upgrade":
             self.state_manager.change_state("upgrade")
@@ -98,15 +116,14 @@ class MenuState(BaseState):
 
     def handle_mouse_click(self):
         # Проверка, по какому пункту клинул пользователь, для немедленного выбора
-        mouse_pos = pygame.mouse.get_pos()
-        for i, rect in enumerate(self.option_rects):
-            if rect.collidepoint(mouse_pos):
-                self.selected = i
-                self.handle_option_select()
-                break
+        index = self.option_list.hit_test(pygame.mouse.get_pos())
+        if index is not None:
+            self.selected = index
+            self.handle_option_select()
 
     def start_new_game(self):
-        # При выборе "New Game" происходит инициализация новой игровой сессии
+        # При выборе "New Game" происходит инициализация новой игровой сессии; прежний забег отбрасывается
+        discard_snapshot()
         self.game.game_state.start_new_game()
         self.state_manager.change_state("play")
 
@@ -118,83 +135,105 @@ class MenuState(BaseState):
         # Отрисовка фонового цвета меню и элементов интерфейса
         screen.fill(BACKGROUND_COLOR)
 
-        # Рендер заголовка с учетом центрального позиционирования.
-        title_text = self.title_font.render(TITLE, True, (255, 255, 255))
-        title_rect = title_text.get_rect(center=(self.screen_width // 2, self.screen_height // 4))
-        screen.blit(title_text, title_rect)
-
-        # Очищаем список областей для последующего определения кликов
-        self.option_rects = []
-
-        # Рисуем каждый пункт меню с выделением выбранного элемента для лучшей навигации
-        for idx, option in enumerate(self.OPTIONS):
-            color = MENU_SELECTED_COLOR if idx == self.selected else MENU_TEXT_COLOR
-            text = self.option_font.render(option, True, color)
-            text_rect = text.get_rect(center=(self.screen_width // 2, self.screen_height // 2 + idx * 50))
-            screen.blit(text, text_rect)
-            self.option_rects.append(text_rect)
-
+        # Заголовок и пункты меню перерисовываются только при смене выбранного пункта
+        self.title_label.draw(screen)
+        self.option_list.draw(screen)
+        if not ASSET_LOADER.is_ready():
+            self.loading_label.draw(screen)
 
 # Класс, управляющий игровым миром
 # Он отвечает за создание объектов уровня, обновление состояния мира и управление коллизиями
 class GameWorld:
-    def __init__(self, player, factory, level):
+    def __init__(self, player, factory, level, steering_mode=ENEMY_STEERING_MODE, populate=True):
         self.player = player
         self.factory = factory
+        self.clock = factory.clock
         self.level = level
+        # Пакетный расчет движения врагов (None – скалярный путь в Enemy.update)
+        self.steering = create_steering(steering_mode)
 
         # Группы спрайтов для управления и отрисовки различных сущностей мира
         self.all_sprites = pygame.sprite.Group(player)
         self.enemies = pygame.sprite.Group()
         self.effects = pygame.sprite.Group()
         self.healing_items = pygame.sprite.Group()
-
-        # Инициализация уровня с помощью генерации волны врагов
-        self.initialize_level()
+        # Позиции спрайтов на начало последнего тика – для интерполяции при отрисовке
+        self.previous_positions = {}
+        # Пространственная сетка для широкой фазы столкновений между врагами
+        self.collision_grid = SpatialHash()
+        # Пространственный индекс всех спрайтов мира для отсечения по области обзора камеры
+        self.spatial_index = SpatialHash()
+        # Следующие волны готовятся в фоне и появляются в мире порциями по тикам
+        self.wave_director = WaveDirector(factory, player)
+        # События мира по сроку: конец оглушения врага – его метод, скрытие и уборка трупа – обработчики мира
+        self.scheduler = factory.scheduler
+        self.scheduler.handlers["hide_corpse"] = self.hide_corpse
+        self.scheduler.handlers["despawn_corpse"] = self.despawn_corpse
+        # Шина событий: звуки и счет убийств – подписчики, завершение волны – счетчик живых врагов
+        self.events = factory.events
+        for event in {event for _, event in EVENT_SOUNDS}:
+            self.events.subscribe(event, self.play_event_sound)
+        self.events.subscribe(DIED, self.count_kill)
+
+        # Инициализация уровня с помощью генерации волны врагов; мир из снимка (populate=False) заполняется снаружи
+        if populate:
+            self.initialize_level()
+        self.spatial_index.sync(self.all_sprites)
         self.removed_corpses = 0
-        self.last_corpse_cleanup = pygame.time.get_ticks()
-        self.corpse_cleanup_interval = 1000
         self.healing_item_spawned = False
         self.last_attack_time = 0
 
     def initialize_level(self):
         # Используем фабрику для создания начальной волны врагов
+        # Первая волна появляется сразу, точки следующей начинают считаться в фоне
         initial_enemies = generate_wave(self.level, self.player, self.factory)
         for enemy in initial_enemies:
             self.enemies.add(enemy)
         self.all_sprites.add(self.enemies)
         self.player.update_stats()  # Синхронизируем характеристики игрока с текущим прогрессом
+        self.wave_director.prepare(self.level + 1)
+
+    def remember_positions(self):
+        # Запоминаем позиции перед шагом симуляции, чтобы отрисовка могла плавно интерполировать между тиками
+        self.previous_positions = {sprite: sprite.rect.topleft for sprite in self.all_sprites}
+        for effect in self.effects:
+            self.previous_positions[effect] = effect.rect.topleft
 
     def update(self, current_time):
-        # Обновляем все группы спрайтов, что обеспечивает динамичное поведение игровых объектов
-        self.all_sprites.update()
+        # Обновляем игрока первым: враги ориентируются на его уже сдвинутую позицию
+        started = now()
+        self.player.update()
+        if self.steering is not None:
+            self.steering.step(self.enemies, self.player)
+
+        # Обновляем остальные спрайты, что обеспечивает динамичное поведение игровых объектов
+        for sprite in self.all_sprites.sprites():
+            if sprite is not self.player:
+                sprite.update()
         self.effects.update()
         self.healing_items.update()
+        PROFILER.add("entities", started)
 
         # Спавн аптечки начинается только после первого уровня для увеличения сложности
         if self.level > 1 and not self.healing_item_spawned:
             self.spawn_healing_item()
 
         # Обработка коллизий между игроком и аптечками для восстановления здоровья
-        for _ in pygame.sprite.spritecollide(self.player, self.healing_items, True):
+        for healing_item in pygame.sprite.spritecollide(self.player, self.healing_items, True):
             self.player.heal(1)
-            self.player.sound_service.play("health")
-
-        # Удаляем трупы врагов для освобождения ресурсов,
-        # если враг закончил анимацию смерти и прошло достаточное время
-        if current_time - self.last_corpse_cleanup > self.corpse_cleanup_interval:
-            self.last_corpse_cleanup = current_time
-            for enemy in list(self.enemies):
-                if enemy.state == "dying" and enemy.death_animation_completed:
-                    if enemy.death_completed_time and current_time - enemy.death_completed_time > 5000:
-                        enemy.kill()
-                        self.removed_corpses += 1
+            self.events.emit(PICKED_UP, healing_item)
+
+        # Срабатывают наступившие события планировщика: конец оглушения, конец затухания и уборка трупов.
+        # Стоимость зависит от числа сработавших событий, а не от числа врагов
+        self.scheduler.run(current_time)
 
         # Решаем проблему наложения и столкновений между врагами для реального физического взаимодействия
-        resolve_collisions(self.enemies)
+        started = now()
+        resolve_collisions(self.enemies, self.collision_grid)
+        PROFILER.add("collisions", started)
 
-        # Если все враги почти мертвы, завершаем уровень и подготавливаем новую волну
-        if all(enemy.state == "dying" for enemy in self.enemies):
+        # Если живых врагов не осталось и волна появилась целиком, завершаем уровень и начинаем новую волну
+        if not self.wave_director.pending and self.events.count("enemy", ALIVE) == 0:
             self.player.game_state.complete_level()
             self.level = self.player.game_state.session.level
 
@@ -202,20 +241,56 @@ class GameWorld:
             if self.level > 10:
                 return "victory"
 
-            # Генерируем следующую волну врагов, сбрасывая флаг спавна аптечки
+            # Новая волна берет заранее посчитанные точки вдали от игрока и трупов, сбрасывая флаг спавна аптечки
             self.healing_item_spawned = False
-            new_enemies = generate_wave(self.level, self.player, self.factory)
-            for enemy in new_enemies:
-                self.enemies.add(enemy)
-            self.all_sprites.add(new_enemies)
+            self.wave_director.start_wave(self.level, [enemy.rect.center for enemy in self.enemies])
             self.player.update_stats()
 
+        # Враги волны появляются не больше WAVE_SPAWNS_PER_TICK за тик – без рывка на смене волны
+        if self.wave_director.pending:
+            new_enemies = self.wave_director.spawn_batch()
+            self.enemies.add(new_enemies)
+            self.all_sprites.add(new_enemies)
+
+        # Поддерживаем индекс отрисовки в актуальном состоянии после всех перемещений и спавна
+        self.spatial_index.sync(self.all_sprites)
+
         # Если игрок получил урон, превышающий допустимый предел, объявляем поражение
         if self.player.hits >= self.player.max_hits:
             return "gameover"
 
         return None
 
+    def hide_corpse(self, enemy):
+        # Затухание закончилось: невидимый труп больше не обновляется и не отрисовывается,
+        # но остается в группе врагов до уборки, чтобы точки новой волны обходили его место
+        self.all_sprites.remove(enemy)
+        self.spatial_index.remove(enemy)
+        self.previous_positions.pop(enemy, None)
+
+    def despawn_corpse(self, enemy):
+        # Удаляем трупы врагов для освобождения ресурсов, когда со смерти прошло CORPSE_DESPAWN_TIME
+        self.release_enemy(enemy)
+        self.removed_corpses += 1
+        self.events.emit(DESPAWNED, enemy)
+
+    def play_event_sound(self, event, entity, *args):
+        sound_name = EVENT_SOUNDS.get((entity.event_group, event))
+        if sound_name:
+            self.factory.sound_service.play(sound_name, entity.rect.center)
+
+    def count_kill(self, event, entity):
+        # Каждый убитый враг добавляет очко к счету текущей сессии
+        if entity.event_group == "enemy":
+            self.player.game_state.session.score += 1
+
+    def release_enemy(self, enemy):
+        # Труп возвращается в пул; следы объекта в индексе и интерполяции убираем сразу,
+        # чтобы повторно выданный враг не унаследовал старую позицию и порядок отрисовки
+        self.factory.enemy_pool.release(enemy)
+        self.spatial_index.remove(enemy)
+        self.previous_positions.pop(enemy, None)
+
     def spawn_healing_item(self):
         # Спавн аптечки в удаленной области от игрока для балансировки игрового процесса
         while True:
@@ -236,72 +311,150 @@ class GameWorld:
 # Система отрисовки, использующая камеру и последовательность спрайтов
 # Она отвечает за преобразование мировых координат в экранные и сортировку объектов по оси Y
 class RenderSystem:
-    def __init__(self, camera, background_tile):
+    def __init__(self, camera, background_tile, hud):
         self.camera = camera
-        self.background_tile = background_tile
+        self.background = TiledBackground(background_tile)
+        self.hud = hud
+        # Статистика последнего кадра: всего спрайтов в мире, отсечено камерой и реально отрисовано
+        self.stats = {"sprites": 0, "culled": 0, "drawn": 0}
+        # Список видимых спрайтов в порядке глубины, переиспользуемый между кадрами
+        self.depth_order = DepthOrder()
+
+    def render(self, screen, world, alpha=1.0):
+        # Смещение камеры и позиции спрайтов интерполируются между двумя последними тиками симуляции
+        offset = self.camera.interpolated_offset(alpha)
+        previous_positions = world.previous_positions
+
+        # Берем из пространственного индекса только спрайты в расширенной области обзора,
+        # поэтому стоимость отрисовки зависит от содержимого экрана, а не от населения мира;
+        # спрайты сортируются по нижней границе для правильного перекрытия
+        # (при равенстве сохраняется порядок добавления в группу)
+        started = now()
+        index = world.spatial_index
+        visible = self.camera.query_visible(index, 100)
+        ordered = self.depth_order.update(visible, index.sequence)
+        PROFILER.add("cull_sort", started)
 
-    def render(self, screen, all_sprites, effects, player, level):
         # Рендер фона с помощью функции тайлинга для непрерывного отображения мира
-        draw_tiled_background(screen, self.background_tile, self.camera.offset)
-
-        # Отрисовка спрайтов с сортировкой по нижней границе для правильного перекрытия
-        for sprite in sorted(all_sprites.sprites(), key=lambda s: s.rect.bottom):
-            if self.camera.is_visible(sprite.rect, 100):
-                # Для умирающих врагов применяем особый метод рендеринга с эффектом затемнения
-                if hasattr(sprite, 'state') and sprite.state == "dying" and hasattr(sprite, 'alpha'):
-                    temp_surface = sprite.image.copy()
-                    temp_surface.fill((255, 255, 255, sprite.alpha), special_flags=pygame.BLEND_RGBA_MULT)
-                    screen.blit(temp_surface, self.camera.apply(sprite.rect))
-                else:
-                    screen.blit(sprite.image, self.camera.apply(sprite.rect))
+        started = now()
+        self.background.draw(screen, offset)
+
+        # Отрисовка спрайтов в порядке глубины
+        for sprite in ordered:
+            # Затухание умирающих врагов уже запечено в их кадре, поэтому все спрайты рисуются одинаково
+            x, y = self.interpolate(sprite, previous_positions, alpha)
+            screen.blit(sprite.image, (x + offset.x, y + offset.y))
+        drawn = len(visible)
 
         # Отрисовка визуальных эффектов, таких как атаки и спецэффекты
-        for effect in effects:
+        for effect in world.effects:
             if self.camera.is_visible(effect.rect, 100):
-                screen.blit(effect.image, self.camera.apply(effect.rect))
+                x, y = self.interpolate(effect, previous_positions, alpha)
+                screen.blit(effect.image, (x + offset.x, y + offset.y))
+                drawn += 1
+
+        PROFILER.add("blits", started)
+
+        total = len(index.item_cells) + len(world.effects)
+        self.stats["sprites"] = total
+        self.stats["drawn"] = drawn
+        self.stats["culled"] = total - drawn
 
         # Отрисовка HUD для постоянного отображения информации об игроке и уровне
-        draw_hud(screen, player, level)
+        started = now()
+        self.hud.draw(screen)
+        PROFILER.add("hud", started)
+
+    @staticmethod
+    def interpolate(sprite, previous_positions, alpha):
+        # Линейная интерполяция позиции между тиками; переносы через край мира не сглаживаются
+        x, y = sprite.rect.topleft
+        previous = previous_positions.get(sprite)
+        if previous is None:
+            return x, y
+        dx, dy = x - previous[0], y - previous[1]
+        if abs(dx) > INTERPOLATION_SNAP_DISTANCE or abs(dy) > INTERPOLATION_SNAP_DISTANCE:
+            return x, y
+        return previous[0] + dx * alpha, previous[1] + dy * alpha
 
 
 # Состояние игрового процесса
 # Управляет логикой игрового мира, обработки входных данных, паузой и анимациями
 class PlayState(BaseState):
-    def __init__(self, state_manager):
+    def __init__(self, state_manager, resume=False):
         super().__init__(state_manager)
         self.game_state = self.game.game_state
-        factory = GameObjectFactory(self.game.sound_service)
-
-        # Инициализируем игрока в центре экрана, связывая его с игровым состоянием
-        self.player = factory.create_player(
-            (self.screen_width // 2, self.screen_height // 2),
-            self.game_state
-        )
+        # Общие часы симуляции: все игровые таймеры идут только во время обновления мира
+        self.clock = self.game.sim_clock
+        self.clock.reset_accumulator()
+        # Игровому миру нужны все спрайты и звуки: дожидаемся окончания фоновой загрузки
+        ASSET_LOADER.wait()
+        factory = GameObjectFactory(self.game.sound_service, self.clock)
+
+        # Продолжение забега восстанавливает мир из снимка; прогресс берется из сохранения,
+        # чтобы не потерять улучшения, купленные после выхода
+        self.game_world = load_snapshot(WORLD_SNAPSHOT_FILE, factory, self.game_state,
+                                        restore_progress=False) if resume else None
+        if self.game_world is not None:
+            self.player = self.game_world.player
+        else:
+            # Инициализируем игрока в центре экрана, связывая его с игровым состоянием
+            self.player = factory.create_player(
+                (self.screen_width // 2, self.screen_height // 2),
+                self.game_state
+            )
 
-        # Создаем игровой мир с текущим уровнем, где будут происходить все взаимодействия
-        self.game_world = GameWorld(
-            self.player,
-            factory,
-            self.game_state.session.level
-        )
+            # Создаем игровой мир с текущим уровнем, где будут происходить все взаимодействия
+            self.game_world = GameWorld(
+                self.player,
+                factory,
+                self.game_state.session.level
+            )
 
         # Инициализируем систему рендеринга с привязкой к камере и фоновому изображению
         self.render_system = RenderSystem(
             Camera(self.screen_width, self.screen_height),
-            load_sprite("background", "background.png")
+            load_sprite("background", "background.png", alpha=False),
+            HudReadout(self.player, lambda: self.game_world.level, level_text=get_level_text)
         )
 
         # Настраиваем размеры мира для камеры, чтобы ограничить область обзора
         self.render_system.camera.set_world_size(WORLD_WIDTH, WORLD_HEIGHT)
+        if resume:
+            self.render_system.camera.snap(self.player.rect)
 
         # Инициализация переменных, отвечающих за состояние паузы и атаку
         self.paused = False
+        self.frozen_frame = None
         self.pause_options = ["Continue", "Exit to Menu"]
         self.pause_selected = 0
         self.mouse_pos = (0, 0)
-        self.last_attack_time = 0
+        self.last_attack_time = None
         self.attack_cooldown = ATTACK_COOLDOWN
-        self.pause_option_rects = []
+        self.create_pause_widgets()
+
+    def create_pause_widgets(self):
+        # Виджеты экрана паузы: текст перерисовывается только при изменении выбора или показателей
+        info_color = (200, 200, 200)
+        right = self.screen_width - 10
+        self.pause_title = Label("PAUSED", 64, MENU_TEXT_COLOR, pos=(self.screen_width // 2, self.screen_height // 3))
+        self.pause_menu = MenuList(self.pause_options, 36, self.screen_width // 2, self.screen_height // 2, 50,
+                                   lambda: self.pause_selected)
+        self.pause_info = [
+            Label(lambda: f"Level: {self.game_world.level} | Corpses: {self.game_world.removed_corpses}",
+                  24, info_color, anchor="topleft", pos=(10, 10)),
+            Label(lambda: f"Enemies: {self.game_world.events.report('enemy')} | "
+                          f"Score: {self.game_state.session.score}",
+                  24, info_color, anchor="topleft", pos=(10, 10 + get_font(24).get_height())),
+            Label(lambda: f"FPS: {self.game.clock.get_fps():.1f}", 24, info_color, anchor="topright", pos=(right, 10),
+                  cached=False),
+            Label(lambda: f"Drawn: {self.render_system.stats['drawn']} | Culled: {self.render_system.stats['culled']}",
+                  24, info_color, anchor="topright", pos=(right, 10 + get_font(24).get_height())),
+            Label(lambda: f"Pacing: {self.game.pacer.summary()}",
+                  24, info_color, anchor="topright", pos=(right, 10 + 2 * get_font(24).get_height()), cached=False),
+            Label(lambda: f"Pool: {self.game_world.factory.enemy_pool.report()}",
+                  24, info_color, anchor="topright", pos=(right, 10 + 3 * get_font(24).get_height()))
+        ]
 
     def handle_events(self, events):
         self.mouse_pos = pygame.mouse.get_pos()
@@ -310,13 +463,19 @@ class PlayState(BaseState):
             if event.type == pygame.KEYDOWN:
                 # Переключение состояния паузы, что позволяет игроку прервать игровой процесс
                 if event.key == pygame.K_ESCAPE:
-                    self.paused = not self.paused
                     if self.paused:
-                        self.pause_selected = 0
+                        self.resume()
+                    else:
+                        self.pause()
                     self.play_sound("menu_navigate")
                 # Обработка атаки игрока, если игра не находится на паузе
                 elif event.key == pygame.K_SPACE and not self.paused:
                     self.handle_attack()
+                # Замедление и ускорение симуляции для отладки и просмотра боя
+                elif event.key == pygame.K_LEFTBRACKET:
+                    self.clock.set_time_scale(self.clock.time_scale / 2)
+                elif event.key == pygame.K_RIGHTBRACKET:
+                    self.clock.set_time_scale(self.clock.time_scale * 2)
                 # Навигация через пункты меню в состоянии паузы
                 if self.paused:
                     if event.key == pygame.K_UP:
@@ -334,48 +493,71 @@ class PlayState(BaseState):
             elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 1 and self.paused:
                 self.handle_pause_mouse_click(event.pos)
 
+    def pause(self):
+        # Последний кадр мира снимается один раз вместе с затемнением и выводится до снятия паузы
+        self.paused = True
+        self.pause_selected = 0
+        self.frozen_frame = freeze_frame(self.game.world_frame(), PAUSE_BG_COLOR)
+
+    def resume(self):
+        self.paused = False
+        self.frozen_frame = None
+
     def handle_pause_mouse_motion(self, mouse_pos):
         # Определяем выделенную опцию в меню паузы в зависимости от положения курсора
-        for i, rect in enumerate(self.pause_option_rects):
-            if rect.collidepoint(mouse_pos):
-                self.pause_selected = i
-                break
+        index = self.pause_menu.hit_test(mouse_pos)
+        if index is not None:
+            self.pause_selected = index
 
     def handle_attack(self):
         # Обеспечиваем возможность атаки игрока с учетом интервала между ударами
-        current_time = pygame.time.get_ticks()
-        if current_time - self.last_attack_time > self.attack_cooldown:
+        current_time = self.clock.now()
+        if self.last_attack_time is None or current_time - self.last_attack_time > self.attack_cooldown:
             self.player.attack(self.game_world.effects, self.game_world.enemies)
             self.last_attack_time = current_time
 
     def handle_pause_selection(self):
         # Выполняем действие, выбранное в меню паузы, облегчая управление игрой
         if self.pause_selected == 0:
-            self.paused = False  # Возобновляем игровой процесс
+            self.resume()  # Возобновляем игровой процесс
         elif self.pause_selected == 1:
-            self.state_manager.change_state("menu")  # Переходим в главное меню
+            # Переходим в главное меню; забег сохраняется снимком, чтобы его можно было продолжить
+            save_snapshot(self.game_world)
+            self.state_manager.change_state("menu")
+
+    def on_quit(self):
+        save_snapshot(self.game_world)
 
     def handle_pause_mouse_click(self, mouse_pos):
         # Проверяем выбор пункта меню паузы на основе клика мыши.
-        for i, rect in enumerate(self.pause_option_rects):
-            if rect.collidepoint(mouse_pos):
-                self.pause_selected = i
-                self.play_sound("menu_confirm")
-                self.handle_pause_selection()
-                break
+        index = self.pause_menu.hit_test(mouse_pos)
+        if index is not None:
+            self.pause_selected = index
+            self.play_sound("menu_confirm")
+            self.handle_pause_selection()
 
     def update(self, dt):
         if self.paused:
-            # Если игра на паузе, пропускаем обновление динамики игрового мира
+            # Если игра на паузе, пропускаем обновление динамики игрового мира – часы симуляции стоят
             return
 
-        current_time = pygame.time.get_ticks()
-        # Обновляем положение камеры в соответствии с перемещением игрока
-        self.render_system.camera.update(self.player.rect)
-        # Обновляем состояние игрового мира и получаем возможный результат (победа/поражение)
-        result = self.game_world.update(current_time)
+        # Реальное время кадра переводится в целое число фиксированных шагов симуляции
+        result = None
+        for _ in range(self.clock.advance(dt)):
+            self.clock.step()
+            self.game_world.remember_positions()
+            # Обновляем положение камеры в соответствии с перемещением игрока
+            self.render_system.camera.update(self.player.rect)
+            # Звуки мира ослабляются по расстоянию от центра камеры
+            self.game.sound_service.listener = self.render_system.camera.view_rect().center
+            # Обновляем состояние игрового мира и получаем возможный результат (победа/поражение)
+            result = self.game_world.update(self.clock.now())
+            if result:
+                break
 
-        # Обрабатываем результат обновления игрового мира
+        # Обрабатываем результат обновления игрового мира; снимок завершенного забега больше не нужен
+        if result:
+            discard_snapshot()
         if result == "victory":
             # Если уровень завершен, очищаем объекты для перехода к экрану победы
             self.game_world.all_sprites.empty()
@@ -388,58 +570,30 @@ class PlayState(BaseState):
             self.state_manager.change_state("gameover")
 
     def draw(self, screen):
-        # Отрисовываем игровой мир с учетом динамики и эффекта камеры
-        self.render_system.render(
-            screen,
-            self.game_world.all_sprites,
-            self.game_world.effects,
-            self.player,
-            self.game_world.level
-        )
-
-        # Если игра на паузе, дополнительно отрисовываем экран паузы
+        # На паузе мир не меняется: вместо его отрисовки выводим застывший кадр с меню паузы
         if self.paused:
             self.draw_pause_screen(screen)
+            return
+
+        # Отрисовываем игровой мир с учетом динамики и эффекта камеры
+        self.render_system.render(screen, self.game_world, self.clock.alpha)
 
     def draw_pause_screen(self, screen):
-        # Создаем полупрозрачное покрытие для визуального обозначения состояния паузы
-        overlay = pygame.Surface((self.screen_width, self.screen_height), pygame.SRCALPHA)
-        overlay.fill(PAUSE_BG_COLOR)
-        screen.blit(overlay, (0, 0))
-
-        # Рендер заголовка паузы с крупным шрифтом для привлечения внимания
-        title_font = get_font(64)
-        title = title_font.render("PAUSED", True, MENU_TEXT_COLOR)
-        title_rect = title.get_rect(center=(self.screen_width // 2, self.screen_height // 3))
-        screen.blit(title, title_rect)
-
-        # Рендер опций меню паузы с использованием выделения при наведении
-        option_font = get_font(36)
-        self.pause_option_rects = []
-
-        for i, option in enumerate(self.pause_options):
-            color = MENU_SELECTED_COLOR if i == self.pause_selected else MENU_TEXT_COLOR
-            text = option_font.render(option, True, color)
-            text_rect = text.get_rect(center=(self.screen_width // 2, self.screen_height // 2 + i * 50))
-            screen.blit(text, text_rect)
-            self.pause_option_rects.append(text_rect)
-
-        # Отрисовка дополнительной информации (текущий уровень, число удаленных врагов и FPS)
-        info_font = get_font(24)
-        info_text = info_font.render(
-            f"Level: {self.game_world.level} | Corpses: {self.game_world.removed_corpses}",
-            True, (200, 200, 200)
-        )
-        screen.blit(info_text, (10, 10))
+        # Застывший кадр уже содержит полупрозрачное покрытие, обозначающее состояние паузы
+        screen.blit(self.frozen_frame, (0, 0))
 
-        fps_text = info_font.render(f"FPS: {self.game.clock.get_fps():.1f}", True, (200, 200, 200))
-        screen.blit(fps_text, (self.screen_width - fps_text.get_width() - 10, 10))
+        # Заголовок паузы, опции меню с выделением и дополнительная информация (уровень, трупы, FPS, отсечение)
+        self.pause_title.draw(screen)
+        self.pause_menu.draw(screen)
+        for label in self.pause_info:
+            label.draw(screen)
 
 
 # Состояние улучшений
 # Позволяет игроку инвестировать накопленные очки для повышения характеристик
 class UpgradeState(BaseState):
     OPTIONS = ["Increase Speed", "Increase Health", "Increase Damage", "Done"]
+    UPGRADE_STATS = ["Increase Speed", "Increase Health", "Increase Damage"]
     STAT_COLORS = {
         "Speed": (100, 255, 100),
         "Health": (255, 100, 100),
@@ -449,12 +603,53 @@ class UpgradeState(BaseState):
     def __init__(self, state_manager, progress):
         super().__init__(state_manager)
         self.progress = progress
-        self.title_font = get_font(48)
-        self.info_font = get_font(28)
+        self.title_font_size = 48
+        self.info_font_size = 28
         self.selected = 0
         self.last_purchase = 0
         self.purchase_effect = None
-        self.option_rects = []
+        self.create_widgets()
+
+    def create_widgets(self):
+        # Виджеты экрана улучшений привязаны к прогрессу игрока и выбранной опции
+        center_x = self.screen_width // 2
+        start_y = 200
+        gap = 40
+        self.title_label = Label("Upgrade Menu", self.title_font_size, (220, 180, 40), pos=(center_x, 80))
+        self.points_label = Label(lambda: f"Available Upgrade Points: {self.progress.upgrade_points}",
+                                  self.info_font_size, (255, 215, 0), pos=(center_x, 140))
+        self.option_list = MenuList(self.OPTIONS, self.info_font_size, center_x, start_y, gap, lambda: self.selected)
+
+        # Детали текущего уровня улучшений справа от соответствующих опций
+        self.level_labels = []
+        for idx, option in enumerate(self.OPTIONS):
+            if option in self.UPGRADE_STATS:
+                self.level_labels.append(Label(
+                    lambda option=option: "Level: {1} ({2})".format(*self.upgrade_info(option)),
+                    self.info_font_size,
+                    lambda idx=idx: (150, 255, 150) if idx == self.selected else (100, 200, 100),
+                    anchor="midleft", pos=(center_x + 150, start_y + idx * gap)
+                ))
+
+        # Сводная статистика улучшений на панели в нижней части экрана
+        self.stats_panel = StatPanel(
+            (0, self.screen_height - 120, self.screen_width, 120),
+            lambda: [(f"{stat}: Level {level} ({bonus})", self.STAT_COLORS[stat])
+                     for stat, level, bonus in map(self.upgrade_info, self.UPGRADE_STATS)],
+            self.info_font_size, (40, 40, 60), self.screen_width // 4, 40, 30
+        )
+        self.effect_label = Label("UPGRADE APPLIED!", self.info_font_size,
+                                  lambda: self.STAT_COLORS.get(self.purchase_effect.capitalize(), (255, 255, 255)),
+                                  pos=(center_x, 350))
+
+    def upgrade_info(self, option):
+        # Название, уровень и бонус улучшения для выбранной опции
+        progress = self.progress
+        return {
+            "Increase Speed": ("Speed", progress.speed_upgrades, f"+{progress.speed_upgrades * 20}%"),
+            "Increase Health": ("Health", progress.health_upgrades, f"+{progress.health_upgrades * 2} HP"),
+            "Increase Damage": ("Damage", progress.damage_upgrades, f"+{progress.damage_upgrades} DMG")
+        }[option]
 
     def handle_events(self, events):
         for event in events:
@@ -478,10 +673,9 @@ class UpgradeState(BaseState):
 
     def handle_mouse_motion(self, mouse_pos):
         # Определяем выбранную опцию на основе положения курсора
-        for i, rect in enumerate(self.option_rects):
-            if rect.collidepoint(mouse_pos):
-                self.selected = i
-                break
+        index = self.option_list.hit_test(mouse_pos)
+        if index is not None:
+            self.selected = index
 
     def handle_option_select(self):
         now = pygame.time.get_ticks()
@@ -518,83 +712,22 @@ class UpgradeState(BaseState):
         # Отрисовка фона для экрана улучшений
         screen.fill((50, 50, 70))
 
-        # Заголовок экрана улучшений
-        title = self.title_font.render("Upgrade Menu", True, (220, 180, 40))
-        title_rect = title.get_rect(center=(self.screen_width // 2, 80))
-        screen.blit(title, title_rect)
+        # Заголовок, доступные очки, список опций и уровни улучшений рядом с ними
+        self.title_label.draw(screen)
+        self.points_label.draw(screen)
+        self.option_list.draw(screen)
+        for label in self.level_labels:
+            label.draw(screen)
 
-        # Отображение количества доступных очков для улучшений
-        points_text = self.info_font.render(
-            f"Available Upgrade Points: {self.progress.upgrade_points}",
-            True, (255, 215, 0)
-        )
-        points_rect = points_text.get_rect(center=(self.screen_width // 2, 140))
-        screen.blit(points_text, points_rect)
-
-        # Отрисовка списка опций улучшений с динамическим обновлением областей для мышиного ввода
-        self.option_rects = []
-        start_y = 200
-        gap = 40
-
-        for idx, option in enumerate(self.OPTIONS):
-            color = MENU_SELECTED_COLOR if idx == self.selected else MENU_TEXT_COLOR
-            option_text = self.info_font.render(option, True, color)
-            option_rect = option_text.get_rect(center=(self.screen_width // 2, start_y + idx * gap))
-            screen.blit(option_text, option_rect)
-            self.option_rects.append(option_rect)
-
-            # Отрисовка дополнительных деталей по выбранным улучшениям
-            self.draw_option_level(screen, option, start_y + idx * gap, idx)
-
-        # Отображаем сводную статистику улучшений ниже списка опций
-        self.draw_stats(screen)
+        # Сводная статистика улучшений ниже списка опций
+        self.stats_panel.draw(screen)
         self.draw_purchase_effect(screen)
 
-    def draw_option_level(self, screen, option, y, idx):
-        # Выводим детали текущего уровня улучшения и бонусы, чтобы объяснить принятые решения
-        level_info = {
-            "Increase Speed": ("Level", self.progress.speed_upgrades, f"+{self.progress.speed_upgrades * 20}%"),
-            "Increase Health": ("Level", self.progress.health_upgrades, f"+{self.progress.health_upgrades * 2} HP"),
-            "Increase Damage": ("Level", self.progress.damage_upgrades, f"+{self.progress.damage_upgrades} DMG")
-        }
-
-        if option in level_info:
-            prefix, level, bonus = level_info[option]
-            color = (150, 255, 150) if idx == self.selected else (100, 200, 100)
-            level_text = self.info_font.render(f"{prefix}: {level} ({bonus})", True, color)
-            level_x = self.screen_width // 2 + 150
-            level_rect = level_text.get_rect(midleft=(level_x, y))
-            screen.blit(level_text, level_rect)
-
-    def draw_stats(self, screen):
-        # Отрисовка панели статистики, которая закреплена в нижней части экрана
-        stats_y = self.screen_height - 120
-        pygame.draw.rect(screen, (40, 40, 60), (0, stats_y, self.screen_width, 120))
-
-        # Сводные данные по улучшениям, чтобы игрок понимал влияние каждого параметра
-        stats = [
-            ("Speed", self.progress.speed_upgrades, f"+{self.progress.speed_upgrades * 20}%"),
-            ("Health", self.progress.health_upgrades, f"+{self.progress.health_upgrades * 2} HP"),
-            ("Damage", self.progress.damage_upgrades, f"+{self.progress.damage_upgrades} DMG")
-        ]
-
-        start_x = self.screen_width // 4
-        for i, (stat, level, bonus) in enumerate(stats):
-            text = self.info_font.render(
-                f"{stat}: Level {level} ({bonus})",
-                True, self.STAT_COLORS[stat]
-            )
-            text_y = stats_y + 40 + i * 30
-            screen.blit(text, (start_x, text_y))
-
     def draw_purchase_effect(self, screen):
         # Кратковременный визуальный эффект подтверждения покупки улучшения,
         # который помогает пользователю понять, что действие было успешно выполнено
         if self.purchase_effect and pygame.time.get_ticks() - self.last_purchase < 1000:
-            effect_color = self.STAT_COLORS.get(self.purchase_effect.capitalize(), (255, 255, 255))
-            effect_text = self.info_font.render("UPGRADE APPLIED!", True, effect_color)
-            effect_rect = effect_text.get_rect(center=(self.screen_width // 2, 350))
-            screen.blit(effect_text, effect_rect)
+            self.effect_label.draw(screen)
 
 
 # Состояние проигрыша
@@ -603,11 +736,20 @@ class GameOverState(BaseState):
     def __init__(self, state_manager, level):
         super().__init__(state_manager)
         self.level = level
-        self.title_font = get_font(72)
-        self.stats_font = get_font(36)
-        self.instruction_font = get_font(28)
+        self.title_font_size = 72
+        self.stats_font_size = 36
+        self.instruction_font_size = 28
         self.timer = 0
-        self.button_rect = None
+        # Последний кадр забега, затемненный для акцента на сообщении о проигрыше
+        self.frozen_frame = freeze_frame(self.game.world_frame(), (0, 0, 0, 180))
+        center_x = self.screen_width // 2
+        self.labels = [
+            Label("Game Over", self.title_font_size, (255, 0, 0), pos=(center_x, self.screen_height // 4)),
+            Label(f"Reached Level {self.level}", self.stats_font_size, (255, 255, 255),
+                  pos=(center_x, self.screen_height // 2))
+        ]
+        self.instruction_label = Label("Press ENTER or click to return to Main Menu", self.instruction_font_size,
+                                       (255, 255, 255), pos=(center_x, self.screen_height * 3 // 4))
 
     def handle_events(self, events):
         for event in events:
@@ -617,7 +759,7 @@ class GameOverState(BaseState):
                 self.state_manager.change_state("menu")
             # Инициируем переход в меню при клике по инструкции.
             elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
-                if self.button_rect and self.button_rect.collidepoint(event.pos):
+                if self.instruction_label.built and self.instruction_label.hit_test(event.pos):
                     self.play_sound("menu_confirm")
                     self.state_manager.change_state("menu")
 
@@ -626,30 +768,13 @@ class GameOverState(BaseState):
         self.timer += dt
 
     def draw(self, screen):
-        # Затемняем экран, чтобы сфокусировать внимание на сообщении о проигрыше
-        overlay = pygame.Surface((self.screen_width, self.screen_height))
-        overlay.fill((0, 0, 0))
-        overlay.set_alpha(180)
-        screen.blit(overlay, (0, 0))
-
-        # Отрисовываем крупное сообщение "Game Over", чтобы четко обозначить состояние
-        game_over_text = self.title_font.render("Game Over", True, (255, 0, 0))
-        game_over_rect = game_over_text.get_rect(center=(self.screen_width // 2, self.screen_height // 4))
-        screen.blit(game_over_text, game_over_rect)
-
-        # Выводим информацию о достигнутом уровне для обратной связи
-        level_text = self.stats_font.render(f"Reached Level {self.level}", True, (255, 255, 255))
-        level_rect = level_text.get_rect(center=(self.screen_width // 2, self.screen_height // 2))
-        screen.blit(level_text, level_rect)
-
-        # Инструкция для возврата в главное меню
-        instruction_text = self.instruction_font.render(
-            "Press ENTER or click to return to Main Menu",
-            True, (255, 255, 255)
-        )
-        instruction_rect = instruction_text.get_rect(center=(self.screen_width // 2, self.screen_height * 3 // 4))
-        screen.blit(instruction_text, instruction_rect)
-        self.button_rect = instruction_rect  # Сохраняем область для обработки клика
+        # Застывший затемненный кадр вместо нового покрытия каждый кадр
+        screen.blit(self.frozen_frame, (0, 0))
+
+        # Сообщение "Game Over", достигнутый уровень и инструкция для возврата в главное меню
+        for label in self.labels:
+            label.draw(screen)
+        self.instruction_label.draw(screen)
 
 
 # Состояние победы
@@ -657,12 +782,21 @@ class GameOverState(BaseState):
 class VictoryState(BaseState):
     def __init__(self, state_manager, stats=None):
         super().__init__(state_manager)
-        self.title_font = get_font(72)
-        self.stats_font = get_font(36)
-        self.instruction_font = get_font(28)
+        self.title_font_size = 72
+        self.stats_font_size = 36
+        self.instruction_font_size = 28
         self.stats = stats or {}
         self.timer = 0
-        self.button_rect = None
+        # Последний кадр забега, затемненный для акцента на сообщении о победе
+        self.frozen_frame = freeze_frame(self.game.world_frame(), (0, 0, 0, 150))
+        center_x = self.screen_width // 2
+        self.labels = [Label("You Win!", self.title_font_size, (0, 255, 0), pos=(center_x, self.screen_height // 4))]
+        # Статистика для обратной связи о достигнутом результате
+        for i, (key, value) in enumerate(self.stats.items()):
+            self.labels.append(Label(f"{key}: {value}", self.stats_font_size, (255, 255, 255),
+                                     pos=(center_x, self.screen_height // 3 + i * 50)))
+        self.instruction_label = Label("Press ENTER or click to return to Main Menu", self.instruction_font_size,
+                                       (255, 255, 255), pos=(center_x, self.screen_height * 3 // 4))
 
     def handle_events(self, events):
         for event in events:
@@ -674,7 +808,7 @@ class VictoryState(BaseState):
                 self.state_manager.change_state("menu")
             # Обработка клика мыши для возврата в меню
             elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
-                if self.button_rect and self.button_rect.collidepoint(event.pos):
+                if self.instruction_label.built and self.instruction_label.hit_test(event.pos):
                     self.play_sound("menu_confirm")
                     self.state_manager.game.game_state.progress = PlayerProgress()  # Сброс прогресса
                     self.state_manager.game.game_state.save()
@@ -685,28 +819,10 @@ class VictoryState(BaseState):
         self.timer += dt
 
     def draw(self, screen):
-        # Наложение полупрозрачного затемнения для акцентирования сообщения о победе
-        overlay = pygame.Surface((self.screen_width, self.screen_height), pygame.SRCALPHA)
-        overlay.fill((0, 0, 0, 150))
-        screen.blit(overlay, (0, 0))
-
-        # Рендер основного сообщения о победе с выделенным цветом
-        victory_text = self.title_font.render("You Win!", True, (0, 255, 0))
-        victory_rect = victory_text.get_rect(center=(self.screen_width // 2, self.screen_height // 4))
-        screen.blit(victory_text, victory_rect)
-
-        # Вывод статистики для обратной связи о достигнутом результате
-        y_pos = self.screen_height // 3
-        for key, value in self.stats.items():
-            stat_text = self.stats_font.render(f"{key}: {value}", True, (255, 255, 255))
-            stat_rect = stat_text.get_rect(center=(self.screen_width // 2, y_pos))
-            screen.blit(stat_text, stat_rect)
-            y_pos += 50
-
-        # Инструкция для возврата в главное меню после победы
-        done_text = self.instruction_font.render(
-            "Press ENTER or click to return to Main Menu",
-            True, (255, 255, 255))
-        done_rect = done_text.get_rect(center=(self.screen_width // 2, self.screen_height * 3 // 4))
-        screen.blit(done_text, done_rect)
-        self.button_rect = done_rect  # Сохраняем область для обработки клика
+        # Застывший затемненный кадр вместо нового покрытия каждый кадр
+        screen.blit(self.frozen_frame, (0, 0))
+
+        # Сообщение о победе, статистика и инструкция для возврата в главное меню
+        for label in self.labels:
+            label.draw(screen)
+        self.instruction_label.draw(screen)
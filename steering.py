@@ -0,0 +1,64 @@
+from settings import WORLD_WIDTH, WORLD_HEIGHT
+
+# NumPy – необязательная зависимость: без нее остается скалярный расчет в Enemy.update
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+STEERING_SCALAR = "scalar"
+STEERING_BATCH = "batch"
+
+
+# Векторизованный расчет движения всей орды за один проход
+# Для всех идущих и атакующих врагов одновременно вычисляются дистанция до цели, направление,
+# смещение с учетом скорости, переход в атаку и цикличный перенос через границы мира.
+# Результат раскладывается в enemy.steering, а сами спрайты лишь применяют его при обновлении
+class BatchSteering:
+    def __init__(self, world_width=WORLD_WIDTH, world_height=WORLD_HEIGHT):
+        self.world_width = world_width
+        self.world_height = world_height
+
+    def step(self, enemies, target):
+        movers = [enemy for enemy in enemies if enemy.state in (enemy.STATE_WALK, enemy.STATE_ATTACK)]
+        if not movers:
+            return
+
+        # Собираем позиции и параметры врагов в массивы одним проходом
+        data = np.array(
+            [(e.rect.x, e.rect.y, e.rect.width, e.rect.height, e.speed, e.attack_range) for e in movers],
+            dtype=np.int64
+        )
+        x, y, w, h, speed, attack_range = data.T
+
+        # Дистанция до цели считается между центрами, как и в скалярном пути
+        dx = target.rect.centerx - (x + w // 2)
+        dy = target.rect.centery - (y + h // 2)
+        distance = np.hypot(dx, dy)
+        attacking = distance < attack_range
+
+        # Смещение усекается к нулю так же, как int() в скалярном расчете
+        safe_distance = np.where(distance > 0, distance, 1.0)
+        new_x = x + np.trunc(dx / safe_distance * speed).astype(np.int64)
+        new_y = y + np.trunc(dy / safe_distance * speed).astype(np.int64)
+
+        # Цикличность мира: вышедший за край объект появляется с противоположной стороны
+        new_x = np.where(new_x + w < 0, self.world_width, np.where(new_x > self.world_width, -w, new_x))
+        new_y = np.where(new_y + h < 0, self.world_height, np.where(new_y > self.world_height, -h, new_y))
+
+        # Атакующие враги остаются на месте
+        new_x = np.where(attacking, x, new_x)
+        new_y = np.where(attacking, y, new_y)
+
+        for enemy, attack, nx, ny in zip(movers, attacking.tolist(), new_x.tolist(), new_y.tolist()):
+            enemy.steering = (enemy.STATE_ATTACK if attack else enemy.STATE_WALK, (nx, ny))
+
+
+def create_steering(mode):
+    # Возвращает пакетный расчет для режима "batch" или None для скалярного пути
+    if mode != STEERING_BATCH:
+        return None
+    if np is None:
+        print("NumPy is not available, falling back to scalar enemy steering")
+        return None
+    return BatchSteering()
@@ -1,24 +1,50 @@
-from resources import get_font
+import pygame
 
 
-def draw_tiled_background(screen, background, camera_offset):
-    bg_width, bg_height = background.get_size()
+# Фон из повторяющегося тайла, заранее собранный в одну поверхность размером «экран плюс тайл»
+# Композит строится один раз и пересобирается только при смене разрешения; каждый кадр
+# фон выводится единственным блитом нужного участка композита вместо (tiles_x+3)×(tiles_y+3) блитов тайла
+class TiledBackground:
+    def __init__(self, tile):
+        self.tile = tile
+        self.composite = None
+        self.screen_size = None
 
-    # Рассчитываем начальную позицию для тайлинга с учётом смещения камеры
-    # Это нужно для того, чтобы фон всегда полностью покрывал экран при движении
-    start_x = -int(camera_offset.x) % bg_width - bg_width
-    start_y = -int(camera_offset.y) % bg_height - bg_height
+    def build(self, screen_size):
+        # Собираем композит, покрывающий экран с запасом в один тайл по каждой оси
+        tile_width, tile_height = self.tile.get_size()
+        width = screen_size[0] + tile_width
+        height = screen_size[1] + tile_height
+        composite = pygame.Surface((width, height))
+        for x in range(0, width, tile_width):
+            for y in range(0, height, tile_height):
+                composite.blit(self.tile, (x, y))
+        # Непрозрачный фон в формате дисплея копируется быстрее всего
+        self.composite = composite.convert() if pygame.display.get_surface() else composite
+        self.screen_size = screen_size
 
-    # Определяем количество тайлов, необходимых для полного покрытия экрана с запасом
-    # Дополнительные тайлы гарантируют отсутствие пустых областей при динамичном перемещении
-    tiles_x = (screen.get_width() // bg_width) + 3
-    tiles_y = (screen.get_height() // bg_height) + 3
+    def draw(self, screen, camera_offset):
+        screen_size = screen.get_size()
+        if screen_size != self.screen_size:
+            self.build(screen_size)
 
-    # Итеративно отрисовываем тайлы по всей области экрана,
-    # обеспечивая плавное и непрерывное повторение фонового изображения
-    for x in range(start_x, start_x + tiles_x * bg_width, bg_width):
-        for y in range(start_y, start_y + tiles_y * bg_height, bg_height):
-            screen.blit(background, (x, y))
+        # Фаза тайлинга по смещению камеры: с какого места композита начинается видимая часть,
+        # чтобы фон всегда полностью покрывал экран при движении
+        tile_width, tile_height = self.tile.get_size()
+        phase_x = -int(camera_offset.x) % tile_width
+        phase_y = -int(camera_offset.y) % tile_height
+        screen.blit(self.composite, (0, 0),
+                    (tile_width - phase_x, tile_height - phase_y, screen_size[0], screen_size[1]))
+
+
+def freeze_frame(screen, dim_color):
+    # Снимок последнего выведенного кадра с запеченным затемнением: экраны паузы и конца забега
+    # выводят его одним непрозрачным блитом вместо отрисовки мира и нового полупрозрачного слоя каждый кадр
+    frame = screen.copy()
+    overlay = pygame.Surface(frame.get_size(), pygame.SRCALPHA)
+    overlay.fill(dim_color)
+    frame.blit(overlay, (0, 0))
+    return frame
 
 
 LEVEL_NAMES = {
@@ -38,25 +64,3 @@ LEVEL_NAMES = {
 def get_level_text(level):
     # Определяем название уровня исходя из словаря, а при отсутствии элемента возвращаем значение по умолчанию
     return LEVEL_NAMES.get(level, f"Level {level}")
-
-
-def draw_hud(screen, player, level):
-    # Выбираем позицию для основного блока HUD в левом верхнем углу экрана
-    x, y = 20, 20
-
-    # Отрисовка иконки здоровья для наглядного отображения состояния игрока
-    screen.blit(player.hp_image, (x, y))
-
-    # Создаем текстовое представление здоровья с использованием выбранного шрифта,
-    # что улучшает читаемость и понятность информации для игрока
-    font = get_font(20)
-    health_text = f"{player.max_hits - player.hits}/{player.max_hits}"
-    text_surface = font.render(health_text, True, (255, 255, 255))
-    # Размещаем числовой индикатор рядом с иконкой для мгновенной оценки состояния.
-    screen.blit(text_surface, (x + player.hp_image.get_width() + 10, y + 10))
-
-    # Отрисовываем название уровня под блоком здоровья,
-    # чтобы игрок всегда понимал, на каком этапе находится его прохождение
-    font = get_font(24)
-    level_text = font.render(get_level_text(level), True, (255, 255, 255))
-    screen.blit(level_text, (20, y + player.hp_image.get_height() + 10))
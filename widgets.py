@@ -0,0 +1,209 @@
+import pygame
+from resources import render_text, get_font
+from profiler import PHASES, PERCENTILES
+from settings import MENU_TEXT_COLOR, MENU_SELECTED_COLOR
+
+
+def resolve(value):
+    # Значение виджета может быть задано напрямую или функцией-привязкой к игровым данным
+    return value() if callable(value) else value
+
+
+# Базовый виджет с сохраненной поверхностью и прямоугольником размещения
+# Каждый кадр виджет лишь сравнивает привязанное значение с последним отрисованным
+# и пересобирает поверхность только при его изменении. Наследник задает current_value() – значение,
+# от которого зависит картинка, и rebuild(value) – построение surface и rect по нему
+class Widget:
+    def __init__(self):
+        self.value = None
+        self.built = False
+        self.surface = None
+        self.rect = pygame.Rect(0, 0, 0, 0)
+
+    def refresh(self):
+        # Возвращает True, если виджет был перерисован
+        value = self.current_value()
+        if self.built and value == self.value:
+            return False
+        self.value = value
+        self.rebuild(value)
+        self.built = True
+        return True
+
+    def draw(self, screen):
+        self.refresh()
+        screen.blit(self.surface, self.rect)
+
+    def hit_test(self, pos):
+        return self.rect.collidepoint(pos)
+
+
+# Текстовая метка; текст и цвет могут быть привязаны к изменяющимся значениям.
+# Метки, текст которых меняется почти каждый кадр (FPS, счетчики), создаются с cached=False
+# и рендерятся шрифтом напрямую: в кэше текста они лишь вытесняли бы повторяющиеся надписи
+class Label(Widget):
+    def __init__(self, text, size, color=MENU_TEXT_COLOR, anchor="center", pos=(0, 0), cached=True):
+        super().__init__()
+        self.text = text
+        self.size = size
+        self.color = color
+        self.anchor = anchor
+        self.pos = pos
+        self.cached = cached
+
+    def current_value(self):
+        return str(resolve(self.text)), resolve(self.color)
+
+    def rebuild(self, value):
+        text, color = value
+        if self.cached:
+            self.surface = render_text(text, self.size, color)
+        else:
+            self.surface = get_font(self.size).render(text, True, color)
+        self.rect = self.surface.get_rect(**{self.anchor: self.pos})
+
+
+# Вертикальный список пунктов меню с выделением выбранного
+# Прямоугольники пунктов сохраняются и используются для проверки наведения и кликов мыши
+class MenuList(Widget):
+    def __init__(self, options, size, center_x, start_y, spacing, selected,
+                 color=MENU_TEXT_COLOR, selected_color=MENU_SELECTED_COLOR):
+        super().__init__()
+        self.options = options
+        self.size = size
+        self.center_x = center_x
+        self.start_y = start_y
+        self.spacing = spacing
+        self.selected = selected
+        self.color = color
+        self.selected_color = selected_color
+        self.items = []
+
+    def current_value(self):
+        return resolve(self.selected)
+
+    def rebuild(self, selected):
+        self.items = []
+        for idx, option in enumerate(self.options):
+            color = self.selected_color if idx == selected else self.color
+            surface = render_text(option, self.size, color)
+            rect = surface.get_rect(center=(self.center_x, self.start_y + idx * self.spacing))
+            self.items.append((surface, rect))
+        rects = [rect for _, rect in self.items]
+        self.rect = rects[0].unionall(rects) if rects else pygame.Rect(0, 0, 0, 0)
+
+    def draw(self, screen):
+        self.refresh()
+        for surface, rect in self.items:
+            screen.blit(surface, rect)
+
+    @property
+    def option_rects(self):
+        self.refresh()
+        return [rect for _, rect in self.items]
+
+    def hit_test(self, pos):
+        # Индекс пункта под курсором или None
+        for idx, rect in enumerate(self.option_rects):
+            if rect.collidepoint(pos):
+                return idx
+        return None
+
+
+# Панель статистики: фон и строки текста запекаются в одну поверхность
+class StatPanel(Widget):
+    def __init__(self, rect, rows, size, background, text_x, first_row_y, row_height):
+        super().__init__()
+        self.rect = pygame.Rect(rect)
+        self.rows = rows  # Функция, возвращающая список пар (текст, цвет)
+        self.size = size
+        self.background = background
+        self.text_x = text_x
+        self.first_row_y = first_row_y
+        self.row_height = row_height
+
+    def current_value(self):
+        return tuple(resolve(self.rows))
+
+    def rebuild(self, rows):
+        self.surface = pygame.Surface(self.rect.size)
+        self.surface.fill(self.background)
+        for i, (text, color) in enumerate(rows):
+            self.surface.blit(render_text(text, self.size, color),
+                              (self.text_x - self.rect.x, self.first_row_y + i * self.row_height))
+
+
+# Индикатор HUD: иконка здоровья, числовое здоровье и название уровня
+# Части и их позиции пересобираются, только когда меняются здоровье или уровень (несколько раз за волну);
+# сглаженный текст выводится прямо на экран, без промежуточной прозрачной поверхности
+class HudReadout(Widget):
+    def __init__(self, player, level, pos=(20, 20), level_text=str):
+        super().__init__()
+        self.player = player
+        self.level = level
+        self.rect.topleft = pos
+        self.level_text = level_text
+        self.items = []
+
+    def current_value(self):
+        player = self.player
+        return player.hp_image, player.hits, player.max_hits, resolve(self.level)
+
+    def rebuild(self, value):
+        hp_image, hits, max_hits, level = value
+        x, y = self.rect.topleft
+        health_text = render_text(f"{max_hits - hits}/{max_hits}", 20, (255, 255, 255))
+        level_text = render_text(self.level_text(level), 24, (255, 255, 255))
+
+        # Числовой индикатор рядом с иконкой, название уровня – под блоком здоровья
+        self.items = [
+            (hp_image, (x, y)),
+            (health_text, (x + hp_image.get_width() + 10, y + 10)),
+            (level_text, (x, y + hp_image.get_height() + 10))
+        ]
+
+    def draw(self, screen):
+        self.refresh()
+        for surface, pos in self.items:
+            screen.blit(surface, pos)
+
+
+# Оверлей профилировщика: таблица перцентилей времени фаз кадра на непрозрачной подложке
+# Перцентили пересчитываются несколько раз в секунду, и только тогда таблица собирается заново
+class ProfilerOverlay(Widget):
+    def __init__(self, profiler, pos=(10, 10), size=18, column_width=70, row_height=20):
+        super().__init__()
+        self.profiler = profiler
+        self.rect.topleft = pos
+        self.size = size
+        self.column_width = column_width
+        self.row_height = row_height
+
+    def current_value(self):
+        # Таблица зависит только от момента пересчета перцентилей, а не от счетчика кадров
+        self.profiler.percentiles()
+        return self.profiler.percentiles_time
+
+    def rebuild(self, value):
+        count, percentiles = self.profiler.percentiles_count, self.profiler.cached_percentiles
+        name_width = self.column_width + 30
+        self.rect.size = (name_width + self.column_width * len(PERCENTILES) + 10,
+                          self.row_height * (len(PHASES) + 2) + 10)
+        self.surface = pygame.Surface(self.rect.size)
+        self.surface.fill((20, 20, 30))
+
+        # Заголовок, строка названий столбцов и по строке на фазу; числа выравниваются по правому краю столбца.
+        # Названия повторяются и берутся из кэша текста, а заголовок со счетчиком и числа меняются при каждой
+        # пересборке и рендерятся шрифтом напрямую
+        color = (200, 200, 200)
+        font = get_font(self.size)
+        self.surface.blit(font.render(f"Frame profile, ms ({count} frames)", True, color), (5, 5))
+        header = [render_text(f"p{p}", self.size, color) for p in PERCENTILES]
+        rows = [("phase", header)]
+        rows += [(phase, [font.render(f"{value:.2f}", True, color) for value in percentiles[phase]])
+                 for phase in PHASES]
+        for i, (name, cells) in enumerate(rows, start=1):
+            y = 5 + i * self.row_height
+            self.surface.blit(render_text(name, self.size, color), (5, y))
+            for j, text in enumerate(cells):
+                self.surface.blit(text, (name_width + (j + 1) * self.column_width - text.get_width(), y))